@@ -1,23 +1,57 @@
+import time
 from abc import abstractmethod
 
+from algorithm.problem_instance import ProblemInstance
+from demand.demand_array import is_demand_array
+
 
 class GenericSR:
-    def __init__(self, nodes: list, links: list, demands: list, weights: dict, waypoints: dict, **kwargs):
+    def __init__(self, nodes: list, links: list, demands: list, weights: dict, waypoints: dict,
+                 problem_instance: ProblemInstance = None, **kwargs):
         """
         generic baseclass for Segment Routing (SR) algorithms
         :param nodes: list of node indices
         :param links: list of links with: [(u, v, capacity), ...]
-        :param demands: list of demands with: [(src, dst, demand), ...]
+        :param demands: list of demands with: [(src, dst, demand), ...] or a demand array (see demand.demand_array)
         :param weights: (optional) weights as dict with: {(i,j):weight, ...}
         :param waypoints: (optional) waypoints as dict with: {idx:[(p,q), ...], ...}
+        :param problem_instance: (optional) ProblemInstance of nodes, links and demands (see from_instance); created
+            from the lists on first use if not given
         """
         assert type(nodes) is list, f"Error {self.get_name()}: nodes must be a list with [i, ...]"
         assert type(links) is list, f"Error {self.get_name()}: links must be a list with [(i, j, capacity), ...]"
-        assert type(demands) is list, f"Error {self.get_name()}: demands must be a list with [(src, dst, demand), ...]"
+        assert type(demands) is list or is_demand_array(
+            demands), f"Error {self.get_name()}: demands must be a list with [(src, dst, demand), ...] or a demand array"
         assert weights is None or type(
             weights) is dict, f"Error {self.get_name()}: weights must be dict with {{(i,j):weight, ...}}"
         assert waypoints is None or type(
             waypoints) is dict, f"Error {self.get_name()}: waypoints must be dict with {{idx:[(p,q), ...], ...}}"
+        assert problem_instance is None or isinstance(problem_instance, ProblemInstance), \
+            f"Error {self.get_name()}: problem_instance must be a ProblemInstance"
+        self.__problem_instance = problem_instance
+        self.__problem_lists = (nodes, links, demands)
+
+    @property
+    def problem_instance(self) -> ProblemInstance:
+        """ ProblemInstance of the algorithm (created from the node, link and demand lists if not given) """
+        if self.__problem_instance is None:
+            self.__problem_instance = ProblemInstance(*self.__problem_lists)
+            self.__problem_lists = None
+        return self.__problem_instance
+
+    @problem_instance.setter
+    def problem_instance(self, problem_instance: ProblemInstance):
+        self.__problem_instance = problem_instance
+
+    @classmethod
+    def from_instance(cls, problem_instance: ProblemInstance, weights: dict = None, waypoints: dict = None,
+                      **kwargs):
+        """ Creates the algorithm for a ProblemInstance; the node, link and demand lists are derived from it """
+        if waypoints is not None:
+            kwargs["waypoints"] = waypoints
+        return cls(nodes=problem_instance.get_nodes(), links=problem_instance.get_links(),
+                   demands=problem_instance.get_demands(), weights=weights, problem_instance=problem_instance,
+                   **kwargs)
 
     @abstractmethod
     def solve(self) -> dict:
@@ -33,6 +67,41 @@ class GenericSR:
         """
         raise Exception("method not implemented")
 
+    def set_demands(self, demands: list):
+        """
+        Replaces the demands for the next call of solve; the topology (and weights) dependent state is kept
+        :param demands: list of demands with: [(src, dst, demand), ...] or a demand array (see demand.demand_array)
+        """
+        raise Exception("method not implemented")
+
+    def solve_many(self, demand_sets):
+        """
+        Solves the problem for each demand set (same topology, weights, waypoints and parameters); the topology
+        dependent precomputation is done once. The solutions are returned per sample (generator); each solution contains
+        the wall clock time of its sample (set_demands and solve) as "sample_time"
+        :param demand_sets: iterable of demands (as in the constructor)
+        """
+        for demands in demand_sets:
+            t_start = time.time()
+            self.__replace_demands(demands)
+            self.set_demands(demands)
+            solution = self.solve()
+            sample_time = time.time() - t_start
+            # algorithms with one solution per step (e.g. kwpo_jointheur) return a list of solutions
+            for step_solution in (solution if type(solution) is list else [solution]):
+                step_solution["sample_time"] = sample_time
+            yield solution
+
+    def __replace_demands(self, demands):
+        """ Replaces the demands of the problem instance (or lists); set_demands replaces the algorithm's demands """
+        assert type(demands) is list or is_demand_array(demands), \
+            f"Error {self.get_name()}: demands must be a list with [(src, dst, demand), ...] or a demand array"
+        if self.__problem_instance is not None:
+            self.__problem_instance = self.__problem_instance.with_demands(demands)
+        else:
+            self.__problem_lists = self.__problem_lists[:2] + (demands,)
+        return
+
     @abstractmethod
     def get_name(self) -> str:
         raise Exception("method not implemented")
@@ -0,0 +1,179 @@
+"""
+Immutable, array-backed problem instance (topology and demands) that is built once and shared by all algorithms.
+The links are stored by link_id (as in the algorithms: the order of the first occurrence of (u,v), the capacity of
+the last one, i.e., the same as {(u, v): c for u, v, c in links}). All arrays are read-only:
+    link_src, link_dst, capacities: per link_id
+    out_ptr, out_link_ids: CSR adjacency; the outgoing links of node u are out_link_ids[out_ptr[u]:out_ptr[u + 1]]
+    in_ptr, in_link_ids: CSR adjacency of the incoming links
+    reverse_link_ids: link_id of (v,u) for link (u,v); -1 if there is no reverse link
+    demands: demand array (see demand.demand_array)
+The list based signatures of the algorithms are adapters: get_nodes, get_links and get_demands return the lists.
+"""
+
+import hashlib
+import types
+
+import numpy as np
+
+from demand.demand_array import from_demand_list, is_demand_array, to_demand_list
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    """ Marks the array as read-only """
+    array.flags.writeable = False
+    return array
+
+
+def _get_csr(n: int, nodes_of_links: np.ndarray):
+    """ Returns (ptr, link_ids) with the link_ids of node x in link_ids[ptr[x]:ptr[x + 1]] (ordered by link_id) """
+    ptr = np.zeros(n + 1, np.int64)
+    np.cumsum(np.bincount(nodes_of_links, minlength=n), out=ptr[1:])
+    return _read_only(ptr), _read_only(np.argsort(nodes_of_links, kind="stable").astype(np.int64))
+
+
+class ProblemInstance:
+    def __init__(self, nodes: list, links: list, demands):
+        """
+        :param nodes: list of node indices [0, ..., n-1]
+        :param links: list of links with: [(u, v, capacity), ...]
+        :param demands: list of demands with: [(src, dst, demand), ...] or a demand array (see demand.demand_array)
+        """
+        self.__n = len(nodes)
+        self.__capacity_dict = types.MappingProxyType({(u, v): c for u, v, c in links})
+        self.__links = tuple(self.__capacity_dict.keys())  # link_id -> (u,v)
+        self.__link_ids = types.MappingProxyType({link: link_id for link_id, link in enumerate(self.__links)})
+
+        self.__link_src = _read_only(np.array([u for u, _ in self.__links], np.int64).reshape(-1))
+        self.__link_dst = _read_only(np.array([v for _, v in self.__links], np.int64).reshape(-1))
+        self.__capacities = _read_only(np.fromiter(self.__capacity_dict.values(), np.float64, len(self.__links)))
+        self.__out_ptr, self.__out_link_ids = _get_csr(self.__n, self.__link_src)
+        self.__in_ptr, self.__in_link_ids = _get_csr(self.__n, self.__link_dst)
+        self.__reverse_link_ids = _read_only(
+            np.array([self.__link_ids.get((v, u), -1) for u, v in self.__links], np.int64).reshape(-1))
+
+        self.__demands = self.__to_demand_array(demands)
+        self.__content_hash = None
+
+    @staticmethod
+    def __to_demand_array(demands) -> np.ndarray:
+        """ Read-only copy of the demands as demand array """
+        if is_demand_array(demands):
+            return _read_only(demands.copy())
+        return _read_only(from_demand_list(demands))
+
+    def with_demands(self, demands) -> "ProblemInstance":
+        """ Returns the instance of the same topology (the arrays are shared) with other demands """
+        instance = object.__new__(ProblemInstance)
+        instance.__dict__.update(self.__dict__)
+        instance.__demands = self.__to_demand_array(demands)
+        instance.__content_hash = None
+        return instance
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for key in ("_ProblemInstance__capacity_dict", "_ProblemInstance__link_ids"):
+            state[key] = dict(state[key])
+        return state
+
+    def __setstate__(self, state):
+        for key in ("_ProblemInstance__capacity_dict", "_ProblemInstance__link_ids"):
+            state[key] = types.MappingProxyType(state[key])
+        for value in state.values():
+            if isinstance(value, np.ndarray):
+                _read_only(value)
+        self.__dict__.update(state)
+
+    @property
+    def n(self) -> int:
+        """ number of nodes """
+        return self.__n
+
+    @property
+    def number_links(self) -> int:
+        """ number of links """
+        return len(self.__links)
+
+    @property
+    def links(self) -> tuple:
+        """ link_id -> (u,v) """
+        return self.__links
+
+    @property
+    def link_ids(self):
+        """ read-only dict with {(u,v): link_id, ..} """
+        return self.__link_ids
+
+    @property
+    def capacity_dict(self):
+        """ read-only dict with {(u,v): capacity, ..} """
+        return self.__capacity_dict
+
+    @property
+    def link_src(self) -> np.ndarray:
+        return self.__link_src
+
+    @property
+    def link_dst(self) -> np.ndarray:
+        return self.__link_dst
+
+    @property
+    def capacities(self) -> np.ndarray:
+        return self.__capacities
+
+    @property
+    def out_ptr(self) -> np.ndarray:
+        return self.__out_ptr
+
+    @property
+    def out_link_ids(self) -> np.ndarray:
+        return self.__out_link_ids
+
+    @property
+    def in_ptr(self) -> np.ndarray:
+        return self.__in_ptr
+
+    @property
+    def in_link_ids(self) -> np.ndarray:
+        return self.__in_link_ids
+
+    @property
+    def reverse_link_ids(self) -> np.ndarray:
+        return self.__reverse_link_ids
+
+    @property
+    def demands(self) -> np.ndarray:
+        return self.__demands
+
+    @property
+    def content_hash(self) -> str:
+        """ SHA-256 of the topology and the demands (equal instances have equal hashes) """
+        if self.__content_hash is None:
+            content = hashlib.sha256()
+            content.update(np.int64(self.__n).tobytes())
+            for array in (self.__link_src, self.__link_dst, self.__capacities):
+                content.update(array.tobytes())
+            content.update(self.__demands.tobytes())
+            self.__content_hash = content.hexdigest()
+        return self.__content_hash
+
+    def __eq__(self, other):
+        return isinstance(other, ProblemInstance) and self.content_hash == other.content_hash
+
+    def __hash__(self):
+        return int(self.content_hash[:16], 16)
+
+    def get_nodes(self) -> list:
+        """ Returns the node list [0, ..., n-1] """
+        return list(range(self.__n))
+
+    def get_links(self) -> list:
+        """ Returns the link list [(u, v, capacity), ...] ordered by link_id """
+        return [(u, v, c) for (u, v), c in zip(self.__links, self.__capacities.tolist())]
+
+    def get_demands(self) -> np.ndarray:
+        """ Returns the demands as demand array; to_demand_list(get_demands()) is the expanded demand list """
+        return self.__demands
+
+    def get_demand_list(self) -> list:
+        """ Returns the (expanded) demand list [(src, dst, demand), ...] """
+        return to_demand_list(self.__demands)
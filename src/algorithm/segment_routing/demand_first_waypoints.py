@@ -8,27 +8,76 @@ import networkit as nk
 import numpy as np
 
 from algorithm.generic_sr import GenericSR
+from algorithm.segment_routing.sp_fraction_map import SPFractionMap, LazySPFractionMap
+from algorithm.segment_routing.utilization_index import UtilizationIndex
+from algorithm.segment_routing.waypoint_scan import lower_bounds, score_touched_links
+from demand.demand_array import to_demand_list
 
+# counters of the waypoint solutions (see DemandsFirstWaypoints.__get_statistics)
+STATISTICS_KEYS = ("pruned_candidates", "evaluated_candidates", "fraction_cache_hits", "fraction_cache_misses")
 
-class DemandsFirstWaypoints(GenericSR):
-    BIG_M = 10 ** 9
 
-    def __init__(self, nodes: list, links: list, demands: list, weights: dict = None, waypoints: dict = None, **kwargs):
-        super().__init__(nodes, links, demands, weights, waypoints)
+def add_statistics(solution: dict, solution_wp: dict):
+    """ Adds the counters of the waypoint solution solution_wp to solution (sum over several waypoint runs) """
+    for key in STATISTICS_KEYS:
+        if key in solution_wp:
+            solution[key] = solution.get(key, 0) + solution_wp[key]
+    return
 
-        # topology info
-        self.__capacities = self.__extract_capacity_dict(links)  # dict with {(u,v):c, ..}
-        self.__links = list(self.__capacities.keys())  # list with [(u,v), ..]
+
+class DemandsFirstWaypoints(GenericSR):
+    BIG_M = 10 ** 9
+    PRECISIONS = {"float64": np.float64, "float32": np.float32}
+    DEFAULT_TIE_TOLERANCE = {"float64": 0., "float32": 1e-6}
+
+    def __init__(self, nodes: list, links: list, demands: list, weights: dict = None, waypoints: dict = None,
+                 batched: bool = True, fraction_cache_size: int = None, sp_fraction_map=None, workers: int = 1,
+                 pruning: bool = True, precision: str = "float64", tie_tolerance: float = None, **kwargs):
+        super().__init__(nodes, links, demands, weights, waypoints, **kwargs)
+
+        # topology info (shared ProblemInstance)
+        problem = self.problem_instance
+        self.__capacities = dict(problem.capacity_dict)  # dict with {(u,v):c, ..}
+        self.__links = list(problem.links)  # list with [(u,v), ..]; maps link_id -> (u,v)
         self.__n = len(nodes)
+        assert precision in self.PRECISIONS, f"precision must be from {list(self.PRECISIONS.keys())}"
+        self.__dtype = self.PRECISIONS[precision]  # dtype of fractions, flows and utilizations
+        # a waypoint is only accepted if it improves the objective by more than the relative tie_tolerance
+        self.__tie_tolerance = tie_tolerance if tie_tolerance is not None else self.DEFAULT_TIE_TOLERANCE[precision]
+        self.__link_src = problem.link_src  # link_id -> u
+        self.__link_dst = problem.link_dst  # link_id -> v
         self.__capacity_map = None
 
         # demand segmentation and aggregate to matrix
         # store all target nodes for Some pairs shortest path algorithm
-        self.__demands = demands
+        # demand arrays are expanded: waypoints are chosen per flow; flows identical to a rejected flow (no improving
+        # waypoint) are skipped in the main loop until a waypoint is accepted (state change)
+        self.__demands = to_demand_list(demands)
 
         # initial weights
         self.__weights = weights if weights else {(u, v): 1. for u, v in self.__links}
 
+        # batched: score all candidate waypoints of a demand in a single vectorized pass
+        self.__batched = batched
+
+        # shortest path fraction map; computed lazily per source/destination tree with a bounded cache (number of
+        # trees) if fraction_cache_size is set, otherwise for all pairs up front. A map of a previous run with the
+        # same links and weights can be reused
+        self.__fraction_cache_size = fraction_cache_size
+        self.__sp_fraction_map = sp_fraction_map
+        self.__cache_counters = (0, 0)  # hits, misses of a lazy map at the start of the run
+
+        # workers > 1: the candidates of a demand are scored by a process pool (requires the complete fraction map)
+        assert workers >= 1, "workers must be positive"
+        assert workers == 1 or fraction_cache_size is None, "the parallel scan requires the complete fraction map"
+        self.__workers = workers
+        self.__parallel_scan = None
+
+        # pruning: candidates with a lower bound >= the current objective are not evaluated
+        self.__pruning = pruning
+        self.__pruned_candidates = 0
+        self.__evaluated_candidates = 0
+
         # networKit graph and some pairs shortest path (SPSP) algorithm
         self.__g = None
         self.__apsp = None
@@ -37,15 +86,9 @@ class DemandsFirstWaypoints(GenericSR):
         self.__init_capacity_map()
         return
 
-    @staticmethod
-    def __extract_capacity_dict(links):
-        """ Converts the list of link/capacities into a capacity dict (compatibility reasons)"""
-        return {(u, v): c for u, v, c in links}
-
     def __init_capacity_map(self):
-        self.__capacity_map = np.ones((self.__n, self.__n), np.float)
-        for u, v in self.__links:
-            self.__capacity_map[u][v] = self.__capacities[u, v]
+        """ Capacities as vector indexed by link_id """
+        self.__capacity_map = self.problem_instance.capacities.astype(self.__dtype)
 
     def __init_graph(self):
         """ Create networKit graph, add weighted edges and create spsp (some pairs shortest path) object """
@@ -59,89 +102,195 @@ class DemandsFirstWaypoints(GenericSR):
         self.__apsp.run()
         return self.__apsp.getDistances()
 
-    def __get_shortest_path_fraction_map(self, distances):
-        link_fraction_map = np.zeros((self.__n, self.__n, self.__n, self.__n), np.float)
-
-        for s in range(self.__n):
-            # iterate over nodes sorted by distance
-            u_map = dict(zip(range(self.__n), np.array(distances[s]).argsort()))
-
-            for t in range(self.__n):
-                if s == t:
-                    continue
-                node_fractions = np.zeros(self.__n, np.float)
-                node_fractions[s] = 1
-
-                for u_idx in range(self.__n - 1):
-                    u = u_map[u_idx]
-                    fraction = node_fractions[u]
-                    if not fraction:
-                        continue
-
-                    successors = list(v for v in self.__g.iterNeighbors(u) if
-                                      self.__weights[(u, v)] == distances[u][t] - distances[v][t])
-
-                    new_fraction = fraction / len(successors)
-                    for v in successors:
-                        link_fraction_map[s][t][u][v] = new_fraction
-                        node_fractions[v] += new_fraction if v != t else 0.
-        return link_fraction_map
+    def __get_shortest_path_fraction_map(self):
+        """ Returns the sparse ECMP fraction map, i.e., for each (s,t) only the links on the shortest path DAG """
+        if self.__sp_fraction_map is None:
+            link_weights = np.array([self.__weights[u, v] for u, v in self.__links], np.float64)
+            if self.__fraction_cache_size is None:
+                self.__sp_fraction_map = SPFractionMap.from_distances(
+                    self.__n, self.__link_src, self.__link_dst, link_weights, self.__compute_distances())
+            else:
+                self.__sp_fraction_map = LazySPFractionMap(
+                    self.__n, self.__link_src, self.__link_dst, link_weights, self.__compute_distances(),
+                    cache_size=self.__fraction_cache_size, dtype=self.__dtype)
+        if isinstance(self.__sp_fraction_map, SPFractionMap):
+            self.__sp_fraction_map = self.__sp_fraction_map.astype(self.__dtype)
+        # start of a run: reset the statistics
+        if isinstance(self.__sp_fraction_map, LazySPFractionMap):
+            self.__cache_counters = (self.__sp_fraction_map.hits, self.__sp_fraction_map.misses)
+        self.__pruned_candidates = 0
+        self.__evaluated_candidates = 0
+        return self.__sp_fraction_map
+
+    def get_sp_fraction_map(self):
+        """ Returns the fraction map of the last run (can be passed to a new instance with the same weights) """
+        return self.__sp_fraction_map
+
+    def __get_statistics(self):
+        """ Returns additional solution entries: pruned/evaluated candidates and the cache hits/misses of this run """
+        statistics = {
+            "pruned_candidates": self.__pruned_candidates,
+            "evaluated_candidates": self.__evaluated_candidates,
+        }
+        if isinstance(self.__sp_fraction_map, LazySPFractionMap):
+            hits, misses = self.__cache_counters
+            statistics["fraction_cache_hits"] = self.__sp_fraction_map.hits - hits
+            statistics["fraction_cache_misses"] = self.__sp_fraction_map.misses - misses
+        return statistics
 
     def __get_flow_map(self, sp_fraction_map):
-        flow_map = np.zeros((self.__n, self.__n), np.float)
-        for s, t, d in self.__demands:
-            flow_map += sp_fraction_map[s][t] * d
+        """ Flow per link as vector indexed by link_id """
+        flow_map = np.zeros(len(self.__links), self.__dtype)
+        if self.__demands:
+            # all pairs at once (one tree per destination of a lazy map); the flows are added in demand order
+            demands = np.array(self.__demands, np.float64)
+            pair_index, link_ids, fractions = sp_fraction_map.pairs(
+                demands[:, 0].astype(np.int64), demands[:, 1].astype(np.int64))
+            np.add.at(flow_map, link_ids, fractions * demands[pair_index, 2].astype(fractions.dtype))
+        if self.__workers > 1:
+            # continue on the flow map in shared memory (Python 3.8+, imported only for workers > 1)
+            from algorithm.segment_routing.waypoint_scan import ParallelWaypointScan
+            self.__parallel_scan = ParallelWaypointScan(self.__workers, sp_fraction_map, self.__capacity_map, flow_map)
+            flow_map = self.__parallel_scan.flow_map
         return flow_map
 
-    def __compute_utilization(self, flow_map):
-        util_map = (flow_map / self.__capacity_map)
-        objective = np.max(util_map)
-        return util_map, objective
+    def __stop_parallel_scan(self):
+        """ Stops the worker processes of the parallel scan (if any) """
+        if self.__parallel_scan is not None:
+            self.__parallel_scan.close()
+            self.__parallel_scan = None
 
-    def __update_flow_map(self, sp_fraction_map, flow_map, s, t, d, waypoint):
-        new_flow_map = flow_map - sp_fraction_map[s][t] * d
-        new_flow_map += sp_fraction_map[s][waypoint] * d
-        new_flow_map += sp_fraction_map[waypoint][t] * d
-        return new_flow_map
+    def __compute_utilization(self, flow_map):
+        """ Creates the utilization index over all links; returns the index and the max. utilization """
+        util_index = UtilizationIndex(flow_map / self.__capacity_map)
+        return util_index, float(util_index.max())
+
+    def __update_flow_map(self, sp_fraction_map, flow_map, util_index, s, t, d, waypoint):
+        """ Reroutes demand (s,t,d) over waypoint (in place) and updates the utilization index of touched links """
+        touched = list()
+        for p, q, sign in ((s, t, -1), (s, waypoint, 1), (waypoint, t, 1)):
+            link_ids, fractions = sp_fraction_map.pair(p, q)
+            flow_map[link_ids] += sign * fractions * d
+            touched.append(link_ids)
+        touched = np.unique(np.concatenate(touched))
+        util_index.update(touched, flow_map[touched] / self.__capacity_map[touched])
+        return flow_map, float(util_index.max())
+
+    def __get_loads(self, util_index):
+        """ Returns the link utilization as dict with {(u,v):utilization, ..} """
+        return dict(zip(self.__links, util_index.utilization.tolist()))
+
+    def __score_waypoints(self, sp_fraction_map, flow_map, util_index, s, t, d, candidates):
+        """
+        Computes the objective of rerouting demand (s,t,d) over each waypoint in candidates (vectorized);
+        only the links touched by the (s,t), (s,w) and (w,t) DAGs are evaluated
+        """
+        if self.__parallel_scan is not None:
+            return self.__parallel_scan.score(s, t, d, candidates, util_index)
+        touched, touched_max = score_touched_links(
+            sp_fraction_map, flow_map, self.__capacity_map, s, t, d, candidates)
+        return np.maximum(touched_max, util_index.max_excluding(touched))
+
+    def __bound_and_score_waypoints(self, sp_fraction_map, flow_map, util_index, threshold, s, t, d, candidates):
+        """
+        Like __score_waypoints, but candidates that cannot be accepted (lower bound >= threshold) are pruned; their
+        lower bound is returned instead of the objective
+        """
+        candidates = np.asarray(candidates, np.int64)
+        if not self.__pruning:
+            self.__evaluated_candidates += len(candidates)
+            return self.__score_waypoints(sp_fraction_map, flow_map, util_index, s, t, d, candidates)
+
+        objectives = lower_bounds(sp_fraction_map, flow_map, self.__capacity_map, util_index, s, t, d, candidates)
+        evaluate = np.flatnonzero(objectives < threshold)
+        self.__pruned_candidates += len(candidates) - len(evaluate)
+        self.__evaluated_candidates += len(evaluate)
+        if len(evaluate):
+            objectives[evaluate] = self.__score_waypoints(
+                sp_fraction_map, flow_map, util_index, s, t, d, candidates[evaluate])
+        return objectives
+
+    def __get_threshold(self, objective):
+        """ A new objective is accepted if it is below the threshold """
+        return objective * (1 - self.__tie_tolerance)
+
+    def __choose_waypoint(self, sp_fraction_map, flow_map, util_index, objective, s, t, d, candidates):
+        """
+        Tries the waypoints in candidates (in the given order) for demand (s,t,d); a waypoint is accepted if it
+        improves the current objective (by more than the tie tolerance) and following candidates are compared to
+        the accepted solution
+        :return: best_waypoint (None if no improvement), flow_map, objective
+        """
+        best_waypoint = None
+        if not self.__batched:
+            for waypoint in candidates:
+                threshold = self.__get_threshold(objective)
+                new_objective = self.__bound_and_score_waypoints(
+                    sp_fraction_map, flow_map, util_index, threshold, s, t, d, np.array([waypoint]))[0]
+                if new_objective < threshold:
+                    flow_map, objective = self.__update_flow_map(
+                        sp_fraction_map, flow_map, util_index, s, t, d, waypoint)
+                    best_waypoint = waypoint
+            return best_waypoint, flow_map, objective
+
+        # batched: score the remaining candidates against the current solution, accept the first improving one
+        # and repeat for the candidates after it; this yields the same choice as the sequential procedure
+        remaining = np.array(candidates, np.int64)
+        while len(remaining):
+            threshold = self.__get_threshold(objective)
+            objectives = self.__bound_and_score_waypoints(
+                sp_fraction_map, flow_map, util_index, threshold, s, t, d, remaining)
+            improving = np.flatnonzero(objectives < threshold)
+            if not len(improving):
+                break
+            idx = improving[0]
+            best_waypoint = int(remaining[idx])
+            flow_map, objective = self.__update_flow_map(
+                sp_fraction_map, flow_map, util_index, s, t, d, best_waypoint)
+            remaining = remaining[idx + 1:]
+        return best_waypoint, flow_map, objective
 
     def __demands_first_waypoints(self):
         """ main procedure """
-        distances = self.__compute_distances()
-        sp_fraction_map = self.__get_shortest_path_fraction_map(distances)
+        sp_fraction_map = self.__get_shortest_path_fraction_map()
         best_flow_map = self.__get_flow_map(sp_fraction_map)
-        best_util_map, best_objective = self.__compute_utilization(best_flow_map)
+        util_index, best_objective = self.__compute_utilization(best_flow_map)
 
         waypoints = dict()
+        rejected_demands = set()  # demands without improving waypoint; no state change since their rejection
         sorted_demand_idx_map = dict(zip(range(len(self.__demands)), np.array(self.__demands)[:, 2].argsort()[::-1]))
         for d_map_idx in range(len(self.__demands)):
             d_idx = sorted_demand_idx_map[d_map_idx]
             s, t, d = self.__demands[d_idx]
-            best_waypoint = None
-            for waypoint in range(self.__n):
-                if waypoint == s or waypoint == t:
-                    continue
-                flow_map = self.__update_flow_map(sp_fraction_map, best_flow_map, s, t, d, waypoint)
-                util_map, objective = self.__compute_utilization(flow_map)
-
-                if objective < best_objective:
-                    best_flow_map = flow_map
-                    best_util_map = util_map
-                    best_objective = objective
-                    best_waypoint = waypoint
+            if (s, t, d) in rejected_demands:
+                # identical flow in the identical state: no improving waypoint either
+                waypoints[d_idx] = [(s, t)]
+                continue
+            candidates = [waypoint for waypoint in range(self.__n) if waypoint != s and waypoint != t]
+            best_waypoint, best_flow_map, best_objective = self.__choose_waypoint(
+                sp_fraction_map, best_flow_map, util_index, best_objective, s, t, d, candidates)
 
             if best_waypoint is not None:
                 waypoints[d_idx] = [(s, best_waypoint), (best_waypoint, t)]
+                rejected_demands.clear()
             else:
                 waypoints[d_idx] = [(s, t)]
-        loads = {(u, v): best_util_map[u][v] for u, v, in self.__links}
+                rejected_demands.add((s, t, d))
+        loads = self.__get_loads(util_index)
         return loads, waypoints, best_objective
 
+    def set_demands(self, demands: list):
+        """ Replaces the demands; the graph, capacities and the shortest path fraction map are kept """
+        self.__demands = to_demand_list(demands)
+        return
+
     def solve(self) -> dict:
         """ compute solution """
 
         self.__start_time = t_start = time.time()  # sys wide time
         pt_start = time.process_time()  # count process time (e.g. sleep excluded and count per core)
         loads, waypoints, objective = self.__demands_first_waypoints()
+        self.__stop_parallel_scan()
         pt_duration = time.process_time() - pt_start
         t_duration = time.time() - t_start
 
@@ -153,6 +302,7 @@ class DemandsFirstWaypoints(GenericSR):
             "weights": self.__weights,
             "loads": loads,
         }
+        solution.update(self.__get_statistics())
 
         return solution
 
@@ -0,0 +1,99 @@
+"""
+Some pairs shortest path (SPSP) for integer link weights in [0, max_weight] with Dial's bucket queue:
+    R. B. Dial. Algorithm 360: Shortest-path forest with topological ordering. Commun. ACM, 12(11):632–633, 1969.
+The distances from all nodes to all targets are computed at once: the queue has max_weight + 1 circular buckets and a
+bucket holds (tree, node) entries of all shortest path trees with the same tentative distance. All entries of a bucket
+are settled and their incoming links are relaxed with vectorized NumPy operations. Links with weight 0 add entries to
+the current bucket, which is settled again. The distances of the non-empty buckets are kept in a heap, i.e., empty
+buckets are skipped (large weights). The distances are written into a (T x n) NumPy array (no conversion of nested
+lists). Unreachable nodes have the distance UNREACHABLE (as in networKit).
+"""
+
+import heapq
+
+import numpy as np
+
+from algorithm.segment_routing.dynamic_spsp import UNREACHABLE
+
+
+class DialSPSP:
+    def __init__(self, n: int, links: list, targets: list, max_weight: int):
+        """
+        :param n: number of nodes
+        :param links: list with [(u,v), ..]; maps link_id -> (u,v)
+        :param targets: list of target nodes; row t_idx of the distances belongs to targets[t_idx]
+        :param max_weight: upper bound of the (integer) link weights
+        """
+        self.__n = n
+        self.__targets = np.array(targets, np.int64)
+        self.__number_buckets = int(max_weight) + 1
+
+        # incoming links per node (CSR): the links (y, x) of node x are in_link_ids[in_ptr[x]:in_ptr[x + 1]]
+        link_dst = np.array([v for _, v in links], np.int64)
+        self.__in_link_ids = np.argsort(link_dst, kind="stable")
+        self.__in_ptr = np.zeros(n + 1, np.int64)
+        np.cumsum(np.bincount(link_dst, minlength=n), out=self.__in_ptr[1:])
+        self.__link_src = np.array([u for u, _ in links], np.int64)
+
+    def get_distances(self, weights: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Computes the distances for the given weights
+        :param weights: integer weight per link_id in [0, max_weight]
+        :param out: (optional) preallocated (T x n) float64 array for the distances
+        :return: array with distances[t_idx][x]
+        """
+        number_targets = len(self.__targets)
+        distances = out if out is not None else np.empty((number_targets, self.__n), np.float64)
+        distances.fill(UNREACHABLE)
+        # integer distances during the search; n * max_weight is larger than any finite distance
+        unreachable = self.__n * self.__number_buckets
+        int_distances = np.full(number_targets * self.__n, unreachable, np.int64)
+        link_weights = np.asarray(weights, np.int64)[self.__in_link_ids]
+
+        # circular buckets with flat indices (t_idx * n + x) of the entries
+        buckets = [list() for _ in range(self.__number_buckets)]
+        entries = np.arange(number_targets, dtype=np.int64) * self.__n + self.__targets
+        int_distances[entries] = 0
+        buckets[0].append(entries)
+        pending = [0]  # heap with the distances of the non-empty buckets
+
+        while pending:
+            distance = heapq.heappop(pending)
+            bucket = buckets[distance % self.__number_buckets]
+            entries = np.unique(np.concatenate(bucket))
+            bucket.clear()
+            # skip entries that were improved after they were added
+            entries = entries[int_distances[entries] == distance]
+            if len(entries):
+                self.__relax(entries, distance, int_distances, link_weights, buckets, pending)
+
+        reached = int_distances < unreachable
+        distances.reshape(-1)[reached] = int_distances[reached]
+        return distances
+
+    def __relax(self, entries, distance, int_distances, link_weights, buckets, pending):
+        """ Relaxes the incoming links of the settled entries; the distances of new non-empty buckets go to pending """
+        t_offsets, x = np.divmod(entries, self.__n)
+        t_offsets *= self.__n
+        starts, counts = self.__in_ptr[x], self.__in_ptr[x + 1] - self.__in_ptr[x]
+        total = int(counts.sum())
+        if not total:
+            return
+        # positions of all incoming links of the entries in the CSR arrays
+        positions = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(total)
+        candidates = np.repeat(t_offsets, counts) + self.__link_src[self.__in_link_ids[positions]]
+        new_distances = distance + link_weights[positions]
+
+        improved = new_distances < int_distances[candidates]
+        candidates, new_distances = candidates[improved], new_distances[improved]
+        np.minimum.at(int_distances, candidates, new_distances)
+        # add each improved entry to the bucket of its final tentative distance
+        improved = int_distances[candidates] == new_distances
+        candidates, new_distances = candidates[improved], new_distances[improved]
+
+        for new_distance in np.unique(new_distances).tolist():
+            bucket = buckets[new_distance % self.__number_buckets]
+            if not bucket:
+                heapq.heappush(pending, new_distance)
+            bucket.append(candidates[new_distances == new_distance])
+        return
@@ -0,0 +1,120 @@
+"""
+Dynamic some pairs shortest path (SPSP): distances from all nodes to a fixed set of targets under link weight changes.
+This is not a node level repair (e.g., Ramalingam and Reps): after a change of a few link weights, the trees (targets)
+that are affected by the changed links are recomputed as a whole and all other trees keep their distances.
+A tree is affected by an increased link only if the link is on its shortest path DAG (tight) and by a decreased link
+only if the link shortens the distance of its tail. The affected trees are recomputed with networKit (the graph
+weights are updated only for the changed links); if more than max_affected_fraction of the trees are affected, all
+trees are recomputed. A node level repair in Python (vectorized over the trees) was slower than the networKit
+recomputation for the topology sizes used here. The saving depends on the number of affected trees, a change of the
+links of a node x affects all trees with a shortest path over x.
+Unreachable nodes have the distance UNREACHABLE (as in networKit).
+"""
+
+import networkit as nk
+import numpy as np
+
+UNREACHABLE = np.finfo(np.float64).max
+
+
+def get_spsp_distances(spsp) -> np.ndarray:
+    """ Returns the distances of a networKit SPSP as (T x n) array; without nested lists if networKit supports it """
+    try:
+        return spsp.getDistances(asarray=True)
+    except TypeError:
+        return np.array(spsp.getDistances(), np.float64)
+
+
+class DynamicSPSP:
+    def __init__(self, n: int, links: list, targets: list, max_affected_fraction: float = 0.8):
+        """
+        :param n: number of nodes
+        :param links: list with [(u,v), ..]; maps link_id -> (u,v)
+        :param targets: list of target nodes; row t_idx of the distances belongs to targets[t_idx]
+        :param max_affected_fraction: all trees are recomputed if more than this fraction of the trees is affected
+        """
+        self.__links = links
+        self.__targets = targets
+        self.__link_src = np.array([u for u, _ in links], np.int64)
+        self.__link_dst = np.array([v for _, v in links], np.int64)
+        self.__max_affected = int(max_affected_fraction * len(targets))
+
+        # reversed networKit graph: distance from t to x equals distance from x to t
+        self.__g = nk.Graph(weighted=True, directed=True, n=n)
+        for u, v in links:
+            self.__g.addEdge(v, u, 1)
+        self.__spsp = nk.distance.SPSP(self.__g, sources=targets)
+        # SPSP.setSources is not available in older networKit versions: a new SPSP is created for other sources
+        self.__set_sources = hasattr(self.__spsp, "setSources")
+
+        # current state: weights per link_id and distances[t_idx][x]
+        self.__weights = None
+        self.__distances = None
+
+        # statistics
+        self.full_updates = 0
+        self.dynamic_updates = 0
+        self.repaired_trees = 0
+
+    def get_distances(self, weights: np.ndarray) -> np.ndarray:
+        """
+        Returns the distances for the given weights as array with distances[t_idx][x] (do not modify); the array of
+        a previous call stays valid
+        :param weights: weight per link_id
+        """
+        new_weights = np.array(weights, np.float64)
+        if self.__weights is None:
+            self.__set_weights(new_weights, range(len(self.__links)))
+            self.__recompute(range(len(self.__targets)))
+            return self.__distances
+
+        changed = np.flatnonzero(new_weights != self.__weights)
+        if len(changed):
+            affected = self.__get_affected(new_weights, changed)
+            self.__set_weights(new_weights, changed)
+            self.__recompute(affected)
+        return self.__distances
+
+    def __get_affected(self, new_weights, changed) -> np.ndarray:
+        """ Returns the indices of the targets whose distances may change by the changed links """
+        old_weights = self.__weights
+        distances = self.__distances
+        increased = changed[new_weights[changed] > old_weights[changed]]
+        decreased = changed[new_weights[changed] < old_weights[changed]]
+
+        src, dst = self.__link_src[increased], self.__link_dst[increased]
+        tight = (distances[:, src] == old_weights[increased] + distances[:, dst]) & (distances[:, dst] < UNREACHABLE)
+        src, dst = self.__link_src[decreased], self.__link_dst[decreased]
+        shorter = (new_weights[decreased] + distances[:, dst] < distances[:, src]) & (distances[:, dst] < UNREACHABLE)
+        return np.flatnonzero(np.any(tight, axis=1) | np.any(shorter, axis=1))
+
+    def __set_weights(self, weights, link_ids):
+        """ Sets the weights of link_ids in the networKit graph """
+        for link_id in link_ids:
+            u, v = self.__links[link_id]
+            self.__g.setWeight(v, u, weights[link_id])
+        self.__weights = weights
+
+    def __recompute(self, affected):
+        """ Recomputes the shortest path trees of the affected target indices """
+        if len(affected) > self.__max_affected:
+            self.__distances = self.__run_spsp(self.__targets)
+            self.full_updates += 1
+            return
+
+        self.dynamic_updates += 1
+        if not len(affected):
+            return
+        distances = self.__distances.copy()
+        distances[affected] = self.__run_spsp([self.__targets[t_idx] for t_idx in affected])
+        self.__distances = distances
+        self.repaired_trees += len(affected)
+
+    def __run_spsp(self, sources) -> np.ndarray:
+        """ Runs the SPSP from the sources (targets in the reversed graph) and returns the distances """
+        if self.__set_sources:
+            self.__spsp.setSources(sources)
+        else:
+            self.__spsp = nk.distance.SPSP(self.__g, sources=sources)
+        self.__spsp.run()
+        return get_spsp_distances(self.__spsp)
@@ -0,0 +1,121 @@
+"""
+Link loads of shortest path routing with equal splitting (ECMP) for a weight setting, as used by HeurOSPF.
+The distances to all targets are given as (T x n) array. The arcs on the shortest path DAGs towards all targets are
+marked with one vectorized comparison over the link id arrays (T x m). The flow is then pushed from the farthest node
+towards the target, for all targets at once: in step k, the k-th farthest node y of each target splits its demand to
+the target plus its incoming flow equally over its outgoing DAG arcs. The flow per link is accumulated in an m-length
+array per target (T x m).
+The floating point operations are the same as for the former per-target implementation with an n x n flow matrix
+(the incoming flow of a node is summed with np.sum over a node indexed vector, the targets are summed in their order),
+i.e., the loads are identical.
+"""
+
+import numpy as np
+
+from algorithm.segment_routing.dynamic_spsp import DynamicSPSP
+
+
+def get_padded_link_ids(n: int, nodes: np.ndarray) -> np.ndarray:
+    """ Returns an (n x max. degree) array with the ids of the links with nodes[link_id] == node per node; -1 pads """
+    degrees = np.bincount(nodes, minlength=n)
+    padded = np.full((n, max(int(degrees.max(initial=0)), 1)), -1, np.int64)
+    link_ids = np.argsort(nodes, kind='stable')
+    offsets = np.arange(len(nodes)) - np.repeat(np.cumsum(degrees) - degrees, degrees)
+    padded[nodes[link_ids], offsets] = link_ids
+    return padded
+
+
+class ECMPLoads:
+    def __init__(self, n: int, links: list, targets: list, demand_matrix: dict):
+        """
+        :param n: number of nodes
+        :param links: list with [(u,v), ..]; maps link_id -> (u,v)
+        :param targets: list of target nodes; row t_idx of the distances belongs to targets[t_idx]
+        :param demand_matrix: dict with {(s,t): d, ..}; all t must be in targets
+        """
+        self.__n = n
+        self.__links = links
+        self.__link_src = np.array([u for u, _ in links], np.int64)
+        self.__link_dst = np.array([v for _, v in links], np.int64)
+
+        # outgoing and incoming link ids per node (padded with -1)
+        self.__out_links = get_padded_link_ids(n, self.__link_src)
+        self.__in_links = get_padded_link_ids(n, self.__link_dst)
+
+        # demand to targets[t_idx] per source node
+        t_indices = {t: t_idx for t_idx, t in enumerate(targets)}
+        self.__demands_to = np.zeros((len(targets), n), np.float64)
+        for (s, t), d in demand_matrix.items():
+            self.__demands_to[t_indices[t], s] = d
+
+    def get_flows(self, weights: np.ndarray, distances) -> np.ndarray:
+        """
+        Computes the flow per link id
+        :param weights: weight per link id
+        :param distances: distances[t_idx][x] from x to targets[t_idx]
+        :return: array with flow per link id
+        """
+        distances = np.asarray(distances, np.float64)
+        flows = np.zeros(len(self.__links), np.float64)
+        if not len(self.__demands_to):
+            return flows
+        # each link gets at most one value per target, so the sum is the same as in the order of the targets
+        for target_flows in self.__get_target_flows(weights, distances):
+            flows += target_flows
+        return flows
+
+    def __get_target_flows(self, weights, distances) -> np.ndarray:
+        """ Pushes the demands to all targets along their shortest path DAGs; returns the (T x m) flow per link """
+        n, number_targets = self.__n, len(self.__demands_to)
+        on_dag = weights == distances[:, self.__link_src] - distances[:, self.__link_dst]
+        rows = np.arange(number_targets)
+        out_degrees = np.zeros((number_targets, n), np.int64)
+        dag_targets, dag_links = np.nonzero(on_dag)
+        np.add.at(out_degrees, (dag_targets, self.__link_src[dag_links]), 1)
+        target_flows = np.zeros((number_targets, len(self.__links)), np.float64)
+
+        # decreasing distance (the target with distance 0 is the last node and receives only)
+        order = np.argsort(distances, axis=1)[:, :0:-1]
+        for y in order.T:
+            # incoming flow of y in a node indexed vector (non-DAG links carry no flow)
+            in_links = self.__in_links[y]
+            in_rows, in_columns = np.nonzero(in_links >= 0)
+            in_links = in_links[in_rows, in_columns]
+            node_flows = np.zeros((number_targets, n), np.float64)
+            node_flows[in_rows, self.__link_src[in_links]] = target_flows[in_rows, in_links]
+            acc_demands_to_t = self.__demands_to[rows, y] + np.sum(node_flows, axis=1)
+
+            degrees = out_degrees[rows, y]
+            active = (acc_demands_to_t > 0) & (degrees > 0)
+            if not active.any():
+                continue
+            flows = acc_demands_to_t[active] / degrees[active]
+            out_links = self.__out_links[y[active]]
+            out_rows, out_columns = np.nonzero(out_links >= 0)
+            out_links = out_links[out_rows, out_columns]
+            targets = rows[active][out_rows]
+            dag = on_dag[targets, out_links]
+            target_flows[targets[dag], out_links[dag]] = flows[out_rows[dag]]
+        return target_flows
+
+
+def ecmp_loads(n: int, links: list, weights: dict, demands: list) -> dict:
+    """
+    Computes the link utilization of ECMP routing for a weight setting
+    :param n: number of nodes
+    :param links: list with [(u,v,c), ..]
+    :param weights: dict with {(u,v): w, ..}
+    :param demands: list with [(s,t,d), ..]
+    :return: dict with {(u,v): utilization, ..}
+    """
+    capacities = {(u, v): c for u, v, c in links}
+    links = list(capacities.keys())
+    demand_matrix = dict()
+    for s, t, d in demands:
+        demand_matrix[s, t] = demand_matrix.get((s, t), 0) + d
+    targets = sorted({t for _, t in demand_matrix})
+
+    weights = np.fromiter((weights[link] for link in links), np.float64, len(links))
+    distances = DynamicSPSP(n, links, targets).get_distances(weights)
+    flows = ECMPLoads(n, links, targets, demand_matrix).get_flows(weights, distances)
+    return {link: flow / capacities[link] for link, flow in zip(links, flows.tolist())}
@@ -5,33 +5,57 @@ import time
 import networkx as nx
 
 from algorithm.generic_sr import GenericSR
+from algorithm.segment_routing.routing_matrix import RoutingMatrix
+from algorithm.segment_routing.shortest_path_dag import ShortestPathDAGs
 from algorithm.segment_routing.sr_utility import SRUtility
+from demand.demand_array import to_demand_list
 
 
 class EqualSplitShortestPath(GenericSR):
     def __init__(self, nodes: list, links: list, demands: list, weights: dict = None, waypoints: dict = None,
-                 split: bool = True, **kwargs):
-        super().__init__(nodes, links, demands, weights, waypoints)
+                 split: bool = True, split_mode: str = "path", routing_matrix: RoutingMatrix = None, **kwargs):
+        super().__init__(nodes, links, demands, weights, waypoints, **kwargs)
 
         self.__nodes = nodes
-        self.__links = links  # list with [(i,j,c)]
-        if waypoints is not None:
-            segmented_demands = SRUtility.get_segmented_demands(waypoints, demands)
-            self.__demands = {idx: (s, t, d) for idx, (s, t, d) in enumerate(segmented_demands)}  # dict {idx:(s,t,d)}
-            self.__segments = waypoints  # dict with {idx:(p,q)}
-        else:
-            self.__demands = {idx: (s, t, d) for idx, (s, t, d) in enumerate(demands)}
-            self.__segments = {idx: [(p, q)] for idx, (p, q, _) in enumerate(demands)}
+        # topology info (shared ProblemInstance): link list with [(i,j,c)] ordered by link_id
+        self.__links = self.problem_instance.get_links()
+        self.__waypoints = waypoints
+        self.__demands = None  # dict {idx:(s,t,d)}
+        self.__segments = None  # dict with {idx:(p,q)}
 
-        self.__weights = weights if weights else {(i, j): 1 for i, j, _ in links}
+        self.__weights = weights if weights else {(i, j): 1 for i, j, _ in self.__links}
 
         self.__split = split
+        # 'path': equal split over all shortest paths, 'hop': equal split over the next hops (ECMP)
+        assert split_mode in ["path", "hop"], f"unknown split mode {split_mode}"
+        self.__split_mode = split_mode
+        # (optional) compiled routing matrix of the same weights; the loads are computed with one matrix product
+        if routing_matrix is not None:
+            assert split and routing_matrix.split_mode == split_mode, "routing matrix has a different split mode"
+            assert routing_matrix.weights == self.__weights, "routing matrix has different weights"
+        self.__routing_matrix = routing_matrix
         self.__all_shortest_paths_generators = dict()
         self.__all_shortest_paths = dict()
         self.__nx_graph = nx.DiGraph()
+        self.__dags = None  # shortest path DAGs of the fixed weights; set_demands only resets the flows
         self.__flow_sum = dict()
 
         self.__create_nx_graph()
+        self.set_demands(demands)
+        return
+
+    def set_demands(self, demands: list):
+        """ Replaces the demands (segmented by the waypoints); the graph and the shortest path DAGs are kept """
+        # demand arrays are expanded; the identical flows of a row are consecutive and routed at once over the
+        # shortest path DAGs (see ShortestPathDAGs.add_per_path_flows), i.e., the loads equal the ones of the list
+        demands = to_demand_list(demands)
+        if self.__waypoints is not None:
+            segmented_demands = SRUtility.get_segmented_demands(self.__waypoints, demands)
+            self.__demands = {idx: (s, t, d) for idx, (s, t, d) in enumerate(segmented_demands)}
+            self.__segments = self.__waypoints
+        else:
+            self.__demands = {idx: (s, t, d) for idx, (s, t, d) in enumerate(demands)}
+            self.__segments = {idx: [(p, q)] for idx, (p, q, _) in enumerate(demands)}
         self.__init_flow_sum_map()
         return
 
@@ -42,10 +66,9 @@ class EqualSplitShortestPath(GenericSR):
         return
 
     def __get_all_shortest_paths_generator(self):
-        for s in self.__nx_graph.nodes:
-            for t in self.__nx_graph.nodes:
-                if s == t:
-                    continue
+        """ Creates the shortest path generators only for the (segment) pairs that carry demand """
+        for s, t, _ in self.__demands.values():
+            if (s, t) not in self.__all_shortest_paths_generators:
                 self.__all_shortest_paths_generators[s, t] = nx.all_shortest_paths(
                     self.__nx_graph, source=s, target=t, weight='weight')
         return
@@ -64,18 +87,34 @@ class EqualSplitShortestPath(GenericSR):
         return
 
     def __add_demand_update_objective(self, src, dst, demand):
+        if not self.__split:
+            # take first shortest path if multiple
+            if (src, dst) not in self.__all_shortest_paths:
+                self.__all_shortest_paths[src, dst] = [next(self.__all_shortest_paths_generators[src, dst])]
+            self.__add_demand_val_to_path(self.__all_shortest_paths[src, dst][0], demand)
+            return
+
         if (src, dst) not in self.__all_shortest_paths:
             self.__all_shortest_paths[src, dst] = list(self.__all_shortest_paths_generators[src, dst])
+        n_splits = len(self.__all_shortest_paths[src, dst])
+        split_demand = demand / n_splits
+        for shortest_path in self.__all_shortest_paths[src, dst]:
+            self.__add_demand_val_to_path(shortest_path, split_demand)
+        return
 
-        if self.__split:
-            n_splits = len(self.__all_shortest_paths[src, dst])
-            split_demand = demand / n_splits
-            for shortest_path in self.__all_shortest_paths[src, dst]:
-                self.__add_demand_val_to_path(shortest_path, split_demand)
+    def __add_demands_on_dags(self):
+        """
+        Propagates all demands over the shortest path DAGs (no enumeration of the shortest paths); the DAGs are
+        computed only for the destinations of the (segmented) demands, one Dijkstra per destination
+        """
+        if self.__dags is None:
+            self.__dags = ShortestPathDAGs(self.__nx_graph, weight='weight')
+        dags = self.__dags
+        demands = [self.__demands[idx] for idx in self.__demands]
+        if self.__split_mode == "path":
+            dags.add_per_path_flows(self.__flow_sum, demands)
         else:
-            # take first shortest path if multiple
-            shortest_path = self.__all_shortest_paths[src, dst][0]
-            self.__add_demand_val_to_path(shortest_path, demand)
+            dags.add_per_hop_flows(self.__flow_sum, demands)
         return
 
     def solve(self) -> dict:
@@ -87,12 +126,23 @@ class EqualSplitShortestPath(GenericSR):
 
         t_start = time.time()  # sys wide time
         pt_start = time.process_time()  # count process time (e.g. sleep excluded)
-        self.__get_all_shortest_paths_generator()
-        for idx in self.__demands:
-            s, t, d = self.__demands[idx]
-            self.__add_demand_update_objective(s, t, d)
+        if self.__routing_matrix is not None:
+            self.__flow_sum = self.__routing_matrix.get_flow_dict([self.__demands[idx] for idx in self.__demands])
+        elif self.__split and all(w > 0 for _, _, w in self.__nx_graph.edges(data='weight')):
+            self.__add_demands_on_dags()
+        else:
+            # zero weights (weights < 1) may yield zero weight cycles; enumerate the shortest paths
+            assert self.__split_mode == "path" or not self.__split, "per hop split requires positive weights"
+            self.__get_all_shortest_paths_generator()
+            for idx in self.__demands:
+                s, t, d = self.__demands[idx]
+                self.__add_demand_update_objective(s, t, d)
         pt_duration = time.process_time() - pt_start
         t_duration = time.time() - t_start
+        return self.__get_solution(t_duration, pt_duration)
+
+    def __get_solution(self, t_duration: float, pt_duration: float) -> dict:
+        """ Solution of the current flows (flow_sum) and segments """
         utilization = {(i, j): self.__flow_sum[i, j] / self.__nx_graph[i][j]["capacity"] for i, j, _ in
                        self.__links}
         solution = {
@@ -105,6 +155,40 @@ class EqualSplitShortestPath(GenericSR):
         }
         return solution
 
+    def solve_many(self, demand_sets):
+        """
+        With routing matrix: the flows of all demand sets are computed with one product of the routing matrix and the
+        demand matrix (batch); the execution_time, process_time and sample_time of a solution are its share of the
+        batch plus the time of its solution dict. Without routing matrix see GenericSR.solve_many
+        """
+        if self.__routing_matrix is None:
+            yield from super().solve_many(demand_sets)
+            return
+
+        t_start = time.time()
+        pt_start = time.process_time()
+        samples = list()  # (segmented demands, segments) per demand set
+        for demands in demand_sets:
+            self._GenericSR__replace_demands(demands)
+            self.set_demands(demands)
+            samples.append(([self.__demands[idx] for idx in self.__demands], self.__segments))
+        if not samples:
+            return
+        flows = self.__routing_matrix.get_flows([sample_demands for sample_demands, _ in samples])
+        t_share = (time.time() - t_start) / len(samples)
+        pt_share = (time.process_time() - pt_start) / len(samples)
+
+        links = [(i, j) for i, j, _ in self.__links]
+        for sample_idx, (_, segments) in enumerate(samples):
+            t_sample = time.time()
+            pt_sample = time.process_time()
+            self.__flow_sum = dict(zip(links, flows[:, sample_idx].tolist()))
+            self.__segments = segments
+            solution = self.__get_solution(t_share + time.time() - t_sample,
+                                           pt_share + time.process_time() - pt_sample)
+            solution["sample_time"] = solution["execution_time"]
+            yield solution
+
     def get_name(self):
         """ returns name of algorithm """
         return f"equal_split_shortest_paths"
@@ -0,0 +1,205 @@
+"""
+Island model for HeurOSPF: several independent HeurOSPFWeights searches (islands) with different seeds and initial
+weights run in separate processes. They share the global hash table (visited weight settings) and every
+exchange_interval iterations each island publishes its best (cost) weights or continues with the best weights
+published by the other islands if these are better.
+All islands stop at one absolute deadline: the time_out of the driver minus COLLECT_TIME for collecting the results;
+each island gets the budget that is left after its process start.
+The shared memory blocks require multiprocessing.shared_memory (Python 3.8+), which is imported on use only, i.e.,
+importing this module (e.g. by the sr_factory) also works on older Python versions.
+"""
+
+import multiprocessing as mp
+import queue
+import random
+import time
+
+import numpy as np
+
+from algorithm.generic_sr import GenericSR
+from algorithm.segment_routing.heur_ospf_weights import HeurOSPFWeights
+from utility import utility
+
+MIN_TIME_OUT = 1e-3  # time_out of an island that starts after the deadline (one iteration)
+
+
+class IslandExchange:
+    def __init__(self, m: int, lock, shm_name: str = None):
+        """
+        Best weights vector and cost of all islands in shared memory
+        :param m: number of links
+        :param lock: lock for the shared best solution
+        :param shm_name: name of the shared memory block; None creates it
+        """
+        from multiprocessing import shared_memory
+        self.__lock = lock
+        self.__shm = shared_memory.SharedMemory(name=shm_name, create=shm_name is None, size=8 * (m + 1))
+        self.__cost = np.ndarray((1,), np.float64, buffer=self.__shm.buf)
+        self.__weights = np.ndarray((m,), np.int64, buffer=self.__shm.buf, offset=8)
+        if shm_name is None:
+            self.__cost[0] = np.inf
+        self.exchanges = 0
+
+    @property
+    def name(self):
+        return self.__shm.name
+
+    def __call__(self, weights: np.ndarray, cost: float):
+        """ Publishes weights if they are the best ones, otherwise returns the best weights if they are better """
+        with self.__lock:
+            self.exchanges += 1
+            if cost < self.__cost[0]:
+                self.__cost[0] = cost
+                self.__weights[:] = weights
+                return None
+            if self.__cost[0] < cost:
+                return self.__weights.copy()
+        return None
+
+    def close(self, unlink: bool = False):
+        """ Releases the shared memory """
+        self.__cost = self.__weights = None
+        self.__shm.close()
+        if unlink:
+            self.__shm.unlink()
+
+
+def _run_island(island_idx: int, seed: int, deadline: float, algorithm_args: tuple, algorithm_kwargs: dict,
+                hashtable_name: str, exchange_args: tuple, results):
+    """ Runs one island (process) until the deadline (time.time()) and puts (island_idx, solution) into results """
+    # remaining budget after the process start (time_out must be positive, otherwise the default time limit is used)
+    time_out = max(deadline - time.time(), MIN_TIME_OUT)
+    random.seed(seed)  # HeurOSPFWeights.__perturb uses the module random
+    from multiprocessing import shared_memory
+    hashtable_shm = shared_memory.SharedMemory(name=hashtable_name)
+    exchange = IslandExchange(*exchange_args)
+    try:
+        hashtable1 = np.ndarray((2 ** algorithm_kwargs["hashtable_size"],), bool, buffer=hashtable_shm.buf)
+        algorithm = HeurOSPFWeights(*algorithm_args, seed=seed, time_out=time_out, hashtable1=hashtable1,
+                                    exchange=exchange, **algorithm_kwargs)
+        solution = algorithm.solve()
+        solution["exchanges"] = exchange.exchanges
+        results.put((island_idx, solution))
+    finally:
+        hashtable1 = None
+        exchange.close()
+        hashtable_shm.close()
+
+
+class HeurOSPFIslands(GenericSR):
+    COLLECT_TIME = 1.  # seconds of the time_out reserved for collecting the island results
+
+    def __init__(self, nodes: list, links: list, demands: list, weights: dict = None, waypoints: dict = None,
+                 islands: int = 4, exchange_interval: int = 10, hashtable_size: int = 16, seed: float = 0,
+                 time_out: int = None, **kwargs):
+        """
+        :param islands: number of independent searches (processes); island i uses seed + i, only island 0 starts with
+            the given weights (all others with random weights)
+        :param exchange_interval: number of iterations between two exchanges of the best weights
+        :param time_out: wall clock time (seconds) of the whole run including the process starts
+        :param kwargs: further arguments for HeurOSPFWeights (e.g. iterations, max_weight)
+        """
+        super().__init__(nodes, links, demands, weights, waypoints, **kwargs)
+        assert islands > 0, "at least one island is required"
+
+        self.__nodes = nodes
+        self.__links = links
+        self.__demands = demands
+        self.__weights = weights
+        self.__waypoints = waypoints
+        self.__islands = islands
+        self.__exchange_interval = exchange_interval
+        self.__l = hashtable_size
+        self.__seed = seed
+        self.__timeout = time_out if time_out else utility.TIME_LIMIT - 10
+        self.__kwargs = kwargs
+
+    def __run_islands(self, deadline: float):
+        """ Starts the islands (running until the deadline) and returns their solutions ordered by island index """
+        from multiprocessing import shared_memory
+        hashtable_shm = shared_memory.SharedMemory(create=True, size=2 ** self.__l)
+        np.ndarray((2 ** self.__l,), bool, buffer=hashtable_shm.buf)[:] = False
+        lock = mp.Lock()
+        exchange = IslandExchange(len(self.__links), lock)
+        results = mp.Queue()
+        processes = list()
+        try:
+            for island_idx in range(self.__islands):
+                algorithm_args = (self.__nodes, self.__links, self.__demands,
+                                  self.__weights if island_idx == 0 else None, self.__waypoints)
+                algorithm_kwargs = dict(self.__kwargs, hashtable_size=self.__l, hash_seed=self.__seed,
+                                        exchange_interval=self.__exchange_interval)
+                process = mp.Process(target=_run_island, args=(
+                    island_idx, self.__seed + island_idx, deadline, algorithm_args, algorithm_kwargs,
+                    hashtable_shm.name, (len(self.__links), lock, exchange.name), results))
+                process.start()
+                processes.append(process)
+
+            solutions = dict()
+            while len(solutions) < len(processes):
+                if not any(process.is_alive() for process in processes) and results.empty():
+                    raise Exception(f"Error {self.get_name()}: an island terminated without a solution")
+                try:
+                    island_idx, solution = results.get(timeout=1)
+                except queue.Empty:
+                    continue
+                solutions[island_idx] = solution
+            for process in processes:
+                process.join()
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            exchange.close(unlink=True)
+            hashtable_shm.close()
+            hashtable_shm.unlink()
+        return [solutions[island_idx] for island_idx in range(self.__islands)]
+
+    def set_demands(self, demands: list):
+        """ Replaces the demands (the islands are created per solve) """
+        self.__demands = demands
+        if self.__kwargs.get("problem_instance") is not None:
+            self.__kwargs["problem_instance"] = self.problem_instance
+        return
+
+    def solve(self) -> dict:
+        """ compute solution """
+        t_start = time.time()  # sys wide time
+        pt_start = time.process_time()
+        # one deadline for all islands: process start and shared memory setup count against the time_out
+        island_solutions = self.__run_islands(t_start + self.__timeout - self.COLLECT_TIME)
+        pt_duration = time.process_time() - pt_start
+        t_duration = time.time() - t_start
+
+        # best max utilization and best cost over all islands (first island on ties)
+        bu_solution = min(island_solutions, key=lambda solution: solution["objective"])
+        bc_solution = min(island_solutions, key=lambda solution: solution["bc_cost"])
+
+        solution = dict()
+        solution["objective"] = bu_solution["objective"]
+        solution["execution_time"] = t_duration
+        solution["process_time"] = pt_duration
+        solution["waypoints"] = self.__waypoints
+        solution["weights"] = bu_solution["weights"]
+        solution["loads"] = bu_solution["loads"]
+        solution["cost"] = bu_solution["cost"]
+
+        # bc := best cost result
+        solution["bc_objective"] = bc_solution["bc_objective"]
+        solution["bc_weights"] = bc_solution["bc_weights"]
+        solution["bc_cost"] = bc_solution["bc_cost"]
+        solution["bc_loads"] = bc_solution["bc_loads"]
+
+        # parameters and per island results
+        solution["islands"] = self.__islands
+        solution["exchange_interval"] = self.__exchange_interval
+        solution["seed"] = self.__seed
+        solution["island_objectives"] = [island_solution["objective"] for island_solution in island_solutions]
+        solution["island_exit_reasons"] = [island_solution["exit_reason"] for island_solution in island_solutions]
+        solution["used_iterations"] = [island_solution["used_iterations"] for island_solution in island_solutions]
+        solution["exchanges"] = sum(island_solution["exchanges"] for island_solution in island_solutions)
+        return solution
+
+    def get_name(self):
+        """ returns name of algorithm """
+        return f"heur_ospf_islands"
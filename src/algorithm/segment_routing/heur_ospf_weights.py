@@ -5,6 +5,8 @@
         832225.
 """
 
+import os
+import pickle
 import random
 import time
 
@@ -12,9 +14,25 @@ import networkit as nk
 import numpy as np
 
 from algorithm.generic_sr import GenericSR
+from algorithm.segment_routing.dial_spsp import DialSPSP
+from algorithm.segment_routing.dynamic_spsp import DynamicSPSP, get_spsp_distances
+from algorithm.segment_routing.ecmp_loads import ECMPLoads
+from algorithm.segment_routing.link_cost import get_cost, update_cost
+from algorithm.segment_routing.parallel_neighborhood import ParallelNeighborhoodEvaluation, get_loads
+from algorithm.segment_routing.shortest_path_dag import repeated_add
 from algorithm.segment_routing.sr_utility import SRUtility
+from demand.demand_array import is_demand_array, to_demand_list
 from utility import utility
 
+# per iteration trace: times are cumulative since the start (wall_time, process_time) or per iteration (spsp_time,
+# loads_time: time for the shortest paths and the load propagation of the cost evaluations in this process);
+# cost/util belong to the weights of the iteration, bc_cost/bu_util to the best solutions so far
+TRACE_DTYPE = np.dtype([
+    ("iteration", np.int64), ("wall_time", np.float64), ("process_time", np.float64), ("sample_size", np.int64),
+    ("cost", np.int64), ("util", np.float64), ("bc_cost", np.int64), ("bu_util", np.float64),
+    ("hash_collisions", np.int64), ("hash_misses", np.int64), ("perturbed", bool), ("spsp_time", np.float64),
+    ("loads_time", np.float64)])
+
 
 class HeurOSPFWeights(GenericSR):
     BIG_M = 10 ** 9
@@ -22,25 +40,32 @@ class HeurOSPFWeights(GenericSR):
     def __init__(self, nodes: list, links: list, demands: list, weights: dict = None, waypoints: dict = None,
                  hashtable_size: int = 16, sec_hashtable_size_multiplier: int = 20, max_weight: int = 20,
                  iterations: int = 50, perturb_it: int = 300, seed: float = 0, time_out: int = None,
-                 limit_not_improved=2500, **kwargs):
-        super().__init__(nodes, links, demands, weights, waypoints)
+                 limit_not_improved=2500, dynamic_spsp: bool = True, workers: int = 1, hashtable1: np.ndarray = None,
+                 hash_seed: float = None, exchange=None, exchange_interval: int = 10, screening_targets: int = 0,
+                 screening_ratio: float = 1., target_util: float = None, spsp_backend: str = "networkit",
+                 checkpoint_path: str = None, checkpoint_interval: int = 10, resume_from: str = None,
+                 trace_callback=None, **kwargs):
+        super().__init__(nodes, links, demands, weights, waypoints, **kwargs)
 
         self.__seed = seed
-        np.random.seed(self.__seed)
 
-        # topology info
-        self.__capacities = self.__extract_capacity_dict(links)  # dict with {(u,v):c, ..}
-        self.__links = list(self.__capacities.keys())  # list with [(u,v), ..]
+        # topology info (shared ProblemInstance)
+        problem = self.problem_instance
+        self.__capacities = dict(problem.capacity_dict)  # dict with {(u,v):c, ..}
+        self.__links = list(problem.links)  # list with [(u,v), ..]; maps link_id -> (u,v)
+        self.__capacity_array = problem.capacities
+        self.__link_ids = dict(problem.link_ids)
         self.__n = len(nodes)
         self.__max_weight = max_weight  # possible values in the weights vector are in [0, 1,..., max_weight]
 
         # demand segmentation and aggregate to matrix
-        # store all target nodes for Some pairs shortest path algorithm
+        # store all target nodes for Some pairs shortest path algorithm (set by set_demands)
         self.__waypoints = waypoints
-        self.__demands, self.__targets = self.__preprocess_demand_segmentation(waypoints, demands)
+        self.__demands, self.__targets = None, None
 
-        # initial weights
-        self.__init_weights = weights
+        # initial weights; the search state is an integer weights vector indexed by link_id, i.e., non-integer initial
+        # weights (e.g., inverse capacity) are rounded to the nearest integer
+        self.__init_weights = self.__round_weights(weights) if weights else weights
 
         # neighborhood search
         self.__iterations = iterations
@@ -51,71 +76,182 @@ class HeurOSPFWeights(GenericSR):
         self.__hash_misses = 0
         self.__l = hashtable_size
         self.__l2 = int(np.log2(len(links) * sec_hashtable_size_multiplier))
-        self.__hashtable1 = None
+        # hashtable1 (optional): shared global hash table of size 2 ** hashtable_size (island model); all searches
+        # sharing it need the same hash_seed
+        self.__hashtable1 = hashtable1
+        self.__shared_hashtable1 = hashtable1 is not None  # a shared table is not reset by set_demands
         self.__hashtable2 = None
+        self.__zobrist_keys = None
+        self.__hash_seed = seed if hash_seed is None else hash_seed
+
+        # island model: every exchange_interval iterations exchange(bc_weights, bc_cost) is called; it returns the
+        # weights vector to continue with (migrant) or None
+        self.__exchange = exchange
+        self.__exchange_interval = exchange_interval
 
         # networKit graph and some pairs shortest path (SPSP) algorithm
+        # dynamic_spsp: recompute only the shortest path trees affected by the changed weights (see DynamicSPSP)
         self.__g = None
         self.__spsp = None
-
-        # for exit criteria (1) timeout; (2) # iterations of no improvement
+        self.__use_dynamic_spsp = dynamic_spsp
+        self.__dynamic_spsp = None
+        # spsp_backend: "networkit" (with dynamic_spsp) or "dial" (bucket queues for the integer weights)
+        assert spsp_backend in ["networkit", "dial"], f"Error {self.get_name()}: unknown spsp_backend {spsp_backend}"
+        self.__spsp_backend = spsp_backend
+        self.__dial_spsp = None
+
+        # computes the link loads (ECMP) from the weights and distances
+        self.__ecmp_loads = None
+        # loads (array) and cost of the last evaluation; the next cost is updated from the changed loads
+        self.__last_loads = None
+        self.__last_cost = None
+
+        # two-stage screening (sequential mode): a neighbor is first evaluated on the screening_targets targets with
+        # the largest demand; the cost of these partial loads is a lower bound of its cost. The neighbor is skipped if
+        # screening_ratio * lower bound > best cost of the exploration (screening_ratio = 1: the same neighbor is
+        # chosen as without screening; > 1: more aggressive)
+        self.__screening_ratio = screening_ratio
+        self.__screening_targets = screening_targets
+        self.__screening_spsp = None
+        self.__screening_loads = None
+        self.__screened = 0
+        self.__screened_out = 0
+
+        # workers > 1: the neighbors of an exploration are evaluated by a process pool (started in solve); the
+        # screening needs the best cost of the neighbors evaluated so far, i.e., it is only used in the sequential mode
+        assert workers <= 1 or screening_targets == 0, \
+            f"Error {self.get_name()}: screening_targets requires workers = 1 (sequential mode)"
+        self.__workers = workers
+        self.__parallel_evaluation = None
+
+        # for exit criteria (1) timeout; (2) # iterations of no improvement; (3) (optional) max. utilization reached
         self.__start_time = None
         self.__timeout = time_out if time_out else utility.TIME_LIMIT - 10
         self.__limit_not_improved = limit_not_improved
+        self.__target_util = target_util
+
+        # checkpoints: every checkpoint_interval iterations the search state is written to checkpoint_path;
+        # resume_from: continues the search from a checkpoint (same trajectory as the uninterrupted run)
+        self.__checkpoint_path = checkpoint_path
+        self.__checkpoint_interval = checkpoint_interval
+        self.__resume_from = resume_from
+
+        # convergence trace (TRACE_DTYPE) with one record per iteration; trace_callback (optional) is called with
+        # each new record
+        self.__trace = None
+        self.__trace_length = 0
+        self.__trace_callback = trace_callback
+        self.__pt_start = None
+        self.__spsp_time = 0
+        self.__loads_time = 0
 
         self.__init_global_hashtable()
         self.__init_secondary_hashtable()
+        self.__init_zobrist_keys()
         self.__init_graph()
+        self.set_demands(demands)
+        return
+
+    def set_demands(self, demands: list):
+        """
+        Replaces the demands and resets the search (hash tables, counters, random seed), i.e., solve returns the same
+        result as a new instance; the topology dependent state (graph, capacities, Zobrist keys) is kept. A shared
+        hashtable1 (island model) is not reset
+        """
+        np.random.seed(self.__seed)
+        self.__demands, self.__targets = self.__preprocess_demand_segmentation(self.__waypoints, demands)
+
+        self.__spsp = nk.distance.SPSP(self.__g, sources=self.__targets)
+        self.__dynamic_spsp = DynamicSPSP(self.__n, self.__links, self.__targets) if self.__use_dynamic_spsp else None
+        if self.__spsp_backend == "dial":
+            weight_bound = self.__max_weight
+            if self.__init_weights:
+                weight_bound = max(weight_bound, max(self.__init_weights.values()))
+            self.__dial_spsp = DialSPSP(self.__n, self.__links, self.__targets, weight_bound)
+        self.__ecmp_loads = ECMPLoads(self.__n, self.__links, self.__targets, self.__demands)
+        self.__last_loads = None
+        self.__last_cost = None
+
+        if self.__screening_targets > 0:
+            screening_targets = self.__get_screening_targets(self.__screening_targets)
+            screening_demands = {(s, t): d for (s, t), d in self.__demands.items() if t in screening_targets}
+            self.__screening_spsp = DynamicSPSP(self.__n, self.__links, screening_targets)
+            self.__screening_loads = ECMPLoads(self.__n, self.__links, screening_targets, screening_demands)
+        self.__screened = 0
+        self.__screened_out = 0
+
+        self.__hash_collision_counter = 0
+        self.__hash_misses = 0
+        if not self.__shared_hashtable1:
+            self.__hashtable1[:] = False
+        self.__hashtable2[:] = False
+        self.__spsp_time = 0
+        self.__loads_time = 0
         return
 
     @staticmethod
     def __preprocess_demand_segmentation(segments, demands):
         """ Prepares input (compatibility reasons) """
         targets = set()
-        demands_prepared = demands
         demand_matrix = dict()
         if segments is not None:
-            demands_prepared = SRUtility.get_segmented_demands(segments, demands)
-            demands_prepared = [(s, t, d) for s, t, d in demands_prepared]
-        for s, t, d in demands_prepared:
+            demands_prepared = SRUtility.get_segmented_demands(segments, to_demand_list(demands))
+            demands_prepared = [(s, t, d, 1) for s, t, d in demands_prepared]
+        elif is_demand_array(demands):
+            demands_prepared = demands.tolist()
+        else:
+            demands_prepared = [(s, t, d, 1) for s, t, d in demands]
+        for s, t, d, multiplicity in demands_prepared:
             targets.add(t)
             if (s, t) not in demand_matrix:
                 demand_matrix[s, t] = 0
-            demand_matrix[s, t] += d
+            # identical flows are added at once (same result as adding them one by one)
+            demand_matrix[s, t] = repeated_add(demand_matrix[s, t], d, multiplicity)
         return demand_matrix, list(targets)
 
-    @staticmethod
-    def __extract_capacity_dict(links):
-        """ Converts the list of link/capacities into a capacity dict (compatibility reasons)"""
-        return {(u, v): c for u, v, c in links}
-
-    @staticmethod
-    def __get_link_cost(link_load):
-        """ Return cost value of a single link load """
-        if link_load >= 2:
-            return int(50000 * link_load)
-        if link_load >= 11 / 10:
-            return int(5000 * link_load)
-        if link_load >= 1:
-            return int(500 * link_load)
-        if link_load >= 9 / 10:
-            return int(70 * link_load)
-        if link_load >= 2 / 3:
-            return int(10 * link_load)
-        if link_load >= 1 / 3:
-            return int(3 * link_load)
-        else:
-            return int(1 * link_load)
+    def __get_screening_targets(self, number_targets: int):
+        """ Returns the number_targets targets with the largest demand (in the order of self.__targets) """
+        demand_to = {t: 0 for t in self.__targets}
+        for (_, t), d in self.__demands.items():
+            demand_to[t] += d
+        largest = set(sorted(self.__targets, key=lambda t: -demand_to[t])[:number_targets])
+        # same order as in the full evaluation: the partial flows are sums of a subset of the same summands
+        return [t for t in self.__targets if t in largest]
+
+    def __init_zobrist_keys(self):
+        """ Draws a random key for each (link_id, weight) from a separate random state (global state is unchanged) """
+        max_weight = self.__max_weight
+        if self.__init_weights:
+            max_weight = max(max_weight, max(self.__init_weights.values()))
+        rnd = np.random.RandomState(self.__hash_seed)
+        self.__zobrist_keys = rnd.randint(2 ** 64, size=(len(self.__links), int(max_weight) + 1),
+                                          dtype=np.uint64).tolist()
+        return
 
-    def __hash(self, weights: tuple):
-        """ Computes hashvalues of a weights vector """
-        hash_val = hash(weights)
+    def __zobrist_hash(self, weights: np.ndarray):
+        """ Computes the Zobrist hash of a weights vector (xor of the keys of all link weights) """
+        hash_val = 0
+        for link_id, weight in enumerate(weights.tolist()):
+            hash_val ^= self.__zobrist_keys[link_id][weight]
+        return hash_val
+
+    def __update_zobrist_hash(self, hash_val: int, weights: np.ndarray, changes: list):
+        """ Returns the Zobrist hash of weights after applying changes [(link_id, new_weight), ..] """
+        for link_id, weight in changes:
+            hash_val ^= self.__zobrist_keys[link_id][weights[link_id]] ^ self.__zobrist_keys[link_id][weight]
+        return hash_val
+
+    def __hash(self, hash_val: int):
+        """ Computes hashvalues (table indices) of a weights vector from its Zobrist hash """
         h1 = hash_val % 2 ** self.__l
         h2 = hash_val % 2 ** self.__l2
         return h1, h2
 
     def __init_global_hashtable(self):
         """ Initializes global hash table used to avoid cycling and recomputation of known results """
+        if self.__hashtable1 is not None:
+            assert len(self.__hashtable1) == 2 ** self.__l, "the shared hash table needs 2 ** hashtable_size entries"
+            return
         self.__hashtable1 = np.zeros((2 ** self.__l), dtype=bool)
         return
 
@@ -128,22 +264,33 @@ class HeurOSPFWeights(GenericSR):
         """ Maps links to randomly chosen weights in the range of [1/4 * max_weight, 3/4 * max_weight] """
         rnd_weights = np.random.randint(
             low=self.__max_weight / 4, high=self.__max_weight * 3 / 4, size=(len(self.__links),))
-        random_weights_dict = dict(zip(self.__links, rnd_weights))
-        return random_weights_dict
+        return rnd_weights.astype(np.int64)
+
+    @staticmethod
+    def __round_weights(weights: dict) -> dict:
+        """ Rounds the weights {(u,v): w, ..} to the nearest integer (round half to even); integers are unchanged """
+        return {link: int(round(w)) for link, w in weights.items()}
+
+    def __to_weights_vector(self, weights: dict):
+        """ Converts an integer weights dict {(u,v): w, ..} into the weights vector """
+        return np.fromiter((weights[link] for link in self.__links), np.int64, len(self.__links))
+
+    def __to_weights_dict(self, weights: np.ndarray):
+        """ Converts the weights vector into a weights dict {(u,v): w, ..} """
+        return dict(zip(self.__links, weights.tolist()))
 
     def __init_graph(self):
         """ Create networKit graph, add weighted edges and create spsp (some pairs shortest path) object """
         self.__g = nk.Graph(weighted=True, directed=True, n=self.__n)
         for u, v in self.__links:
             self.__g.addEdge(u, v, 1)
-        self.__spsp = nk.distance.SPSP(self.__g, sources=self.__targets)
 
     def __update_nkit_graph_weights(self, weights):
         """ Updates weight in networKit graph """
         for u, v, w in self.__g.iterEdgesWeights():
             # Note: the weights are reversed since we need the distance from all sources to a specific target
-            if w != weights[v, u]:
-                self.__g.setWeight(u, v, weights[v, u])
+            if w != weights[self.__link_ids[v, u]]:
+                self.__g.setWeight(u, v, weights[self.__link_ids[v, u]])
         return
 
     def __reset_secondary_hashtable(self):
@@ -154,24 +301,22 @@ class HeurOSPFWeights(GenericSR):
     def __get_distances(self):
         """ Recomputes the shortest path for 'some' pairs """
         self.__spsp.run()
-        return self.__spsp.getDistances()
+        return get_spsp_distances(self.__spsp)
 
     def __perturb(self, weights):
         """ Perturbs current solution to escape local minima """
         new_weights = weights.copy()
         n_samples = max(3, int(len(self.__links) * 0.1))
         inds = np.random.choice(len(self.__links), n_samples)
-        rand_links = [self.__links[ind] for ind in inds]
-        for u, v in rand_links:
+        for link_id in inds:
             w_diff = self.__max_weight
-            while new_weights[u, v] + w_diff > self.__max_weight or new_weights[u, v] + w_diff < 1:
+            while new_weights[link_id] + w_diff > self.__max_weight or new_weights[link_id] + w_diff < 1:
                 w_diff = random.randint(-2, 2)
-            new_weights[u, v] += w_diff
+            new_weights[link_id] += w_diff
         return new_weights
 
-    def __get_neighbor(self, x: int, t_idx: int, distances: dict, weights: dict, loads: dict):
-        """ Chooses random neighbor vector w_a' """
-        weights = weights.copy()
+    def __get_neighbor(self, x: int, t_idx: int, distances, weights: np.ndarray, loads: dict):
+        """ Chooses random neighbor vector w_a'; returns the changed weights as [(link_id, new_weight), ..] """
         # choose theta (load threshold) at random
         theta = np.random.uniform(low=0.25, high=1)
 
@@ -189,7 +334,7 @@ class HeurOSPFWeights(GenericSR):
         min_rhs = self.__max_weight - 1
         for x_i in neighbors:
             if distances[t_idx][x_i] - min_w_pi > self.__max_weight:
-                min_rhs = min(min_rhs, distances[t_idx][x_i] + weights[x, x_i])
+                min_rhs = min(min_rhs, distances[t_idx][x_i] + weights[self.__link_ids[x, x_i]])
                 continue
             candidates.append(x_i)
 
@@ -202,68 +347,86 @@ class HeurOSPFWeights(GenericSR):
                     subset_b.remove(x_i)
 
             if len(subset_b) == 0:
-                return weights
+                return list()
             w_star = max(1 + distances[t_idx][x_i] for x_i in subset_b)
 
-        # compute new neighbor weight vector
+        # compute changes of the new neighbor weight vector
+        changes = list()
         for x_i in subset_b:
-            new_weight = w_star - distances[t_idx][x_i]
+            link_id = self.__link_ids[x, x_i]
+            new_weight = int(w_star - distances[t_idx][x_i])
 
-            if loads[x, x_i] <= theta:
-                weights[x, x_i] = new_weight
-            else:
+            if loads[x, x_i] > theta:
                 # if link is overloaded link weight can only be increased
-                weights[x, x_i] = max(weights[x, x_i], new_weight)
-
-        return weights
-
-    def __add_loads_for(self, t_idx, weights, demands, acc_flows, distances):
-        """ Computes flow path from all sources to node t and returns the updated acc_flows dict"""
-        current_flows = np.zeros((self.__n, self.__n), np.float)
-        t = self.__targets[t_idx]
-        A_out = {y: list() for y in range(self.__n)}
-        A_in = {y: list() for y in range(self.__n)}
-        reverse_indices = range(self.__n - 1, -1, -1)
-        for x, y in weights:
-            if weights[(x, y)] == distances[t_idx][x] - distances[t_idx][y]:
-                A_out[x].append(y)
-                A_in[y].append(x)
-
-        y_map = dict(zip(reverse_indices, np.array(distances[t_idx]).argsort()))
-        for y_idx in range(self.__n - 1):
-            y = y_map[y_idx]
-            d_yt = demands[y, t] if (y, t) in demands else 0
-            acc_demand_to_t = d_yt + np.sum(current_flows[y])
-            if acc_demand_to_t <= 0:
-                continue
-            l = acc_demand_to_t / len(A_out[y])
-            for z in A_out[y]:
-                current_flows[z][y] = l
-                acc_flows[y, z] += l
-        return acc_flows
+                new_weight = max(int(weights[link_id]), new_weight)
+            changes.append((link_id, new_weight))
+
+        return changes
 
     def __evaluate_cost(self, weights):
         """
         evaluates cost of weight setting
         :return: max link utilization, distances, link loads
         """
-        acc_flows = {(i, j): 0 for i, j in self.__links}
-        self.__update_nkit_graph_weights(weights)
-        distances = self.__get_distances()
-        for t_idx in range(len(self.__targets)):
-            acc_flows = self.__add_loads_for(t_idx, weights, self.__demands, acc_flows, distances)
-        loads = dict()
-        cost = 0
-        for u, v in self.__links:
-            loads[u, v] = acc_flows[u, v] / self.__capacities[u, v]
-            cost += self.__get_link_cost(loads[u, v])
-
+        t_start = time.perf_counter()
+        if self.__dial_spsp is not None:
+            distances = self.__dial_spsp.get_distances(weights)
+        elif self.__dynamic_spsp is not None:
+            distances = self.__dynamic_spsp.get_distances(weights)
+        else:
+            self.__update_nkit_graph_weights(weights)
+            distances = self.__get_distances()
+        t_spsp = time.perf_counter()
+        flows = self.__ecmp_loads.get_flows(weights, distances)
+        self.__spsp_time += t_spsp - t_start
+        self.__loads_time += time.perf_counter() - t_spsp
+        loads, loads_array = get_loads(self.__links, self.__capacity_array, flows)
+        if self.__last_loads is None:
+            cost = get_cost(loads_array)
+        else:
+            cost = update_cost(self.__last_cost, self.__last_loads, loads_array)
+        self.__last_loads, self.__last_cost = loads_array, cost
         return cost, distances, loads
 
+    def __get_screening_cost(self, weights):
+        """ Cost of the loads of the screening targets only; a lower bound of the cost of weights """
+        t_start = time.perf_counter()
+        distances = self.__screening_spsp.get_distances(weights)
+        t_spsp = time.perf_counter()
+        flows = self.__screening_loads.get_flows(weights, distances)
+        self.__spsp_time += t_spsp - t_start
+        self.__loads_time += time.perf_counter() - t_spsp
+        return get_cost(flows / self.__capacity_array)
+
+    def __record_iteration(self, it: int, sample_size: int, cost, util, bc_cost, bu_util, perturbed: bool):
+        """ Appends the record of iteration it to the trace and passes it to the trace callback """
+        record = self.__trace[it]
+        record["iteration"] = it
+        record["wall_time"] = time.time() - self.__start_time
+        record["process_time"] = time.process_time() - self.__pt_start
+        record["sample_size"] = sample_size
+        record["cost"] = cost
+        record["util"] = util
+        record["bc_cost"] = bc_cost
+        record["bu_util"] = bu_util
+        record["hash_collisions"] = self.__hash_collision_counter
+        record["hash_misses"] = self.__hash_misses
+        record["perturbed"] = perturbed
+        record["spsp_time"] = self.__spsp_time
+        record["loads_time"] = self.__loads_time
+        self.__spsp_time = self.__loads_time = 0
+        self.__trace_length = it + 1
+        if self.__trace_callback is not None:
+            self.__trace_callback(record)
+        return
+
     def __explore_neighborhood(self, sample_size: int, c_weights, c_distances, c_loads):
         """ for a given weights vector find the best neighbor weights vector"""
         best_weights, best_cost, best_loads, best_distances = c_weights, self.BIG_M, c_loads, c_distances
         h1 = None
+        c_hash = self.__zobrist_hash(c_weights)
+        # parallel mode: the neighbors are collected and evaluated after the sampling
+        samples = list()
         for _ in range(sample_size):
             # choose src and destination
             t_idx = np.random.randint(len(self.__targets))
@@ -271,11 +434,11 @@ class HeurOSPFWeights(GenericSR):
             while x == self.__targets[t_idx]:
                 x = np.random.randint(self.__n)
 
-            # retrieve neighbor weights vector
-            n_weights = self.__get_neighbor(x, t_idx, c_distances, c_weights, c_loads)
+            # retrieve changes of the neighbor weights vector
+            changes = self.__get_neighbor(x, t_idx, c_distances, c_weights, c_loads)
 
-            # hash solution
-            h1, h2 = self.__hash(tuple(n_weights.values()))
+            # hash solution; updated in O(#changes)
+            h1, h2 = self.__hash(self.__update_zobrist_hash(c_hash, c_weights, changes))
             if self.__hashtable1[h1]:
                 self.__hash_collision_counter += 1
                 continue
@@ -284,48 +447,139 @@ class HeurOSPFWeights(GenericSR):
                 continue
             self.__hash_misses += 1
             self.__hashtable2[h2] = True
+            n_weights = c_weights.copy()
+            for link_id, weight in changes:
+                n_weights[link_id] = weight
+            if self.__parallel_evaluation is not None:
+                samples.append(n_weights)
+                continue
+
+            # screening: skip neighbors whose lower bound cannot beat the best neighbor
+            if self.__screening_spsp is not None and best_cost < self.BIG_M:
+                self.__screened += 1
+                if self.__screening_ratio * self.__get_screening_cost(n_weights) > best_cost:
+                    self.__screened_out += 1
+                    continue
 
             # evaluate cost and compare
             n_cost, n_distances, n_loads = self.__evaluate_cost(n_weights)
             if best_cost >= n_cost:
                 best_weights, best_cost, best_loads, best_distances = n_weights, n_cost, n_loads, n_distances
 
+        # reduce in sample order (same choice as in the sequential mode)
+        if self.__parallel_evaluation is not None:
+            for n_weights, (n_cost, n_distances, n_loads) in zip(samples, self.__parallel_evaluation.evaluate(samples)):
+                if best_cost >= n_cost:
+                    best_weights, best_cost, best_loads, best_distances = n_weights, n_cost, n_loads, n_distances
+
         self.__hashtable1[h1] = True
         return best_weights, best_cost, best_loads, best_distances
 
+    def __get_checkpoint_key(self):
+        """ Identifies the problem and the parameters that determine the trajectory of the search """
+        return (self.__n, self.__links, self.__targets, self.__seed, self.__hash_seed, self.__max_weight, self.__l,
+                self.__l2)
+
+    def __save_checkpoint(self, search_state: dict):
+        """ Writes the search state (and the state of the hash tables, counters and random generators) to disk """
+        state = dict(search_state)
+        state["key"] = self.__get_checkpoint_key()
+        state["hashtable1"] = self.__hashtable1.copy()
+        state["hashtable2"] = self.__hashtable2.copy()
+        state["hash_collision_counter"] = self.__hash_collision_counter
+        state["hash_misses"] = self.__hash_misses
+        state["screened"] = self.__screened
+        state["screened_out"] = self.__screened_out
+        state["np_random_state"] = np.random.get_state()
+        state["random_state"] = random.getstate()
+        state["elapsed_time"] = time.time() - self.__start_time
+        state["elapsed_process_time"] = time.process_time() - self.__pt_start
+        state["trace"] = self.__trace[:self.__trace_length].copy()
+
+        # write to a temporary file first: an interruption while writing keeps the previous checkpoint
+        tmp_path = f"{self.__checkpoint_path}.tmp"
+        with open(tmp_path, "wb") as file:
+            pickle.dump(state, file)
+        os.replace(tmp_path, self.__checkpoint_path)
+        return
+
+    def __load_checkpoint(self) -> dict:
+        """ Restores the hash tables, counters and random generators from a checkpoint; returns the search state """
+        with open(self.__resume_from, "rb") as file:
+            state = pickle.load(file)
+        assert state["key"] == self.__get_checkpoint_key(), \
+            f"Error {self.get_name()}: checkpoint {self.__resume_from} belongs to another problem or parameters"
+        self.__hashtable1[:] = state["hashtable1"]
+        self.__hashtable2[:] = state["hashtable2"]
+        self.__hash_collision_counter = state["hash_collision_counter"]
+        self.__hash_misses = state["hash_misses"]
+        self.__screened = state["screened"]
+        self.__screened_out = state["screened_out"]
+        np.random.set_state(state["np_random_state"])
+        random.setstate(state["random_state"])
+        self.__start_time -= state["elapsed_time"]
+        self.__pt_start -= state["elapsed_process_time"]
+        self.__trace_length = len(state["trace"])
+        self.__trace[:self.__trace_length] = state["trace"]
+        return state
+
     def __ospf_heuristic(self):
         """ main procedure """
-        # evaluate initial weights
-        weights = self.__init_weights if self.__init_weights else self.__get_random_weights()
-        cost, distances, loads = self.__evaluate_cost(weights)
-        # bc_ := best cost
-        # bu_ := best (= lowest) max link utilization
-        bc_cost = bu_cost = cost
-        bc_util = bu_util = self.BIG_M
-        bc_weights = bu_weights = weights
-        bc_loads = bu_loads = loads
-
-        # pr_cost/pr_max_util stores results from last neighborhood search iteration
-        pr_cost = pr_util = self.BIG_M
-
+        self.__trace = np.zeros(self.__iterations, TRACE_DTYPE)
+        self.__trace_length = 0
         # initially 20% of the neighborhood size gets evaluated
         neighborhood_size = len(self.__targets) * (self.__n - 1)
-        sample_factor = 0.2
 
-        count_not_better_as_pr = 0  # counts worse than previous
-        count_not_improved_best = 0  # counts worse than best
+        if self.__resume_from is not None:
+            # continue after the iteration of the checkpoint
+            state = self.__load_checkpoint()
+            weights, cost, distances, loads = state["weights"], state["cost"], state["distances"], state["loads"]
+            bc_weights, bc_cost = state["bc_weights"], state["bc_cost"]
+            bc_loads, bc_util = state["bc_loads"], state["bc_util"]
+            bu_weights, bu_cost = state["bu_weights"], state["bu_cost"]
+            bu_loads, bu_util = state["bu_loads"], state["bu_util"]
+            pr_cost, pr_util = state["pr_cost"], state["pr_util"]
+            sample_factor = state["sample_factor"]
+            count_not_better_as_pr = state["count_not_better_as_pr"]
+            count_not_improved_best = state["count_not_improved_best"]
+            it = state["it"]
+            first_it = it + 1
+        else:
+            # evaluate initial weights
+            if self.__init_weights:
+                weights = self.__to_weights_vector(self.__init_weights)
+            else:
+                weights = self.__get_random_weights()
+            cost, distances, loads = self.__evaluate_cost(weights)
+            # bc_ := best cost
+            # bu_ := best (= lowest) max link utilization
+            bc_cost = bu_cost = cost
+            bc_util = bu_util = self.BIG_M
+            bc_weights = bu_weights = weights
+            bc_loads = bu_loads = loads
+
+            # pr_cost/pr_max_util stores results from last neighborhood search iteration
+            pr_cost = pr_util = self.BIG_M
+
+            sample_factor = 0.2
+
+            count_not_better_as_pr = 0  # counts worse than previous
+            count_not_improved_best = 0  # counts worse than best
+
+            it = 0
+            first_it = 0
 
-        it = 0
         exit_reason = "max iterations reached"
-        for it in range(self.__iterations):
+        for it in range(first_it, self.__iterations):
             # explore neighborhood
             sample_size = max(int(neighborhood_size * sample_factor), 5)  # max(..,5) is for too small topologies
             weights, cost, loads, distances = self.__explore_neighborhood(sample_size, weights, distances, loads)
             util = max(loads.values())
 
-            # exit criteria (1) timeout
+            # exit criteria (1) timeout; the neighbor of this iteration is not kept (the record has the returned best)
             if self.__timeout < time.time() - self.__start_time:
                 exit_reason = "time out"
+                self.__record_iteration(it, sample_size, cost, util, bc_cost, bu_util, False)
                 break
 
             # exit criteria (2) not improved best for a very long time
@@ -333,6 +587,7 @@ class HeurOSPFWeights(GenericSR):
                 count_not_improved_best += 1
                 if count_not_improved_best > self.__limit_not_improved:
                     exit_reason = f"LIMIT NOT IMPROVED exceeded {self.__limit_not_improved}"
+                    self.__record_iteration(it, sample_size, cost, util, bc_cost, bu_util, False)
                     break
             else:
                 count_not_improved_best = 0
@@ -345,7 +600,14 @@ class HeurOSPFWeights(GenericSR):
                 bc_weights, bc_cost, bc_loads, bc_util, bc_distances = weights, cost, loads, util, distances
             elif bu_util >= util:
                 bu_weights, bu_cost, bu_loads, bu_util, bu_distances = weights, cost, loads, util, distances
+
+            # exit criteria (3) max. utilization reached
+            if self.__target_util is not None and bu_util <= self.__target_util:
+                exit_reason = "target utilization reached"
+                self.__record_iteration(it, sample_size, cost, util, bc_cost, bu_util, False)
+                break
             # better than previous solution?
+            perturbed = False
             if pr_cost > cost or pr_util > util:
                 sample_factor = max(0.01, sample_factor / 3)
                 count_not_better_as_pr = 0
@@ -355,18 +617,49 @@ class HeurOSPFWeights(GenericSR):
                 count_not_better_as_pr += 1
                 if count_not_better_as_pr >= self.__perturb_it:
                     weights = self.__perturb(weights)
+                    perturbed = True
                     count_not_better_as_pr = 0
                     self.__reset_secondary_hashtable()
 
+            # island model: continue with the best weights of the other islands if they are better
+            if self.__exchange is not None and (it + 1) % self.__exchange_interval == 0:
+                migrant = self.__exchange(bc_weights, bc_cost)
+                if migrant is not None:
+                    weights = migrant
+                    cost, distances, loads = self.__evaluate_cost(weights)
+                    util = max(loads.values())
+                    self.__reset_secondary_hashtable()
+
             pr_cost, pr_util = cost, util
+            self.__record_iteration(it, sample_size, cost, util, bc_cost, bu_util, perturbed)
+
+            # checkpoint of the state after this iteration
+            if self.__checkpoint_path is not None and (it + 1) % self.__checkpoint_interval == 0:
+                self.__save_checkpoint({
+                    "it": it, "weights": weights, "cost": cost, "distances": distances, "loads": loads,
+                    "bc_weights": bc_weights, "bc_cost": bc_cost, "bc_loads": bc_loads, "bc_util": bc_util,
+                    "bu_weights": bu_weights, "bu_cost": bu_cost, "bu_loads": bu_loads, "bu_util": bu_util,
+                    "pr_cost": pr_cost, "pr_util": pr_util, "sample_factor": sample_factor,
+                    "count_not_better_as_pr": count_not_better_as_pr,
+                    "count_not_improved_best": count_not_improved_best,
+                })
         return bc_weights, bc_cost, bc_loads, bc_util, bu_weights, bu_cost, bu_loads, bu_util, it, exit_reason
 
     def solve(self) -> dict:
         """ compute solution """
 
         self.__start_time = t_start = time.time()  # sys wide time
-        pt_start = time.process_time()  # count process time (e.g. sleep excluded and count per core)
-        bc_weights, bc_cost, bc_loads, bc_util, bu_weights, bu_cost, bu_loads, bu_util, number_iterations, exit_reason = self.__ospf_heuristic()
+        # count process time (e.g. sleep excluded and count per core)
+        self.__pt_start = pt_start = time.process_time()
+        if self.__workers > 1:
+            self.__parallel_evaluation = ParallelNeighborhoodEvaluation(
+                self.__workers, self.__n, self.__links, self.__capacities, self.__targets, self.__demands)
+        try:
+            bc_weights, bc_cost, bc_loads, bc_util, bu_weights, bu_cost, bu_loads, bu_util, number_iterations, exit_reason = self.__ospf_heuristic()
+        finally:
+            parallel_evaluation, self.__parallel_evaluation = self.__parallel_evaluation, None
+            if parallel_evaluation is not None:
+                parallel_evaluation.close()
         pt_duration = time.process_time() - pt_start
         t_duration = time.time() - t_start
 
@@ -376,17 +669,18 @@ class HeurOSPFWeights(GenericSR):
         solution["execution_time"] = t_duration
         solution["process_time"] = pt_duration
         solution["waypoints"] = self.__waypoints
-        solution["weights"] = bu_weights
+        solution["weights"] = self.__to_weights_dict(bu_weights)
         solution["loads"] = bu_loads
         solution["cost"] = bu_cost
 
         # bc := best cost result
         solution["bc_objective"] = bc_util
-        solution["bc_weights"] = bc_weights
+        solution["bc_weights"] = self.__to_weights_dict(bc_weights)
         solution["bc_cost"] = bc_cost
         solution["bc_loads"] = bc_loads
 
         solution["used_iterations"] = number_iterations
+        solution["trace"] = self.__trace[:self.__trace_length]
         solution["exit_reason"] = exit_reason
 
         # parameters
@@ -396,6 +690,19 @@ class HeurOSPFWeights(GenericSR):
         solution["seed"] = self.__seed
         solution["hash_table_l1"] = self.__l
         solution["hash_table_l2"] = self.__l2
+        solution["spsp_backend"] = "dial" if self.__dial_spsp is not None else "networkit"
+        if self.__dynamic_spsp is not None and self.__dial_spsp is None:
+            solution["spsp_full_updates"] = self.__dynamic_spsp.full_updates
+            solution["spsp_dynamic_updates"] = self.__dynamic_spsp.dynamic_updates
+            solution["spsp_repaired_trees"] = self.__dynamic_spsp.repaired_trees
+        solution["workers"] = self.__workers
+        if self.__screening_spsp is not None:
+            solution["screened_neighbors"] = self.__screened
+            solution["screened_out"] = self.__screened_out
+            solution["screen_out_rate"] = self.__screened_out / self.__screened if self.__screened else 0.
+        if parallel_evaluation is not None:
+            # per iteration: evaluation time of the neighbors / (workers * wall clock time)
+            solution["parallel_efficiency"] = parallel_evaluation.efficiencies
         return solution
 
     def get_name(self):
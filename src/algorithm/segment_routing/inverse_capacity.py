@@ -2,17 +2,26 @@ import time
 
 from algorithm.generic_sr import GenericSR
 from algorithm.segment_routing.equal_split_shortest_path import EqualSplitShortestPath
+from algorithm.segment_routing.routing_matrix import RoutingMatrix
 
 
 class InverseCapacity(GenericSR):
-    def __init__(self, nodes: list, links: list, demands: list, weights: dict = None, waypoints: dict = None, **kwargs):
-        super().__init__(nodes, links, demands, weights, waypoints)
+    def __init__(self, nodes: list, links: list, demands: list, weights: dict = None, waypoints: dict = None,
+                 routing_matrix: bool = False, **kwargs):
+        super().__init__(nodes, links, demands, weights, waypoints, **kwargs)
 
         self.__nodes = nodes  # [i, ...]
-        self.__links = links  # [(i,j,c), ...]
+        self.__links = self.problem_instance.get_links()  # [(i,j,c), ...] ordered by link_id (shared ProblemInstance)
         self.__demands = demands  # {idx: (s,t,d), ...}
-        self.__weights = None
+        # link weights: inverse capacity scaled by max capacity
+        max_c = max([c for _, _, c in self.__links])
+        self.__weights = {(i, j): max_c / c for i, j, c in self.__links}
         self.__waypoints = waypoints
+        # routing_matrix (opt-in): the inverse capacity weights depend on the topology only, so the RoutingMatrix is
+        # compiled once in the constructor; the loads of a demand set are one matrix product over the columns of its OD
+        # pairs (equal to the default shortest path propagation up to floating point rounding)
+        self.__routing_matrix = RoutingMatrix(self.__links, self.__weights) if routing_matrix else None
+        self.__post_processing = None  # EqualSplitShortestPath on the inverse capacities; created by the first solve
 
 
     def solve(self) -> dict:
@@ -22,13 +31,7 @@ class InverseCapacity(GenericSR):
         t = time.process_time()
         pt_start = time.process_time()  # count process time (e.g. sleep excluded)
 
-        # set link weights to inverse capacity scaled by max capacity
-        max_c = max([c for _, _, c in self.__links])
-        self.__weights = {(i, j): max_c / c for i, j, c in self.__links}
-
-        post_processing = EqualSplitShortestPath(nodes=self.__nodes, links=self.__links, demands=self.__demands,
-                                                 split=True, weights=self.__weights, waypoints=self.__waypoints)
-        solution = post_processing.solve()
+        solution = self.__get_post_processing().solve()
 
         pt_duration = time.process_time() - pt_start
         exe_time = time.process_time() - t
@@ -38,6 +41,36 @@ class InverseCapacity(GenericSR):
         solution["process_time"] = pt_duration
         return solution
 
+    def __get_post_processing(self) -> EqualSplitShortestPath:
+        """ EqualSplitShortestPath on the inverse capacity weights with the current demands (DAGs built once) """
+        if self.__post_processing is None:
+            self.__post_processing = EqualSplitShortestPath(
+                nodes=self.__nodes, links=self.__links, demands=self.__demands, split=True, weights=self.__weights,
+                waypoints=self.__waypoints, routing_matrix=self.__routing_matrix,
+                problem_instance=self.problem_instance)
+        else:
+            self.__post_processing.problem_instance = self.problem_instance
+            self.__post_processing.set_demands(self.__demands)
+        return self.__post_processing
+
+    def solve_many(self, demand_sets):
+        """ With routing matrix: all demand sets in one batch (see EqualSplitShortestPath.solve_many) """
+        if self.__routing_matrix is None:
+            yield from super().solve_many(demand_sets)
+            return
+        demand_sets = list(demand_sets)
+        if not demand_sets:
+            return
+        for demands, solution in zip(demand_sets, self.__get_post_processing().solve_many(demand_sets)):
+            self._GenericSR__replace_demands(demands)
+            self.__demands = demands
+            yield solution
+
+    def set_demands(self, demands: list):
+        """ Replaces the demands; the shortest path computation (EqualSplitShortestPath) and routing matrix are kept """
+        self.__demands = demands
+        return
+
     def get_name(self):
         """ returns name of algorithm """
         return f"inverse_capacity"
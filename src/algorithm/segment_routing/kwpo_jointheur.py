@@ -1,7 +1,7 @@
 from ..generic_sr import GenericSR
 import time
 import numpy as np
-from .demand_first_waypoints import DemandsFirstWaypoints
+from .demand_first_waypoints import DemandsFirstWaypoints, add_statistics
 from ..sr_factory import  get_algorithm
 from enum import Enum
 
@@ -16,7 +16,7 @@ class SingleWayPointHeur(DemandsFirstWaypoints):
 
     def __init__(self, nodes: list, links: list, demands: list, weights: dict = None, waypoints: dict = None,
                  sortStrat:SortSetting=SortSetting.ByDemandValue, **kwargs):
-        super().__init__(nodes, links, demands, weights, waypoints)
+        super().__init__(nodes, links, demands, weights, waypoints, **kwargs)
         self.__node_capacities = self.extract_nodes_capacities(links)
         self.__sortStrat=sortStrat
 
@@ -57,38 +57,36 @@ class SingleWayPointHeur(DemandsFirstWaypoints):
 
     def __demands_first_waypoints(self):
         """ main procedure """
-        distances = self._DemandsFirstWaypoints__compute_distances()
-        sp_fraction_map = self._DemandsFirstWaypoints__get_shortest_path_fraction_map(distances)
+        sp_fraction_map = self._DemandsFirstWaypoints__get_shortest_path_fraction_map()
         best_flow_map = self._DemandsFirstWaypoints__get_flow_map(sp_fraction_map)
-        best_util_map, best_objective = self._DemandsFirstWaypoints__compute_utilization(best_flow_map)
+        util_index, best_objective = self._DemandsFirstWaypoints__compute_utilization(best_flow_map)
 
         waypoints = dict()
         waypoints_demand=list()
+        rejected_demands = set()  # demands without improving waypoint; no state change since their rejection
         sorted_demand_idx_map = self.extract_sorted_ids(self._DemandsFirstWaypoints__demands)
         for d_map_idx in range(len(self._DemandsFirstWaypoints__demands)):
             d_idx = sorted_demand_idx_map[d_map_idx]
             s, t, d = self._DemandsFirstWaypoints__demands[d_idx]
-            best_waypoint = None
-            for waypoint in range(self._DemandsFirstWaypoints__n):
-                if waypoint == s or waypoint == t:
-                    continue
-                flow_map = self._DemandsFirstWaypoints__update_flow_map(sp_fraction_map, best_flow_map, s, t, d, waypoint)
-                util_map, objective = self._DemandsFirstWaypoints__compute_utilization(flow_map)
-
-                if objective < best_objective:
-                    best_flow_map = flow_map
-                    best_util_map = util_map
-                    best_objective = objective
-                    best_waypoint = waypoint
+            if (s, t, d) in rejected_demands:
+                # identical flow in the identical state: no improving waypoint either
+                waypoints_demand.append((s,t,d))
+                continue
+            candidates = [waypoint for waypoint in range(self._DemandsFirstWaypoints__n)
+                          if waypoint != s and waypoint != t]
+            best_waypoint, best_flow_map, best_objective = self._DemandsFirstWaypoints__choose_waypoint(
+                sp_fraction_map, best_flow_map, util_index, best_objective, s, t, d, candidates)
 
             if best_waypoint is not None:
                 waypoints[d_idx] = [(s, best_waypoint), (best_waypoint, t),len(waypoints_demand)]
                 if d!=0:
                     waypoints_demand.append((s,best_waypoint,d))
                     waypoints_demand.append((best_waypoint, t, d))
+                rejected_demands.clear()
             else:
                 waypoints_demand.append((s,t,d))
-        loads = {(u, v): best_util_map[u][v] for u, v, in self._DemandsFirstWaypoints__links}
+                rejected_demands.add((s, t, d))
+        loads = self._DemandsFirstWaypoints__get_loads(util_index)
         return loads, waypoints, best_objective, waypoints_demand
 
     def solve(self) -> dict:
@@ -97,6 +95,7 @@ class SingleWayPointHeur(DemandsFirstWaypoints):
         t_start = time.time()  # sys wide time
         pt_start = time.process_time()  # count process time (e.g. sleep excluded and count per core)
         loads, waypoints, objective,waypoints_demand = self.__demands_first_waypoints()
+        self._DemandsFirstWaypoints__stop_parallel_scan()
         pt_duration = time.process_time() - pt_start
         t_duration = time.time() - t_start
 
@@ -109,6 +108,7 @@ class SingleWayPointHeur(DemandsFirstWaypoints):
             "loads": loads,
             "waypoints_demand":waypoints_demand
         }
+        solution.update(self._DemandsFirstWaypoints__get_statistics())
 
         return solution
 
@@ -117,14 +117,16 @@ class KWPOJointHeur(GenericSR):
     seed = 42
 
     def __init__(self, nodes: list, links: list, demands: list, weights: dict = None, k: int=1,
-                 sortStrat:SortSetting=SortSetting.ByDemandValue, **kwargs):
-        super().__init__(nodes, links, demands, weights, None)
+                 sortStrat:SortSetting=SortSetting.ByDemandValue, fraction_cache_size: int = None, **kwargs):
+        super().__init__(nodes, links, demands, weights, None, **kwargs)
 
         self.__nodes = nodes  # [i, ..., n-1]
         self.__links = links  # [(i, j, capacity), ...]
         self.__demands = demands  # [(src, dst, demand), ...]
         self.__max_waypoints = k
         self.__sortStrat=sortStrat
+        self.__fraction_cache_size = fraction_cache_size
+        self.__heur_ospf = None  # HeurOSPFWeights of the first iteration; set_demands keeps its graph and Zobrist keys
 
     def solve(self) -> dict:
         """
@@ -135,27 +137,44 @@ class KWPOJointHeur(GenericSR):
         solution_list=list()
         current_demands = self.__demands
 
-        # route on shortest paths
-        heur_ospf = get_algorithm(algorithm_name="heur_ospf_weights",demands=current_demands, nodes=self.__nodes,
-                              links=self.__links)
-        solution_ospf = heur_ospf.solve()
+        # route on shortest paths; all sub-algorithms share the topology arrays of the problem instance
+        problem = self.problem_instance
+        if self.__heur_ospf is None:
+            self.__heur_ospf = get_algorithm(algorithm_name="heur_ospf_weights", demands=current_demands,
+                                             nodes=self.__nodes, links=self.__links, problem_instance=problem)
+        else:
+            self.__heur_ospf.problem_instance = problem
+            self.__heur_ospf.set_demands(current_demands)
+        solution_ospf = self.__heur_ospf.solve()
         solution_list.append(solution_ospf)
 
+        # the weights do not change between iterations: reuse the shortest path fractions
+        sp_fraction_map = None
         for i in range(self.__max_waypoints):
             single_waypoint = SingleWayPointHeur(nodes=self.__nodes,links=self.__links, demands=current_demands,
-                                                 weights=solution_ospf['weights'], sortStrat=self.__sortStrat)
+                                                 weights=solution_ospf['weights'], sortStrat=self.__sortStrat,
+                                                 fraction_cache_size=self.__fraction_cache_size,
+                                                 sp_fraction_map=sp_fraction_map, problem_instance=problem)
             solution_wp = single_waypoint.solve()
+            sp_fraction_map = single_waypoint.get_sp_fraction_map()
 
             current_solution= dict(solution_list[-1])
             current_demands=solution_wp['waypoints_demand']
+            problem = problem.with_demands(current_demands)
             current_solution["execution_time"] += solution_wp["execution_time"]
             current_solution["process_time"] += solution_wp["process_time"]
             current_solution["objective"] = solution_wp["objective"]
             current_solution["loads"] = solution_wp["loads"]
+            add_statistics(current_solution, solution_wp)
             solution_list.append(current_solution)
 
         return solution_list
 
+    def set_demands(self, demands: list):
+        """ Replaces the demands; HeurOSPF keeps its topology dependent state """
+        self.__demands = demands
+        return
+
     def get_name(self):
         """ returns name of algorithm """
         return f"multi_waypoints"
\ No newline at end of file
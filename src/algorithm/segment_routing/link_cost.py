@@ -0,0 +1,51 @@
+"""
+Piecewise linear link cost function of
+    Bernard Fortz and Mikkel Thorup. Internet traffic engineering by optimizing OSPF weights.
+    In Proc. IEEE INFOCOM, volume 2, pages 519–528. IEEE, 2000.
+as used by HeurOSPF: the cost of a link with load (utilization) l is int(slope * l), where the slope is given by the
+interval [breakpoint, next breakpoint) that contains l. The vectorized versions use the same floating point
+operations (one multiplication, truncation towards zero), i.e., they are identical to get_link_cost.
+"""
+
+import numpy as np
+
+BREAKPOINTS = np.array([1 / 3, 2 / 3, 9 / 10, 1, 11 / 10, 2], np.float64)
+SLOPES = np.array([1, 3, 10, 70, 500, 5000, 50000], np.float64)
+
+
+def get_link_cost(link_load):
+    """ Return cost value of a single link load """
+    if link_load >= 2:
+        return int(50000 * link_load)
+    if link_load >= 11 / 10:
+        return int(5000 * link_load)
+    if link_load >= 1:
+        return int(500 * link_load)
+    if link_load >= 9 / 10:
+        return int(70 * link_load)
+    if link_load >= 2 / 3:
+        return int(10 * link_load)
+    if link_load >= 1 / 3:
+        return int(3 * link_load)
+    else:
+        return int(1 * link_load)
+
+
+def get_link_costs(loads: np.ndarray) -> np.ndarray:
+    """ Returns the cost of each link load (vectorized get_link_cost) """
+    # side='right': a load equal to a breakpoint belongs to the interval starting at the breakpoint
+    slopes = SLOPES[np.searchsorted(BREAKPOINTS, loads, side="right")]
+    return np.trunc(slopes * loads).astype(np.int64)
+
+
+def get_cost(loads: np.ndarray) -> int:
+    """ Returns the total cost of the link loads """
+    return int(np.sum(get_link_costs(loads)))
+
+
+def update_cost(cost: int, old_loads: np.ndarray, new_loads: np.ndarray) -> int:
+    """ Returns the total cost of new_loads from the total cost of old_loads; only changed loads are evaluated """
+    changed = np.flatnonzero(old_loads != new_loads)
+    if not len(changed):
+        return cost
+    return cost - int(np.sum(get_link_costs(old_loads[changed]))) + int(np.sum(get_link_costs(new_loads[changed])))
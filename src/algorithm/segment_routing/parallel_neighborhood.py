@@ -0,0 +1,92 @@
+"""
+Cost evaluation of weight settings for HeurOSPF and its parallel version for the neighborhood search.
+ParallelNeighborhoodEvaluation evaluates the neighbor weight vectors of one neighborhood exploration with a process
+pool; each worker holds its own networKit graph/SPSP (DynamicSPSP) and ECMP load kernel. The neighbors are generated
+in the parent (same random numbers as the sequential search) and the results are returned in sample order, i.e., the
+chosen neighbor is the same as in the sequential run.
+"""
+
+import math
+import multiprocessing as mp
+import time
+import weakref
+
+import numpy as np
+
+from algorithm.segment_routing.dynamic_spsp import DynamicSPSP
+from algorithm.segment_routing.ecmp_loads import ECMPLoads
+from algorithm.segment_routing.link_cost import get_cost
+
+# state of a worker process; set by _init_worker
+_worker_state = dict()
+
+
+def get_loads(links: list, capacities: np.ndarray, flows: np.ndarray):
+    """
+    Computes the link loads (utilization) of the flow per link id
+    :param capacities: capacity per link id
+    :return: dict with {(u,v): load, ..}, array with load per link id
+    """
+    loads = flows / capacities
+    return dict(zip(links, loads.tolist())), loads
+
+
+def _init_worker(n: int, links: list, capacities: dict, targets: list, demand_matrix: dict):
+    """ Creates the SPSP and the load kernel of a worker process """
+    _worker_state["links"] = links
+    _worker_state["capacities"] = np.fromiter((capacities[link] for link in links), np.float64, len(links))
+    _worker_state["spsp"] = DynamicSPSP(n, links, targets)
+    _worker_state["ecmp_loads"] = ECMPLoads(n, links, targets, demand_matrix)
+
+
+def _evaluate(weights: np.ndarray):
+    """ Evaluates a weights vector in a worker process; returns cost, distances, loads and the evaluation time """
+    t_start = time.perf_counter()
+    distances = _worker_state["spsp"].get_distances(weights)
+    flows = _worker_state["ecmp_loads"].get_flows(weights, distances)
+    loads, loads_array = get_loads(_worker_state["links"], _worker_state["capacities"], flows)
+    return get_cost(loads_array), distances, loads, time.perf_counter() - t_start
+
+
+def _release(pool):
+    """ Stops the pool """
+    pool.terminate()
+    pool.join()
+
+
+class ParallelNeighborhoodEvaluation:
+    def __init__(self, workers: int, n: int, links: list, capacities: dict, targets: list, demand_matrix: dict):
+        """
+        :param workers: number of worker processes
+        :param n: number of nodes
+        :param links: list with [(u,v), ..]; maps link_id -> (u,v)
+        :param capacities: dict with {(u,v): c, ..}
+        :param targets: list of target nodes
+        :param demand_matrix: dict with {(s,t): d, ..}
+        """
+        assert workers > 1, "at least two workers are required"
+        self.__workers = workers
+        self.__pool = mp.Pool(workers, initializer=_init_worker,
+                              initargs=(n, links, capacities, targets, demand_matrix))
+        self.__finalizer = weakref.finalize(self, _release, self.__pool)
+
+        # parallel efficiency of each call of evaluate: evaluation time / (workers * wall clock time); NaN if no
+        # weights vector was evaluated, i.e., there is one entry per call (per iteration of HeurOSPFWeights)
+        self.efficiencies = list()
+
+    def evaluate(self, weights_list: list) -> list:
+        """ Returns [(cost, distances, loads), ..] for the weights vectors in the given order """
+        if not weights_list:
+            self.efficiencies.append(float("nan"))
+            return list()
+        t_start = time.perf_counter()
+        chunk_size = math.ceil(len(weights_list) / self.__workers)
+        results = self.__pool.map(_evaluate, weights_list, chunksize=chunk_size)
+        wall_time = time.perf_counter() - t_start
+        busy_time = sum(result[3] for result in results)
+        self.efficiencies.append(busy_time / (self.__workers * wall_time) if wall_time > 0 else 1.)
+        return [result[:3] for result in results]
+
+    def close(self):
+        """ Stops the workers """
+        self.__finalizer()
@@ -0,0 +1,121 @@
+"""
+Routing matrix of a fixed weight setting: R[e, k] is the fraction of the demand of OD pair k = (s,t) that is routed
+over link e with equal split over the shortest paths ('path', as EqualSplitShortestPath) or per hop ('hop', ECMP).
+The loads of a batch of demand matrices D (OD pairs x samples) are R @ D / capacity, i.e., the shortest path work is
+done once per OD pair and not once per demand matrix. R is a scipy.sparse CSR matrix; its columns are compiled on
+demand for the OD pairs (or segments) of the given demands.
+The loads are equal to the ones of EqualSplitShortestPath up to floating point rounding (other order of additions).
+"""
+
+import numpy as np
+import networkx as nx
+from scipy import sparse
+
+from algorithm.segment_routing.shortest_path_dag import ShortestPathDAGs, repeated_add
+from algorithm.segment_routing.sr_utility import SRUtility
+from demand.demand_array import is_demand_array
+
+
+class RoutingMatrix:
+    def __init__(self, links: list, weights: dict = None, split_mode: str = "path"):
+        """
+        :param links: list with [(i,j,c), ..]; row e of the matrix belongs to links[e]
+        :param weights: (optional) weights as dict with {(i,j): weight, ..}; default: 1
+        :param split_mode: 'path': equal split over all shortest paths, 'hop': equal split over the next hops
+        """
+        assert split_mode in ["path", "hop"], f"unknown split mode {split_mode}"
+        self.weights = weights if weights else {(i, j): 1 for i, j, _ in links}
+        self.split_mode = split_mode
+
+        self.__links = [(i, j) for i, j, _ in links]
+        self.__link_ids = {link: link_id for link_id, link in enumerate(self.__links)}
+        self.__capacities = np.array([c for _, _, c in links], np.float64)
+
+        # same (scaled) weights as in EqualSplitShortestPath
+        graph = nx.DiGraph()
+        for i, j in self.__links:
+            graph.add_edge(i, j, weight=int(self.weights[i, j]) * 100)
+        assert all(w > 0 for _, _, w in graph.edges(data='weight')), "routing matrix requires positive weights"
+        self.__dags = ShortestPathDAGs(graph, weight='weight')
+
+        # column per OD pair: pair_ids {(s,t): column}; entries (link ids, fractions) per column
+        self.__pair_ids = dict()
+        self.__columns = list()
+        self.__matrix = None
+
+    def __add_pair(self, s, t):
+        """ Computes the fractions of the demand of (s,t) per link and adds the column """
+        if s == t:
+            link_ids, fractions = list(), list()
+        elif self.split_mode == "path":
+            number_paths, link_counts = self.__dags.get_link_path_counts(s, t)
+            link_ids = [self.__link_ids[i, j] for i, j, _ in link_counts]
+            fractions = [count / number_paths for _, _, count in link_counts]
+        else:
+            flow_sum = {link: 0 for link in self.__links}
+            self.__dags.add_per_hop_flows(flow_sum, [(s, t, 1.)])
+            link_ids = [self.__link_ids[link] for link, flow in flow_sum.items() if flow > 0]
+            fractions = [flow_sum[self.__links[link_id]] for link_id in link_ids]
+        self.__pair_ids[s, t] = len(self.__columns)
+        self.__columns.append((link_ids, fractions))
+        self.__matrix = None
+        return
+
+    def get_matrix(self) -> sparse.csr_matrix:
+        """ Returns the routing matrix (links x compiled OD pairs) """
+        if self.__matrix is None:
+            rows = [link_id for link_ids, _ in self.__columns for link_id in link_ids]
+            columns = [k for k, (link_ids, _) in enumerate(self.__columns) for _ in link_ids]
+            data = [fraction for _, fractions in self.__columns for fraction in fractions]
+            self.__matrix = sparse.csr_matrix((data, (rows, columns)), shape=(len(self.__links), len(self.__columns)))
+        return self.__matrix
+
+    def __get_pair_demands(self, demands, waypoints: dict = None) -> dict:
+        """ Returns {(s,t): sum of demands, ..} of the (segmented) demands """
+        if is_demand_array(demands) and waypoints is None:
+            pair_demands = dict()
+            for s, t, d, multiplicity in demands.tolist():
+                pair_demands[s, t] = repeated_add(pair_demands.get((s, t), 0), d, multiplicity)
+            return pair_demands
+        if is_demand_array(demands):
+            demands = [(s, t, d) for s, t, d, multiplicity in demands.tolist() for _ in range(multiplicity)]
+        if waypoints is not None:
+            demands = SRUtility.get_segmented_demands(waypoints, demands)
+        pair_demands = dict()
+        for s, t, d in demands:
+            pair_demands[s, t] = pair_demands.get((s, t), 0) + d
+        return pair_demands
+
+    def get_flows(self, demand_sets: list, waypoints: list = None) -> np.ndarray:
+        """
+        Computes the flow per link for a batch of demands
+        :param demand_sets: list with demand lists [(s,t,d), ..] or demand arrays (see demand.demand_array)
+        :param waypoints: (optional) list with waypoints {idx: [(p,q), ..], ..} (or None) per demand set
+        :return: array (links x demand sets) with flow[e, b]
+        """
+        waypoints = waypoints if waypoints is not None else [None] * len(demand_sets)
+        pair_demands = [self.__get_pair_demands(demands, wps) for demands, wps in zip(demand_sets, waypoints)]
+        for pairs in pair_demands:
+            for s, t in pairs:
+                if (s, t) not in self.__pair_ids:
+                    self.__add_pair(s, t)
+
+        demand_matrix = np.zeros((len(self.__pair_ids), len(demand_sets)), np.float64)
+        for b, pairs in enumerate(pair_demands):
+            for pair, d in pairs.items():
+                demand_matrix[self.__pair_ids[pair], b] = d
+        return self.get_matrix() @ demand_matrix
+
+    def get_loads(self, demand_sets: list, waypoints: list = None) -> np.ndarray:
+        """ Returns an array (links x demand sets) with the link utilization per demand set """
+        return self.get_flows(demand_sets, waypoints) / self.__capacities[:, None]
+
+    def get_max_utilizations(self, demand_sets: list, waypoints: list = None) -> np.ndarray:
+        """ Returns the max. link utilization (MLU) per demand set """
+        loads = self.get_loads(demand_sets, waypoints)
+        return loads.max(axis=0) if len(self.__links) else np.zeros(len(demand_sets))
+
+    def get_flow_dict(self, demands, waypoints: dict = None) -> dict:
+        """ Returns the flow per link of a single demand set as dict {(i,j): flow, ..} """
+        flows = self.get_flows([demands], None if waypoints is None else [waypoints])[:, 0]
+        return dict(zip(self.__links, flows.tolist()))
@@ -4,6 +4,7 @@ import time
 import gurobipy as gp
 
 from algorithm.generic_sr import GenericSR
+from demand.demand_array import to_demand_list
 from utility import utility
 
 
@@ -12,8 +13,9 @@ class SegmentILP(GenericSR):
                  waypoint_count: int = 1, method: str = "JOINT", splitting_factor: int = 15,
                  model_name: str = "sr_ilp", max_weight=None, log_file_name: str = "gurobi.log", time_out=None,
                  log_to_console=None, threads=None, **kwargs):
-        super().__init__(nodes, links, demands, weights, waypoints)
+        super().__init__(nodes, links, demands, weights, waypoints, **kwargs)
         self.__is_build = False
+        demands = to_demand_list(demands)
 
         assert type(waypoint_count) is int and waypoint_count > 0, "waypoint_count must be greater than 0"
         assert method.upper() in ["JOINT", "WAYPOINTS", "WEIGHTS"], "must be from ['JOINT', 'WAYPOINTS', 'WEIGHTS']"
@@ -23,7 +25,7 @@ class SegmentILP(GenericSR):
         self.__threads = threads if threads else utility.MAX_THREADS
         self.__log_to_console = log_to_console if log_to_console else utility.LOGTOCONSOLE
         self.__nodes = nodes  # [i, ...]
-        self.__links = links  # [(i,j,c), ...]
+        self.__links = self.problem_instance.get_links()  # [(i,j,c), ...] ordered by link_id (shared ProblemInstance)
         self.__demands = {idx: (s, t, d) for idx, (s, t, d) in enumerate(demands)}  # dict with: {idx:(s, t, d), ...}
         self.__waypoint_count = waypoint_count  # allowed number of waypoints per demand
         self.__max_weight = max_weight if max_weight else gp.GRB.INFINITY  # Note: discrete set of possible weights in [1, 2, .., max_weight]
@@ -41,7 +43,7 @@ class SegmentILP(GenericSR):
         self.__log_file_name = os.path.abspath(log_file_name)
 
         # See ILP definition for M constant - ILP (1)
-        self.__M = max(sum(d for s, t, d in demands), 2 * len(links), 100)
+        self.__M = max(sum(d for s, t, d in demands), 2 * len(self.__links), 100)
         self.__segments = [(u, v) for u in self.__nodes for v in self.__nodes if u != v]  # ILP (2)
 
         # Gurobi variables:
@@ -55,6 +57,8 @@ class SegmentILP(GenericSR):
         self.__f_segment = None
         self.__distance = None
         self.__w = None
+        self.__demand_constrs = list()  # constraints of the segment variables S (replaced by set_demands)
+        self.__big_m_constrs = list()  # constraints with the constant M (updated by set_demands)
 
         self.setup_constraints()
         return
@@ -98,8 +102,8 @@ class SegmentILP(GenericSR):
 
     def __gb_c_demands_segments(self):
         """ This method sets the demands on segments constraints - ILP: (4) """
-        self.__model.addConstrs(self.__d_segments[p, q] == gp.quicksum(
-            self.__segments_flows[p, q, i] * d for i, (s, t, d) in self.__demands.items()) for p, q in self.__segments)
+        self.__demand_constrs.append(self.__model.addConstrs(self.__d_segments[p, q] == gp.quicksum(
+            self.__segments_flows[p, q, i] * d for i, (s, t, d) in self.__demands.items()) for p, q in self.__segments))
         return
 
     def __gp_c_flows(self):
@@ -123,29 +127,30 @@ class SegmentILP(GenericSR):
     def __gp_c_segments_paths(self):
         """ This method sets the segment paths - ILP: (6) and (7)"""
         # (6-i) v != s,t
-        self.__model.addConstrs(
+        self.__demand_constrs.append(self.__model.addConstrs(
             self.__segments_flows.sum('*', v, i) - self.__segments_flows.sum(v, '*', i) == 0 for v in self.__nodes for
-            i, (s, t, _) in self.__demands.items() if v != s and v != t)
+            i, (s, t, _) in self.__demands.items() if v != s and v != t))
 
         # (6-ii) v == s
-        self.__model.addConstrs(
+        self.__demand_constrs.append(self.__model.addConstrs(
             self.__segments_flows.sum('*', v, i) - self.__segments_flows.sum(v, '*', i) == -1 for v in self.__nodes for
-            i, (s, t, _) in self.__demands.items() if v == s)
+            i, (s, t, _) in self.__demands.items() if v == s))
 
         # (6-iii) v == t
-        self.__model.addConstrs(
+        self.__demand_constrs.append(self.__model.addConstrs(
             self.__segments_flows.sum('*', v, i) - self.__segments_flows.sum(v, '*', i) == 1 for v in self.__nodes for
-            i, (s, t, _) in self.__demands.items() if v == t)
+            i, (s, t, _) in self.__demands.items() if v == t))
 
         # (7)
-        self.__model.addConstrs(
-            self.__segments_flows.sum('*', '*', i) <= self.__waypoint_count + 1 for i in self.__demands)
+        self.__demand_constrs.append(self.__model.addConstrs(
+            self.__segments_flows.sum('*', '*', i) <= self.__waypoint_count + 1 for i in self.__demands))
         return
 
     def __gp_c_fix_segments(self):
         """ (optional) This method adds constraints that all segments are fixed from s to t.
         No additional waypoints are allowed. Used for WEIGHTS optimization only - ILP (not mentioned yet)"""
-        self.__model.addConstrs(self.__segments_flows[s, t, i] == 1 for i, (s, t, _) in self.__demands.items())
+        self.__demand_constrs.append(
+            self.__model.addConstrs(self.__segments_flows[s, t, i] == 1 for i, (s, t, _) in self.__demands.items()))
         return
 
     def __gp_c_capacity(self):
@@ -157,9 +162,9 @@ class SegmentILP(GenericSR):
 
     def __gp_c_shortest_path_tree(self):
         """sets the shortest path constraint - ILP (9)"""
-        self.__model.addConstrs(
+        self.__big_m_constrs.append(self.__model.addConstrs(
             self.__f_link[p, q, i, j] <= self.__M * self.__x[q, i, j] for p, q in self.__segments for i, j, _ in
-            self.__links)
+            self.__links))
         return
 
     def __gp_c_set_splitting_factor(self):
@@ -174,9 +179,9 @@ class SegmentILP(GenericSR):
         self.__model.addConstrs(self.__f_link.sum('*', t, i, j) <= self.__f_segment[t, i]
                                 for v, t in self.__segments for i, j, _ in self.__links if i != t)
         # (11-ii)
-        self.__model.addConstrs(
+        self.__big_m_constrs.append(self.__model.addConstrs(
             self.__f_segment[t, i] - self.__f_link.sum('*', t, i, j) <= self.__M * (1 - self.__x[t, i, j])
-            for v, t in self.__segments for i, j, _ in self.__links if i != t)
+            for v, t in self.__segments for i, j, _ in self.__links if i != t))
         return
 
     def __gp_c_weights(self):
@@ -188,14 +193,14 @@ class SegmentILP(GenericSR):
             self.__nodes if t != u)
 
         # ILP (12-ii)
-        self.__model.addConstrs(
+        self.__big_m_constrs.append(self.__model.addConstrs(
             self.__distance[v, t] - self.__distance[u, t] + self.__w[u, v] <= self.__M * (1 - self.__x[t, u, v]) for
-            u, v, _ in self.__links for t in self.__nodes if t != u)
+            u, v, _ in self.__links for t in self.__nodes if t != u))
 
         # ILP (12-iii)
-        self.__model.addConstrs(
+        self.__big_m_constrs.append(self.__model.addConstrs(
             1 - self.__x[t, u, v] <= self.__M * (self.__distance[v, t] - self.__distance[u, t] + self.__w[u, v]) for
-            u, v, _ in self.__links for t in self.__nodes if t != u)
+            u, v, _ in self.__links for t in self.__nodes if t != u))
         return
 
     def __gp_c_fix_weights(self):
@@ -222,6 +227,44 @@ class SegmentILP(GenericSR):
         if self.__method == "WAYPOINTS":  # ILP (not mentioned in formulation)
             self.__gp_c_fix_weights()
 
+    def __set_big_m(self, big_m):
+        """ Replaces the constant M in the variable bounds and in the constraints (9), (11-ii), (12-ii), (12-iii) """
+        if big_m == self.__M:
+            return
+        for var in [self.__max_util, *self.__utilization.values(), *self.__f_link.values(),
+                    *self.__f_segment.values()]:
+            var.UB = big_m
+        for constrs in self.__big_m_constrs:
+            for constr in constrs.values():
+                row = self.__model.getRow(constr)
+                for k in range(row.size()):
+                    if abs(row.getCoeff(k)) == self.__M:
+                        self.__model.chgCoeff(constr, row.getVar(k), big_m if row.getCoeff(k) > 0 else -big_m)
+                if constr.RHS == self.__M:
+                    constr.RHS = big_m
+        self.__M = big_m
+        return
+
+    def set_demands(self, demands: list):
+        """
+        Replaces the demands; the variables and constraints of the flows, capacities, shortest paths and weights are
+        kept (with the new M), only the segment variables S and their constraints (4), (6), (7) are replaced
+        """
+        demands = to_demand_list(demands)
+        self.__model.update()
+        self.__model.remove([constr for constrs in self.__demand_constrs for constr in constrs.values()])
+        self.__model.remove(list(self.__segments_flows.values()))
+        self.__demand_constrs = list()
+
+        self.__demands = {idx: (s, t, d) for idx, (s, t, d) in enumerate(demands)}
+        self.__set_big_m(max(sum(d for s, t, d in demands), 2 * len(self.__links), 100))
+        self.__segments_flows = self.__model.addVars(self.__segments, self.__demands.keys(), vtype=gp.GRB.BINARY)
+        self.__gb_c_demands_segments()  # ILP (4)
+        self.__gp_c_segments_paths()  # ILP (6), (7)
+        if self.__method == "WEIGHTS":
+            self.__gp_c_fix_segments()
+        return
+
     def solve(self) -> dict:
         """ Solves the MIP
         :return: dict with execution time, objective, segments and weight-assignment
@@ -4,7 +4,7 @@ from algorithm.generic_sr import GenericSR
 class SequentialCombination(GenericSR):
     def __init__(self, nodes: list, links: list, demands: list, weights: dict = None, waypoints: dict = None,
                  first_algorithm: str = "", second_algorithm: str = "", seed=0, **kwargs):
-        super().__init__(nodes, links, demands, weights, waypoints)
+        super().__init__(nodes, links, demands, weights, waypoints, **kwargs)
         assert first_algorithm and first_algorithm != "", "First algorithm must be defined"
         assert second_algorithm and second_algorithm != "", "Second algorithm must be defined"
 
@@ -14,6 +14,7 @@ class SequentialCombination(GenericSR):
         self.__first_algorithm = first_algorithm  # name of first algorithm (weights and/or waypoints are input for the second algorithm)
         self.__second_algorithm = second_algorithm  # name of second algorithm
         self.__seed = seed
+        self.__first = None  # instance of first_algorithm; later samples only replace its demands
 
     def solve(self) -> dict:
         """
@@ -24,16 +25,21 @@ class SequentialCombination(GenericSR):
         solution = dict()
 
         from algorithm.sr_factory import get_algorithm
-        # route on shortest paths
-        first = get_algorithm(algorithm_name=self.__first_algorithm, demands=self.__demands, nodes=self.__nodes,
-                              links=self.__links)
-        solution_first = first.solve()
+        # route on shortest paths; both algorithms share the topology arrays of the problem instance
+        problem = self.problem_instance
+        if self.__first is None:
+            self.__first = get_algorithm(algorithm_name=self.__first_algorithm, demands=self.__demands,
+                                         nodes=self.__nodes, links=self.__links, problem_instance=problem)
+        else:
+            self.__first.problem_instance = problem
+            self.__first.set_demands(self.__demands)
+        solution_first = self.__first.solve()
         solution.update({f"{self.__first_algorithm}_{k}": v for k, v in solution_first.items()})
         weights = solution_first['weights']
         waypoints = solution_first['waypoints']
 
         second = get_algorithm(algorithm_name=self.__second_algorithm, demands=self.__demands, nodes=self.__nodes,
-                               links=self.__links, weights=weights, waypoints=waypoints)
+                               links=self.__links, weights=weights, waypoints=waypoints, problem_instance=problem)
         solution_second = second.solve()
         solution.update({f"{self.__second_algorithm}_{k}": v for k, v in solution_second.items()})
 
@@ -48,6 +54,12 @@ class SequentialCombination(GenericSR):
         solution["loads"] = solution_second["loads"]
         return solution
 
+    def set_demands(self, demands: list):
+        """ Replaces the demands; the first algorithm keeps its topology dependent state (the second depends on the
+        weights of the first) """
+        self.__demands = demands
+        return
+
     def get_name(self):
         """ returns name of algorithm """
         return f"sequential_combination"
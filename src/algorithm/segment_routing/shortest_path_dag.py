@@ -0,0 +1,152 @@
+"""
+Flow propagation over shortest path DAGs without enumerating the shortest paths.
+The DAG towards a destination t (all links (i,j) with w(i,j) + dist(j,t) == dist(i,t)) is computed with one Dijkstra
+on the reversed graph; only destinations of the given demands (or segments) are computed and each only once.
+Per path split: a demand (s,t,d) is split equally over all shortest s-t paths, i.e., link (i,j) on the s-t DAG gets
+d / #paths once for each of the sigma_s(i) * sigma_t(j) paths over it (sigma_s(i): number of shortest s-i paths,
+sigma_t(j): number of shortest j-t paths). A shortest s-i path of a node i on a shortest s-t path is the prefix of a
+shortest s-t path, i.e., sigma_s(i) is counted by a sweep from s over the DAG towards t (no Dijkstra per source). The
+repeated additions are evaluated with repeated_add, which gives the
+same floating point result as adding d / #paths path by path (as with nx.all_shortest_paths).
+Per hop split (ECMP): each node splits its flow to t equally over its outgoing links on the DAG towards t; all demands
+to t are propagated in one sweep in decreasing distance to t.
+The link weights must be positive.
+"""
+
+import heapq
+import math
+
+import networkx as nx
+
+
+def repeated_add(x: float, value: float, k: int) -> float:
+    """
+    Returns the result of k additions x += value (rounded after each addition) for x, value >= 0. Within a binade
+    (fixed exponent of x) the rounding of x + value, i.e., the increment, is constant once two consecutive increments
+    are equal (round half to even makes the result even in the first tie), so such ranges are added at once.
+    """
+    previous = None  # (increment, exponent of x) of the last exact addition
+    while k > 0:
+        y = x + value
+        increment = y - x  # exact for x >= value (Fast2Sum)
+        exponent = math.frexp(x)[1]
+        if x >= value and previous == (increment, exponent):
+            if increment == 0:
+                return x
+            top = math.ldexp(1., exponent)  # x in [top / 2, top)
+            ulp = math.ldexp(1., exponent - 53)
+            # number of further additions that stay below top; all values are multiples of ulp (exact)
+            units = int(increment / ulp)
+            steps = min(k, (int((top - x) / ulp) - 1) // units)
+            if steps > 0:
+                x += (steps * units) * ulp
+                k -= steps
+                continue
+        previous = (increment, exponent) if x >= value and y < math.ldexp(1., exponent) else None
+        x = y
+        k -= 1
+    return x
+
+
+class ShortestPathDAGs:
+    def __init__(self, graph: nx.DiGraph, weight: str = "weight"):
+        """
+        :param graph: directed graph with positive link weights
+        :param weight: name of the weight attribute
+        """
+        self.__graph = graph
+        self.__weight = weight
+        self.__reversed_graph = graph.reverse(copy=False)
+
+        # per destination t: (distances to t, number of shortest paths to t, next hops on the DAG towards t)
+        self.__dags = dict()
+        # per segment (s,t): (number of shortest paths, [(i, j, number of shortest paths over (i,j)), ..])
+        self.__link_path_counts = dict()
+
+    def __get_dag(self, t):
+        """ Computes the DAG towards t with one Dijkstra on the reversed graph """
+        if t in self.__dags:
+            return self.__dags[t]
+        distances = nx.single_source_dijkstra_path_length(self.__reversed_graph, t, weight=self.__weight)
+        path_counts = dict()
+        next_hops = dict()
+        for i in sorted(distances, key=distances.get):
+            if i == t:
+                path_counts[i] = 1
+                next_hops[i] = list()
+                continue
+            next_hops[i] = [j for _, j, w in self.__graph.out_edges(i, data=self.__weight)
+                            if j in distances and w + distances[j] == distances[i]]
+            path_counts[i] = sum(path_counts[j] for j in next_hops[i])
+        self.__dags[t] = distances, path_counts, next_hops
+        return self.__dags[t]
+
+    def get_link_path_counts(self, s, t):
+        """
+        Counts the shortest s-t paths and the paths over each link of the s-t DAG
+        :return: number of shortest paths, list with [(i, j, number of shortest paths over (i,j)), ..]
+        """
+        if (s, t) in self.__link_path_counts:
+            return self.__link_path_counts[s, t]
+        distances_to_t, paths_to_t, next_hops = self.__get_dag(t)
+        if s not in distances_to_t:
+            raise nx.NetworkXNoPath(f"Target {t} cannot be reached from given sources")
+
+        # sweep from s in decreasing distance to t; paths_from_s[i]: number of shortest s-i paths
+        paths_from_s = {s: 1}
+        queue = [(-distances_to_t[s], s)]
+        link_counts = list()
+        while queue:
+            _, i = heapq.heappop(queue)
+            for j in next_hops[i]:
+                link_counts.append((i, j, paths_from_s[i] * paths_to_t[j]))
+                if j not in paths_from_s:
+                    paths_from_s[j] = 0
+                    heapq.heappush(queue, (-distances_to_t[j], j))
+                paths_from_s[j] += paths_from_s[i]
+        self.__link_path_counts[s, t] = paths_to_t[s], link_counts
+        return self.__link_path_counts[s, t]
+
+    def add_per_path_flows(self, flow_sum: dict, demands: list):
+        """
+        Adds the demands [(s, t, d), ..] to flow_sum {(i,j): flow} with equal split over all shortest paths (in the
+        given order; the result is the same as for adding the split demand path by path)
+        """
+        for t in dict.fromkeys(t for _, t, _ in demands):
+            self.__get_dag(t)
+        idx = 0
+        while idx < len(demands):
+            # consecutive identical demands add the same value to the same links
+            s, t, d = demands[idx]
+            multiplicity = 1
+            while idx + multiplicity < len(demands) and demands[idx + multiplicity] == (s, t, d):
+                multiplicity += 1
+            idx += multiplicity
+
+            number_paths, link_counts = self.get_link_path_counts(s, t)
+            split_demand = d / number_paths
+            for i, j, count in link_counts:
+                flow_sum[i, j] = repeated_add(flow_sum[i, j], split_demand, multiplicity * count)
+        return
+
+    def add_per_hop_flows(self, flow_sum: dict, demands: list):
+        """ Adds the demands [(s, t, d), ..] to flow_sum {(i,j): flow} with equal split per hop (ECMP) """
+        demands_to = dict()
+        for s, t, d in demands:
+            demands_to.setdefault(t, dict())
+            demands_to[t][s] = demands_to[t].get(s, 0) + d
+
+        for t, node_demands in demands_to.items():
+            distances_to_t, _, next_hops = self.__get_dag(t)
+            for s in node_demands:
+                if s not in distances_to_t:
+                    raise nx.NetworkXNoPath(f"Target {t} cannot be reached from given sources")
+            node_flows = dict(node_demands)
+            for i in sorted(distances_to_t, key=distances_to_t.get, reverse=True):
+                if i == t or node_flows.get(i, 0) <= 0:
+                    continue
+                split_flow = node_flows[i] / len(next_hops[i])
+                for j in next_hops[i]:
+                    flow_sum[i, j] += split_flow
+                    node_flows[j] = node_flows.get(j, 0) + split_flow
+        return
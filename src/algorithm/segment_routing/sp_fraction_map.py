@@ -0,0 +1,361 @@
+"""
+Sparse shortest path fraction map: for each (s,t) pair only the links on the ECMP shortest path DAG from s to t are
+stored together with the fraction of a unit flow from s to t that is routed over the link.
+The pairs are stored in compressed sparse row (CSR) layout, i.e., the memory grows with the total DAG size
+instead of n^4 (dense representation).
+The map is built with one sweep per destination t: the shortest path DAG to t is derived once and a unit flow from
+every source is pushed along it in topological order. The fractions are bit-identical to the per pair computation
+(from_distances_per_pair): the inflow of a node is added in the same order, i.e., by decreasing distance to t and by
+node index for equal distances. The baseline computation ordered nodes of equal distance with an unstable argsort and
+may therefore differ in the last bit (one ULP) for nodes with three or more DAG predecessors.
+LazySPFractionMap provides the same interface but computes the fractions on first access, as a tree per destination
+t (all pairs (s,t), see get_destination_fractions) or per source s (all pairs (s,t), see get_source_fractions). The
+waypoint scan of a demand (s,t) reads the pairs (s,t), (s,w) and (w,t) of all candidates w, i.e., it needs the source
+tree of s and the destination tree of t. The trees are kept in a bounded LRU cache.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+def get_destination_fractions(t: int, distances_to_t: np.ndarray, link_src: np.ndarray, link_dst: np.ndarray,
+                              link_weights: np.ndarray):
+    """
+    Computes the ECMP fractions of all pairs (s,t) with destination t
+    :param t: destination node
+    :param distances_to_t: shortest path distance from each node to t
+    :param link_src: link_id -> u
+    :param link_dst: link_id -> v
+    :param link_weights: link_id -> weight
+    :return: sources, link_ids, fractions of all non-zero entries (sorted by source, then link id); bit-identical
+        to the per pair computation (see module docstring)
+    """
+    n = len(distances_to_t)
+
+    # shortest path DAG to t (same criterion as in the per pair computation)
+    on_dag = link_weights == distances_to_t[link_src] - distances_to_t[link_dst]
+    dag_link_ids = np.flatnonzero(on_dag)
+    out_degree = np.bincount(link_src[dag_link_ids], minlength=n)
+    dag_out = np.split(dag_link_ids[np.argsort(link_src[dag_link_ids], kind='stable')],
+                       np.cumsum(out_degree)[:-1])
+
+    # node_fractions[s][u]: fraction of the unit flow from s that arrives at u
+    node_fractions = np.eye(n)
+    link_fractions = np.zeros((n, len(link_src)))
+
+    # nodes in topological order of the DAG, i.e., with decreasing distance to t; for a pair (s,t) this is the order
+    # of increasing distance from s of the per pair computation (ties by node index in both)
+    for u in np.argsort(-distances_to_t, kind='stable'):
+        if u == t or not out_degree[u]:
+            continue
+        out_link_ids = dag_out[u]
+        new_fraction = node_fractions[:, u] / out_degree[u]
+        link_fractions[:, out_link_ids] = new_fraction[:, np.newaxis]
+        node_fractions[:, link_dst[out_link_ids]] += new_fraction[:, np.newaxis]
+
+    link_fractions[t] = 0
+    sources, link_ids = np.nonzero(link_fractions)
+    return sources, link_ids, link_fractions[sources, link_ids]
+
+
+def get_source_fractions(s: int, distances: np.ndarray, link_src: np.ndarray, link_dst: np.ndarray,
+                         link_weights: np.ndarray):
+    """
+    Computes the ECMP fractions of all pairs (s,t) with source s in one sweep over the nodes
+    :param s: source node
+    :param distances: all pairs shortest path distances with distances[u][t]
+    :param link_src: link_id -> u
+    :param link_dst: link_id -> v
+    :param link_weights: link_id -> weight
+    :return: targets, link_ids, fractions of all non-zero entries (sorted by target, then link id); bit-identical to
+        the per pair computation (see module docstring)
+    """
+    n = len(distances)
+
+    # on_dag[t][link_id]: link on the shortest path DAG to t (same criterion as in the per pair computation)
+    on_dag = link_weights == (distances[link_src] - distances[link_dst]).T
+    dag_targets, dag_link_ids = np.nonzero(on_dag)
+    out_degree = np.bincount(dag_targets * n + link_src[dag_link_ids], minlength=n * n).reshape(n, n)
+    out_order = np.argsort(link_src, kind='stable')
+    out_links = np.split(out_order, np.cumsum(np.bincount(link_src, minlength=n))[:-1])
+
+    # node_fractions[t][u]: fraction of the unit flow from s to t that arrives at u
+    node_fractions = np.zeros((n, n))
+    node_fractions[:, s] = 1
+    link_fractions = np.zeros((n, len(link_src)))
+
+    # nodes with increasing distance from s (ties by node index) as in the per pair computation; this is a
+    # topological order of the DAG from s to each t
+    for u in np.argsort(distances[s], kind='stable'):
+        node_fractions[u, u] = 0  # the flow to u ends at u
+        active = np.flatnonzero((node_fractions[:, u] != 0) & (out_degree[:, u] > 0))
+        if not len(active):
+            continue
+        out_link_ids = out_links[u]
+        new_fraction = node_fractions[active, u] / out_degree[active, u]
+        fractions = np.where(on_dag[np.ix_(active, out_link_ids)], new_fraction[:, np.newaxis], 0.)
+        link_fractions[np.ix_(active, out_link_ids)] = fractions
+        node_fractions[np.ix_(active, link_dst[out_link_ids])] += fractions
+
+    targets, link_ids = np.nonzero(link_fractions)
+    return targets, link_ids, link_fractions[targets, link_ids]
+
+
+def gather_rows(indptr: np.ndarray, link_ids: np.ndarray, fractions: np.ndarray, rows: np.ndarray):
+    """
+    Gathers the entries of several CSR rows at once
+    :return: row_index, link_ids, fractions; row_index[j] = i if entry j belongs to rows[i]
+    """
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    row_index = np.repeat(np.arange(len(rows)), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    entries = np.arange(row_index.size) - offsets[row_index] + starts[row_index]
+    return row_index, link_ids[entries], fractions[entries]
+
+
+class SPFractionMap:
+    def __init__(self, n: int, indptr: np.ndarray, link_ids: np.ndarray, fractions: np.ndarray):
+        """
+        :param n: number of nodes
+        :param indptr: offsets with length n*n+1; the entries of pair (s,t) are in [indptr[s*n+t], indptr[s*n+t+1])
+        :param link_ids: link ids on the shortest path DAG of the pairs
+        :param fractions: fraction of a unit flow routed over the corresponding link in link_ids
+        """
+        assert len(indptr) == n * n + 1, "indptr must contain n*n+1 offsets"
+        assert len(link_ids) == len(fractions), "link_ids and fractions must have the same length"
+        self.__n = n
+        self.__indptr = indptr
+        self.__link_ids = link_ids
+        self.__fractions = fractions
+
+    @classmethod
+    def from_pair_rows(cls, n: int, rows: dict):
+        """ Creates the CSR map from a dict with {(s,t): (link_ids, fractions), ...} """
+        lengths = np.zeros(n * n, np.int64)
+        for (s, t), (link_ids, _) in rows.items():
+            lengths[s * n + t] = len(link_ids)
+        indptr = np.zeros(n * n + 1, np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+
+        link_ids = np.zeros(indptr[-1], np.int64)
+        fractions = np.zeros(indptr[-1], np.float64)
+        for (s, t), (pair_link_ids, pair_fractions) in rows.items():
+            start, end = indptr[s * n + t], indptr[s * n + t + 1]
+            link_ids[start:end] = pair_link_ids
+            fractions[start:end] = pair_fractions
+        return cls(n, indptr, link_ids, fractions)
+
+    @classmethod
+    def from_distances(cls, n: int, link_src: np.ndarray, link_dst: np.ndarray, link_weights: np.ndarray,
+                       distances):
+        """
+        Creates the map with one DAG sweep per destination
+        :param distances: all pairs shortest path distances with distances[u][t]
+        """
+        distances = np.array(distances, np.float64)
+        pair_ids, link_ids, fractions = list(), list(), list()
+        for t in range(n):
+            t_sources, t_link_ids, t_fractions = get_destination_fractions(
+                t, distances[:, t], link_src, link_dst, link_weights)
+            pair_ids.append(t_sources * n + t)
+            link_ids.append(t_link_ids)
+            fractions.append(t_fractions)
+        pair_ids = np.concatenate(pair_ids)
+        order = np.argsort(pair_ids, kind='stable')
+        indptr = np.zeros(n * n + 1, np.int64)
+        np.cumsum(np.bincount(pair_ids, minlength=n * n), out=indptr[1:])
+        return cls(n, indptr, np.concatenate(link_ids)[order], np.concatenate(fractions)[order])
+
+    @classmethod
+    def from_distances_per_pair(cls, n: int, link_src: np.ndarray, link_dst: np.ndarray, link_weights: np.ndarray,
+                                distances):
+        """
+        Creates the map with a separate computation for each (s,t) pair (reference implementation; nodes of equal
+        distance are processed by node index)
+        :param distances: all pairs shortest path distances with distances[u][t]
+        """
+        out_links = {u: list() for u in range(n)}
+        for link_id, (u, v) in enumerate(zip(link_src, link_dst)):
+            out_links[u].append((link_id, v))
+
+        pair_rows = dict()
+        for s in range(n):
+            # iterate over nodes sorted by distance
+            u_map = dict(zip(range(n), np.array(distances[s]).argsort(kind='stable')))
+
+            for t in range(n):
+                if s == t:
+                    continue
+                node_fractions = np.zeros(n, np.float64)
+                node_fractions[s] = 1
+                link_ids = list()
+                link_fractions = list()
+
+                for u_idx in range(n - 1):
+                    u = u_map[u_idx]
+                    fraction = node_fractions[u]
+                    if not fraction:
+                        continue
+
+                    successors = list((link_id, v) for link_id, v in out_links[u] if
+                                      link_weights[link_id] == distances[u][t] - distances[v][t])
+
+                    new_fraction = fraction / len(successors)
+                    for link_id, v in successors:
+                        link_ids.append(link_id)
+                        link_fractions.append(new_fraction)
+                        node_fractions[v] += new_fraction if v != t else 0.
+                pair_rows[s, t] = (link_ids, link_fractions)
+        return cls.from_pair_rows(n, pair_rows)
+
+    def pair(self, s: int, t: int):
+        """ Returns (link_ids, fractions) of the shortest path DAG from s to t (views, do not modify) """
+        p = s * self.__n + t
+        start, end = self.__indptr[p], self.__indptr[p + 1]
+        return self.__link_ids[start:end], self.__fractions[start:end]
+
+    def pairs(self, sources: np.ndarray, targets: np.ndarray):
+        """
+        Gathers the entries of several pairs (sources[i], targets[i]) at once
+        :return: pair_index, link_ids, fractions; pair_index[j] = i if entry j belongs to pair i
+        """
+        p = np.asarray(sources, np.int64) * self.__n + np.asarray(targets, np.int64)
+        return gather_rows(self.__indptr, self.__link_ids, self.__fractions, p)
+
+    def __len__(self):
+        """ total number of stored (link, fraction) entries, i.e., the sum of all DAG sizes """
+        return len(self.__link_ids)
+
+    def astype(self, dtype):
+        """ Returns the map with fractions of the given dtype (self if the dtype matches) """
+        if self.__fractions.dtype == dtype:
+            return self
+        return SPFractionMap(self.__n, self.__indptr, self.__link_ids, self.__fractions.astype(dtype))
+
+    @property
+    def n(self) -> int:
+        """ number of nodes """
+        return self.__n
+
+    @property
+    def csr(self):
+        """ underlying arrays (indptr, link_ids, fractions) """
+        return self.__indptr, self.__link_ids, self.__fractions
+
+    @property
+    def nbytes(self) -> int:
+        """ memory used by the underlying arrays in bytes """
+        return self.__indptr.nbytes + self.__link_ids.nbytes + self.__fractions.nbytes
+
+
+class LazySPFractionMap:
+    def __init__(self, n: int, link_src: np.ndarray, link_dst: np.ndarray, link_weights: np.ndarray, distances,
+                 cache_size: int = None, dtype=np.float64):
+        """
+        :param n: number of nodes
+        :param link_src: link_id -> u
+        :param link_dst: link_id -> v
+        :param link_weights: link_id -> weight
+        :param distances: all pairs shortest path distances with distances[u][t]
+        :param cache_size: max. number of cached trees, source and destination trees together (None: keep all)
+        :param dtype: dtype of the fractions (computed in float64)
+        """
+        assert cache_size is None or cache_size > 0, "cache_size must be positive"
+        self.__n = n
+        self.__link_src = link_src
+        self.__link_dst = link_dst
+        self.__link_weights = link_weights
+        self.__distances = np.array(distances, np.float64)
+        self.__cache_size = cache_size if cache_size is not None else 2 * n
+        self.__dtype = dtype
+
+        # ("source", s) -> CSR rows with one row per target; ("destination", t) -> CSR rows with one row per source
+        self.__cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __get_tree(self, key: tuple):
+        """ Returns the CSR rows (indptr, link_ids, fractions) of a source or destination tree; computed on a miss """
+        rows = self.__cache.get(key)
+        if rows is not None:
+            self.hits += 1
+            self.__cache.move_to_end(key)
+            return rows
+
+        self.misses += 1
+        kind, node = key
+        if kind == "source":
+            other, link_ids, fractions = get_source_fractions(
+                node, self.__distances, self.__link_src, self.__link_dst, self.__link_weights)
+        else:
+            other, link_ids, fractions = get_destination_fractions(
+                node, self.__distances[:, node], self.__link_src, self.__link_dst, self.__link_weights)
+        indptr = np.zeros(self.__n + 1, np.int64)
+        np.cumsum(np.bincount(other, minlength=self.__n), out=indptr[1:])
+        rows = (indptr, link_ids, fractions.astype(self.__dtype, copy=False))
+
+        self.__cache[key] = rows
+        if len(self.__cache) > self.__cache_size:
+            self.__cache.popitem(last=False)
+        return rows
+
+    def __select_tree(self, source_key, destination_key):
+        """
+        Returns the key of the tree that serves pairs with a common source (source_key) and/or a common destination
+        (destination_key); a cached tree is preferred, otherwise the source tree if the pairs have several targets
+        :return: key; None if the pairs have neither a common source nor a common destination
+        """
+        if destination_key in self.__cache:
+            return destination_key
+        if source_key in self.__cache or destination_key is None:
+            return source_key
+        return destination_key
+
+    def pair(self, s: int, t: int):
+        """ Returns (link_ids, fractions) of the shortest path DAG from s to t (views, do not modify) """
+        key = self.__select_tree(("source", s), ("destination", t))
+        indptr, link_ids, fractions = self.__get_tree(key)
+        row = t if key[0] == "source" else s
+        start, end = indptr[row], indptr[row + 1]
+        return link_ids[start:end], fractions[start:end]
+
+    def pairs(self, sources: np.ndarray, targets: np.ndarray):
+        """
+        Gathers the entries of several pairs (sources[i], targets[i]) at once; see __select_tree for the tree that
+        serves pairs with a common source or destination, other pairs are grouped by destination
+        :return: pair_index, link_ids, fractions; pair_index[j] = i if entry j belongs to pair i
+        """
+        sources = np.asarray(sources, np.int64)
+        targets = np.asarray(targets, np.int64)
+        if not len(sources):
+            return np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0, self.__dtype)
+        source_key = ("source", int(sources[0])) if np.all(sources == sources[0]) else None
+        destination_key = ("destination", int(targets[0])) if np.all(targets == targets[0]) else None
+        key = self.__select_tree(source_key, destination_key)
+        if key is not None:
+            return gather_rows(*self.__get_tree(key), targets if key[0] == "source" else sources)
+
+        pair_index, link_ids, fractions = list(), list(), list()
+        for t in np.unique(targets):
+            positions = np.flatnonzero(targets == t)
+            t_index, t_link_ids, t_fractions = gather_rows(*self.__get_tree(("destination", int(t))),
+                                                           sources[positions])
+            pair_index.append(positions[t_index])
+            link_ids.append(t_link_ids)
+            fractions.append(t_fractions)
+
+        # same order as SPFractionMap.pairs: by pair index, entries of a pair by link id
+        pair_index = np.concatenate(pair_index)
+        order = np.argsort(pair_index, kind='stable')
+        return pair_index[order], np.concatenate(link_ids)[order], np.concatenate(fractions)[order]
+
+    def __len__(self):
+        """ total number of cached (link, fraction) entries """
+        return sum(len(link_ids) for _, link_ids, _ in self.__cache.values())
+
+    @property
+    def nbytes(self) -> int:
+        """ memory used by the cached arrays in bytes """
+        return sum(sum(a.nbytes for a in rows) for rows in self.__cache.values())
@@ -1,50 +1,49 @@
 from ..generic_sr import GenericSR
 import time
 import numpy as np
-from .demand_first_waypoints import DemandsFirstWaypoints
+from .demand_first_waypoints import DemandsFirstWaypoints, add_statistics
 from ..sr_factory import get_algorithm
 
 class TopoKWayPointHeur(DemandsFirstWaypoints):
 
     def __init__(self, nodes: list, links: list, demands: list, weights: dict = None, k: int = 1, waypoints: dict = None ,**kwargs):
-        super().__init__(nodes, links, demands, weights, waypoints)
+        super().__init__(nodes, links, demands, weights, waypoints, **kwargs)
         self.k = k
 
 
     def __demands_first_waypoints(self):
         """ main procedure """
-        distances = self._DemandsFirstWaypoints__compute_distances()
-        sp_fraction_map = self._DemandsFirstWaypoints__get_shortest_path_fraction_map(distances)
+        sp_fraction_map = self._DemandsFirstWaypoints__get_shortest_path_fraction_map()
         best_flow_map = self._DemandsFirstWaypoints__get_flow_map(sp_fraction_map)
-        best_util_map, best_objective = self._DemandsFirstWaypoints__compute_utilization(best_flow_map)
+        util_index, best_objective = self._DemandsFirstWaypoints__compute_utilization(best_flow_map)
 
         waypoints = dict()
+        rejected_demands = set()  # demands without improving waypoint; no state change since their rejection
         sorted_demand_idx_map = dict(zip(range(len(self._DemandsFirstWaypoints__demands)), np.array(self._DemandsFirstWaypoints__demands)[:, 2].argsort()[::-1]))
         for d_map_idx in range(len(self._DemandsFirstWaypoints__demands)):
             d_idx = sorted_demand_idx_map[d_map_idx]
             s, t, d = self._DemandsFirstWaypoints__demands[d_idx]
             best_waypoint = None
+            if (s, t, d) in rejected_demands:
+                # identical flow in the identical state: no improving waypoint either
+                waypoints[d_idx] = [(s, t)]
+                continue
             if self.k <= 0:
                 break
-            for waypoint in range(self._DemandsFirstWaypoints__n):
-                if waypoint == s or waypoint == t:
-                    continue
-                flow_map = self._DemandsFirstWaypoints__update_flow_map(sp_fraction_map, best_flow_map, s, t, d, waypoint)
-                util_map, objective = self._DemandsFirstWaypoints__compute_utilization(flow_map)
-
-                if objective < best_objective:
-                    best_flow_map = flow_map
-                    best_util_map = util_map
-                    best_objective = objective
-                    best_waypoint = waypoint
+            candidates = [waypoint for waypoint in range(self._DemandsFirstWaypoints__n)
+                          if waypoint != s and waypoint != t]
+            best_waypoint, best_flow_map, best_objective = self._DemandsFirstWaypoints__choose_waypoint(
+                sp_fraction_map, best_flow_map, util_index, best_objective, s, t, d, candidates)
 
             if best_waypoint is not None:
                 waypoints[d_idx] = [(s, best_waypoint), (best_waypoint, t)]
                 self.k = self.k - 1
+                rejected_demands.clear()
             else:
                 waypoints[d_idx] = [(s, t)]
+                rejected_demands.add((s, t, d))
 
-        loads = {(u, v): best_util_map[u][v] for u, v, in self._DemandsFirstWaypoints__links}
+        loads = self._DemandsFirstWaypoints__get_loads(util_index)
         return loads, waypoints, best_objective
 
     def solve(self) -> dict:
@@ -53,6 +52,7 @@ class TopoKWayPointHeur(DemandsFirstWaypoints):
         t_start = time.time()  # sys wide time
         pt_start = time.process_time()  # count process time (e.g. sleep excluded and count per core)
         loads, waypoints, objective = self.__demands_first_waypoints()
+        self._DemandsFirstWaypoints__stop_parallel_scan()
         pt_duration = time.process_time() - pt_start
         t_duration = time.time() - t_start
 
@@ -64,6 +64,7 @@ class TopoKWayPointHeur(DemandsFirstWaypoints):
             "weights": self._DemandsFirstWaypoints__weights,
             "loads": loads
         }
+        solution.update(self._DemandsFirstWaypoints__get_statistics())
 
         return solution
 
@@ -71,13 +72,16 @@ class TopoKWPJointHeur(GenericSR):
 
     seed = 42
 
-    def __init__(self, nodes: list, links: list, demands: list, weights: dict = None, k_list: list = [], **kwargs):
-        super().__init__(nodes, links, demands, weights, None)
+    def __init__(self, nodes: list, links: list, demands: list, weights: dict = None, k_list: list = [],
+                 fraction_cache_size: int = None, **kwargs):
+        super().__init__(nodes, links, demands, weights, None, **kwargs)
 
         self.__nodes = nodes  # [i, ..., n-1]
         self.__links = links  # [(i, j, capacity), ...]
         self.__demands = demands  # [(src, dst, demand), ...]
         self.__allowed_waypoints = k_list
+        self.__fraction_cache_size = fraction_cache_size
+        self.__heur_ospf = None  # HeurOSPFWeights shared by all k in k_list; reused by set_demands on the next sample
 
     def solve(self) -> dict:
         """
@@ -88,24 +92,41 @@ class TopoKWPJointHeur(GenericSR):
         solution_list=list()
         current_demands = self.__demands
 
-        # route on shortest paths
-        heur_ospf = get_algorithm(algorithm_name="heur_ospf_weights",demands=current_demands, nodes=self.__nodes,
-                                  links=self.__links)
-        solution_ospf = heur_ospf.solve()
+        # route on shortest paths; all sub-algorithms share the topology arrays of the problem instance
+        problem = self.problem_instance
+        if self.__heur_ospf is None:
+            self.__heur_ospf = get_algorithm(algorithm_name="heur_ospf_weights", demands=current_demands,
+                                             nodes=self.__nodes, links=self.__links, problem_instance=problem)
+        else:
+            self.__heur_ospf.problem_instance = problem
+            self.__heur_ospf.set_demands(current_demands)
+        solution_ospf = self.__heur_ospf.solve()
+
+        # the weights do not change between runs: reuse the shortest path fractions
+        sp_fraction_map = None
         for k in self.__allowed_waypoints:
             single_waypoint = TopoKWayPointHeur(nodes=self.__nodes, links=self.__links, demands=current_demands,
-                                                weights=solution_ospf['weights'], k=k)
+                                                weights=solution_ospf['weights'], k=k,
+                                                fraction_cache_size=self.__fraction_cache_size,
+                                                sp_fraction_map=sp_fraction_map, problem_instance=problem)
             solution_wp = single_waypoint.solve()
+            sp_fraction_map = single_waypoint.get_sp_fraction_map()
 
             current_solution= dict(solution_ospf)
             current_solution["execution_time"] += solution_wp["execution_time"]
             current_solution["process_time"] += solution_wp["process_time"]
             current_solution["objective"] = solution_wp["objective"]
             current_solution["loads"] = solution_wp["loads"]
+            add_statistics(current_solution, solution_wp)
             solution_list.append(current_solution)
 
         return solution_list
 
+    def set_demands(self, demands: list):
+        """ Replaces the demands; HeurOSPF keeps its topology dependent state """
+        self.__demands = demands
+        return
+
     def get_name(self):
         """ returns name of algorithm """
         return f"k_waypoints"
\ No newline at end of file
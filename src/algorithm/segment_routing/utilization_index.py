@@ -0,0 +1,73 @@
+"""
+Utilization index: max segment tree over link ids. Supports point updates of link utilizations and returns the
+maximal link utilization in O(1) after O(log m) per updated link. Moves of greedy heuristics can be scored by
+querying the max. utilization of all links not touched by the move.
+"""
+
+import numpy as np
+
+
+class UtilizationIndex:
+    def __init__(self, utilization: np.ndarray):
+        """
+        :param utilization: initial utilization per link id with length m (its dtype is used for the tree)
+        """
+        self.__m = len(utilization)
+        self.__size = 1
+        self.__depth = 0
+        while self.__size < self.__m:
+            self.__size *= 2
+            self.__depth += 1
+
+        # tree[1] is the root, tree[i] = max(tree[2*i], tree[2*i+1]), leaves are stored in tree[size:size+m]
+        self.__tree = np.full(2 * self.__size, -np.inf, np.asarray(utilization).dtype)
+        self.__tree[self.__size:self.__size + self.__m] = utilization
+        level = self.__size // 2
+        while level >= 1:
+            nodes = np.arange(level, 2 * level)
+            self.__tree[nodes] = np.maximum(self.__tree[2 * nodes], self.__tree[2 * nodes + 1])
+            level //= 2
+        self.__argmax = None  # cached argmax; invalidated on update
+
+    def update(self, link_ids: np.ndarray, utilization: np.ndarray):
+        """ Sets the utilization of the given (unique) link ids and repairs the affected inner nodes """
+        if not len(link_ids):
+            return
+        nodes = np.asarray(link_ids) + self.__size
+        self.__tree[nodes] = utilization
+        # duplicates in nodes are harmless: all of them get the same value assigned
+        for _ in range(self.__depth):
+            nodes = nodes // 2
+            self.__tree[nodes] = np.maximum(self.__tree[2 * nodes], self.__tree[2 * nodes + 1])
+        self.__argmax = None
+
+    def max(self) -> float:
+        """ Returns the maximal link utilization """
+        return self.__tree[1]
+
+    def argmax(self) -> int:
+        """ Returns the link id with maximal utilization (lowest id on ties) """
+        if self.__argmax is None:
+            node = 1
+            while node < self.__size:
+                node = 2 * node if self.__tree[2 * node] == self.__tree[node] else 2 * node + 1
+            self.__argmax = node - self.__size
+        return self.__argmax
+
+    def max_excluding(self, link_ids: np.ndarray) -> float:
+        """ Returns the maximal utilization of all links except the given (unique) link ids (-inf if none left) """
+        if not len(link_ids) or not np.any(np.asarray(link_ids) == self.argmax()):
+            return self.__tree[1]
+        argmax = self.__argmax
+        leaves = np.asarray(link_ids) + self.__size
+        saved = self.__tree[leaves]
+        self.update(link_ids, -np.inf)
+        result = self.__tree[1]
+        self.update(link_ids, saved)
+        self.__argmax = argmax
+        return result
+
+    @property
+    def utilization(self) -> np.ndarray:
+        """ Current utilization per link id (view, do not modify) """
+        return self.__tree[self.__size:self.__size + self.__m]
@@ -0,0 +1,155 @@
+"""
+Scoring of candidate waypoints for a demand (s,t,d): the new flow is only evaluated on the links touched by the
+(s,t), (s,w) and (w,t) DAGs; the max. utilization of all other links is taken from the utilization index.
+ParallelWaypointScan splits the candidates of a demand into chunks that are scored by a process pool. The fraction
+map, the capacities and the current flow are placed in shared memory once, so a task only consists of (s,t,d) and
+the candidates of its chunk. The chunks are concatenated in candidate order, i.e., the scores (and thus the chosen
+waypoint) are identical to the sequential scan. ParallelWaypointScan requires multiprocessing.shared_memory (Python
+3.8+), which is imported on use only, i.e., the sequential scan also runs on older Python versions.
+"""
+
+import multiprocessing as mp
+import weakref
+
+import numpy as np
+
+from algorithm.segment_routing.sp_fraction_map import SPFractionMap
+
+# state of a worker process; set by _init_worker
+_worker_state = dict()
+
+
+def score_touched_links(sp_fraction_map, flow_map: np.ndarray, capacity_map: np.ndarray, s: int, t: int, d: float,
+                        candidates: np.ndarray):
+    """
+    Computes the utilization of the touched links after rerouting demand (s,t,d) over each candidate (vectorized)
+    :return: touched link ids, max. utilization of the touched links for each candidate
+    """
+    st_link_ids, st_fractions = sp_fraction_map.pair(s, t)
+    sw_rows, sw_link_ids, sw_fractions = sp_fraction_map.pairs(np.full(len(candidates), s), candidates)
+    wt_rows, wt_link_ids, wt_fractions = sp_fraction_map.pairs(candidates, np.full(len(candidates), t))
+    touched = np.unique(np.concatenate((st_link_ids, sw_link_ids, wt_link_ids)))
+
+    # same order of operations as for the update of the flow map: (flow - f_st * d) + f_sw * d + f_wt * d
+    base_flow = flow_map[touched]
+    base_flow[np.searchsorted(touched, st_link_ids)] -= st_fractions * d
+    sw_flow = np.zeros((len(candidates), len(touched)), flow_map.dtype)
+    sw_flow[sw_rows, np.searchsorted(touched, sw_link_ids)] = sw_fractions * d
+    wt_flow = np.zeros((len(candidates), len(touched)), flow_map.dtype)
+    wt_flow[wt_rows, np.searchsorted(touched, wt_link_ids)] = wt_fractions * d
+    new_flow = base_flow + sw_flow
+    new_flow += wt_flow
+    return touched, np.max(new_flow / capacity_map[touched], axis=1)
+
+
+def lower_bounds(sp_fraction_map, flow_map: np.ndarray, capacity_map: np.ndarray, util_index, s: int, t: int,
+                 d: float, candidates: np.ndarray) -> np.ndarray:
+    """
+    Cheap lower bounds on the objective of rerouting demand (s,t,d) over each candidate. Flow is only removed from
+    the (s,t) DAG, hence (i) links outside of it keep at least their utilization, (ii) links on it keep at least the
+    utilization without the demand and (iii) the current bottleneck link gets at least its share of the (s,w) and
+    (w,t) DAGs. The bounds use the same floating point operations as score_touched_links, i.e., a candidate with a
+    bound >= the acceptance threshold (at most the current objective) cannot pass it.
+    """
+    st_link_ids, st_fractions = sp_fraction_map.pair(s, t)
+    st_flow = flow_map[st_link_ids]
+    st_flow -= st_fractions * d
+    demand_bound = util_index.max_excluding(st_link_ids)
+    if len(st_link_ids):
+        demand_bound = max(demand_bound, np.max(st_flow / capacity_map[st_link_ids]))
+    if demand_bound >= util_index.max():
+        # the bottleneck is not relieved by any waypoint
+        return np.full(len(candidates), demand_bound)
+
+    # the bottleneck link is on the (s,t) DAG, otherwise demand_bound would be the objective
+    bottleneck = util_index.argmax()
+    bottleneck_flow = st_flow[np.flatnonzero(st_link_ids == bottleneck)[0]]
+    sw_rows, sw_link_ids, sw_fractions = sp_fraction_map.pairs(np.full(len(candidates), s), candidates)
+    wt_rows, wt_link_ids, wt_fractions = sp_fraction_map.pairs(candidates, np.full(len(candidates), t))
+    sw_flow = np.zeros(len(candidates), flow_map.dtype)
+    on_bottleneck = sw_link_ids == bottleneck
+    sw_flow[sw_rows[on_bottleneck]] = sw_fractions[on_bottleneck] * d
+    wt_flow = np.zeros(len(candidates), flow_map.dtype)
+    on_bottleneck = wt_link_ids == bottleneck
+    wt_flow[wt_rows[on_bottleneck]] = wt_fractions[on_bottleneck] * d
+    new_flow = bottleneck_flow + sw_flow
+    new_flow += wt_flow
+    return np.maximum(new_flow / capacity_map[bottleneck], demand_bound)
+
+
+def _init_worker(n: int, specs: dict):
+    """ Attaches the shared memory blocks in a worker process """
+    from multiprocessing import shared_memory
+    arrays = dict()
+    for key, (name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _worker_state.setdefault("shms", list()).append(shm)
+        arrays[key] = np.ndarray(shape, dtype, buffer=shm.buf)
+    _worker_state["sp_fraction_map"] = SPFractionMap(n, arrays["indptr"], arrays["link_ids"], arrays["fractions"])
+    _worker_state["capacity_map"] = arrays["capacity_map"]
+    _worker_state["flow_map"] = arrays["flow_map"]
+
+
+def _score_chunk(s: int, t: int, d: float, candidates: np.ndarray):
+    """ Scores a chunk of candidates in a worker process (see score_touched_links) """
+    return score_touched_links(_worker_state["sp_fraction_map"], _worker_state["flow_map"],
+                               _worker_state["capacity_map"], s, t, d, candidates)
+
+
+def _release(pool, shms):
+    """ Stops the pool and frees the shared memory blocks """
+    pool.terminate()
+    pool.join()
+    for shm in shms:
+        try:
+            shm.close()
+        except BufferError:
+            pass  # a view is still referenced; the block is released with it
+        shm.unlink()
+
+
+class ParallelWaypointScan:
+    def __init__(self, workers: int, sp_fraction_map: SPFractionMap, capacity_map: np.ndarray, flow_map: np.ndarray):
+        """
+        :param workers: number of worker processes
+        :param sp_fraction_map: complete (CSR) fraction map
+        :param capacity_map: capacity per link id
+        :param flow_map: initial flow per link id; copied to shared memory, use self.flow_map afterwards
+        """
+        assert workers > 1, "at least two workers are required"
+        assert isinstance(sp_fraction_map, SPFractionMap), "the parallel scan requires the complete fraction map"
+        from multiprocessing import shared_memory
+        self.__workers = workers
+
+        indptr, link_ids, fractions = sp_fraction_map.csr
+        arrays = {
+            "indptr": indptr,
+            "link_ids": link_ids,
+            "fractions": fractions,
+            "capacity_map": np.asarray(capacity_map),
+            "flow_map": np.asarray(flow_map),
+        }
+        shms, specs, views = list(), dict(), dict()
+        for key, array in arrays.items():
+            shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            shms.append(shm)
+            views[key] = np.ndarray(array.shape, array.dtype, buffer=shm.buf)
+            views[key][:] = array
+            specs[key] = (shm.name, array.shape, array.dtype)
+
+        # flow state shared with the workers; updates have to be applied in place
+        self.flow_map = views["flow_map"]
+        self.__pool = mp.Pool(workers, initializer=_init_worker, initargs=(sp_fraction_map.n, specs))
+        self.__finalizer = weakref.finalize(self, _release, self.__pool, shms)
+
+    def score(self, s: int, t: int, d: float, candidates: np.ndarray, util_index) -> np.ndarray:
+        """ Returns the objective of rerouting demand (s,t,d) over each candidate """
+        chunks = [chunk for chunk in np.array_split(candidates, self.__workers) if len(chunk)]
+        results = self.__pool.starmap(_score_chunk, [(s, t, d, chunk) for chunk in chunks])
+        return np.concatenate([np.maximum(touched_max, util_index.max_excluding(touched))
+                               for touched, touched_max in results])
+
+    def close(self):
+        """ Stops the workers and frees the shared memory; self.flow_map must not be used afterwards """
+        self.flow_map = None
+        self.__finalizer()
@@ -1,7 +1,9 @@
 """ Factory for segment routing algorithms"""
 
 from algorithm.generic_sr import GenericSR
+from algorithm.problem_instance import ProblemInstance
 from algorithm.segment_routing.demand_first_waypoints import DemandsFirstWaypoints
+from algorithm.segment_routing.heur_ospf_islands import HeurOSPFIslands
 from algorithm.segment_routing.heur_ospf_weights import HeurOSPFWeights
 from algorithm.segment_routing.inverse_capacity import InverseCapacity
 from algorithm.segment_routing.segment_ilp import SegmentILP
@@ -9,23 +11,40 @@ from algorithm.segment_routing.sequential_combination import SequentialCombinati
 from algorithm.segment_routing.uniform_weights import UniformWeights
 
 
-def get_algorithm(algorithm_name: str, nodes: list, links: list, demands: list, weights=None, waypoints=None,
-                  seed: float = 42, ilp_method: str = None, time_out: int = None, sf: int = 100) -> GenericSR:
+def get_algorithm(algorithm_name: str, nodes: list = None, links: list = None, demands: list = None, weights=None,
+                  waypoints=None, seed: float = 42, ilp_method: str = None, time_out: int = None, sf: int = 100,
+                  workers: int = 1, problem_instance: ProblemInstance = None,
+                  routing_matrix: bool = False) -> GenericSR:
+    # routing_matrix (opt-in): uniform_weights and inverse_capacity compute the loads with a routing matrix (see
+    # RoutingMatrix; faster for many demand sets, equal loads up to floating point rounding)
+    # problem_instance (optional): shared by the algorithms; nodes, links and demands are derived from it if not given
+    if problem_instance is not None:
+        nodes = nodes if nodes is not None else problem_instance.get_nodes()
+        links = links if links is not None else problem_instance.get_links()
+        demands = demands if demands is not None else problem_instance.get_demands()
     algorithm_name = algorithm_name.lower()
     if algorithm_name == "demand_first_waypoints":
-        algorithm = DemandsFirstWaypoints(nodes, links, demands, weights, waypoints)
+        algorithm = DemandsFirstWaypoints(nodes, links, demands, weights, waypoints, workers=workers,
+                                          problem_instance=problem_instance)
     elif algorithm_name == "heur_ospf_weights":
-        algorithm = HeurOSPFWeights(nodes, links, demands, weights, waypoints, seed=seed, time_out=time_out)
+        algorithm = HeurOSPFWeights(nodes, links, demands, weights, waypoints, seed=seed, time_out=time_out,
+                                    workers=workers, problem_instance=problem_instance)
+    elif algorithm_name == "heur_ospf_islands":
+        algorithm = HeurOSPFIslands(nodes, links, demands, weights, waypoints, seed=seed, time_out=time_out,
+                                    problem_instance=problem_instance)
     elif algorithm_name == "inverse_capacity":
-        algorithm = InverseCapacity(nodes, links, demands, weights, waypoints, seed=seed)
+        algorithm = InverseCapacity(nodes, links, demands, weights, waypoints, seed=seed,
+                                    routing_matrix=routing_matrix, problem_instance=problem_instance)
     elif algorithm_name == "segment_ilp":
         algorithm = SegmentILP(nodes, links, demands, weights, waypoints, waypoint_count=1, method=ilp_method,
-                               splitting_factor=sf, time_out=time_out)
+                               splitting_factor=sf, time_out=time_out, problem_instance=problem_instance)
     elif algorithm_name == "sequential_combination":
         algorithm = SequentialCombination(nodes, links, demands, weights, waypoints, seed=seed, time_out=time_out,
-                                          first_algorithm="heur_ospf_weights", second_algorithm="demand_first_waypoints")
+                                          first_algorithm="heur_ospf_weights", second_algorithm="demand_first_waypoints",
+                                          problem_instance=problem_instance)
     elif algorithm_name == "uniform_weights":
-        algorithm = UniformWeights(nodes, links, demands, weights, waypoints, seed=seed)
+        algorithm = UniformWeights(nodes, links, demands, weights, waypoints, seed=seed,
+                                   routing_matrix=routing_matrix, problem_instance=problem_instance)
     else:
         err_msg = f"algorithm not found: {algorithm_name}"
         raise Exception(err_msg)
@@ -0,0 +1,61 @@
+""" Benchmark: DemandsFirstWaypoints with float32 vs. float64 flow state (runtime, peak memory, objective drift) """
+
+import time
+import tracemalloc
+
+from algorithm.segment_routing.demand_first_waypoints import DemandsFirstWaypoints
+from utility.benchmark import run_benchmark
+from utility.utility import HIGHLIGHT, CEND
+
+PRECISIONS = ["float64", "float32"]
+
+
+def run(n, links, demands, precision):
+    """ Solves once for the runtime and once with tracemalloc for the peak memory """
+    nodes = list(range(n))
+    t_start = time.time()
+    solution = DemandsFirstWaypoints(nodes, links, demands, precision=precision).solve()
+    execution_time = time.time() - t_start
+
+    tracemalloc.start()
+    DemandsFirstWaypoints(nodes, links, demands, precision=precision).solve()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return solution, execution_time, peak
+
+
+def measure(topology_name, n, links, demands):
+    """ Runs both precisions and reports the drift of float32 against float64 """
+    results = {precision: run(n, links, demands, precision) for precision in PRECISIONS}
+    (solution_64, time_64, peak_64), (solution_32, time_32, peak_32) = results["float64"], results["float32"]
+    same_waypoints = sum(solution_32["waypoints"][idx] == waypoints
+                         for idx, waypoints in solution_64["waypoints"].items())
+    result = {
+        "topology_name": topology_name,
+        "#nodes": n,
+        "#links": len(links),
+        "#demands": int(demands["multiplicity"].sum()),
+        "float64_time": time_64,
+        "float32_time": time_32,
+        "float64_peak_mbytes": peak_64 / 2 ** 20,
+        "float32_peak_mbytes": peak_32 / 2 ** 20,
+        "float64_objective": solution_64["objective"],
+        "float32_objective": solution_32["objective"],
+        "relative_drift": abs(solution_32["objective"] - solution_64["objective"]) / solution_64["objective"],
+        "same_waypoints_fraction": same_waypoints / len(solution_64["waypoints"]),
+    }
+    print(f"{HIGHLIGHT}{topology_name}{CEND} (|V|: {n}, |E|: {len(links)}): "
+          f"time {time_64:.3f}s -> {time_32:.3f}s, "
+          f"peak {result['float64_peak_mbytes']:.2f} MB -> {result['float32_peak_mbytes']:.2f} MB, "
+          f"drift {result['relative_drift']:.2e}, same waypoints {result['same_waypoints_fraction']:.3f}")
+    return [result]
+
+
+def main():
+    """ Runs both precisions on each SNDLib topology """
+    run_benchmark("benchmark_precision", measure)
+    return
+
+
+if __name__ == '__main__':
+    main()
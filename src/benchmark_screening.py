@@ -0,0 +1,62 @@
+""" Benchmark: HeurOSPFWeights with two-stage neighbor screening vs. the unscreened search (time to reach a max. util) """
+
+import random
+import time
+
+from algorithm.segment_routing.heur_ospf_weights import HeurOSPFWeights
+from utility.benchmark import run_benchmark, SEED
+from utility.utility import HIGHLIGHT, CEND
+
+ITERATIONS = 30
+
+# (screening_targets as fraction of the targets, screening_ratio); (0, 1) is the unscreened search
+SCREENING_CONFIGS = [(0, 1.), (0.1, 1.), (0.3, 1.), (0.3, 1.5), (0.5, 1.)]
+
+
+def run(n, links, demands, target_util=None, screening_fraction=0., screening_ratio=1.):
+    """ Runs HeurOSPFWeights (with the same random state) until target_util is reached or ITERATIONS are done """
+    random.seed(SEED)  # HeurOSPFWeights uses the module random for perturbations
+    number_targets = len(set(demands["dst"].tolist()))
+    screening_targets = int(round(screening_fraction * number_targets))
+    t_start = time.time()
+    solution = HeurOSPFWeights(list(range(n)), links, demands, iterations=ITERATIONS, seed=SEED,
+                               target_util=target_util, screening_targets=screening_targets,
+                               screening_ratio=screening_ratio).solve()
+    return solution, time.time() - t_start
+
+
+def measure(topology_name, n, links, demands):
+    """ Takes the max. utilization of the unscreened search as target and measures the time to reach it """
+    reference, _ = run(n, links, demands)
+    target_util = reference["objective"]
+    print(f"{HIGHLIGHT}{topology_name}{CEND} (|V|: {n}, |E|: {len(links)}): target max. util {target_util:.4f}")
+    results = list()
+    for screening_fraction, screening_ratio in SCREENING_CONFIGS:
+        solution, execution_time = run(n, links, demands, target_util, screening_fraction, screening_ratio)
+        result = {
+            "topology_name": topology_name,
+            "#nodes": n,
+            "#links": len(links),
+            "screening_fraction": screening_fraction,
+            "screening_ratio": screening_ratio,
+            "target_util": target_util,
+            "objective": solution["objective"],
+            "reached": solution["objective"] <= target_util,
+            "time_to_target": execution_time,
+            "used_iterations": solution["used_iterations"],
+            "screen_out_rate": solution.get("screen_out_rate", 0.),
+        }
+        results.append(result)
+        print(f"  screening {screening_fraction:.1f} x {screening_ratio:.1f}: {execution_time:.3f}s, "
+              f"reached {result['reached']}, screen-out rate {result['screen_out_rate']:.3f}")
+    return results
+
+
+def main():
+    """ Screening configurations on each SNDLib topology """
+    run_benchmark("benchmark_screening", measure)
+    return
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+""" Benchmark: per destination DAG sweep vs. per (s,t) pair computation of the shortest path fraction map """
+
+import functools
+import time
+
+import networkit as nk
+import numpy as np
+
+from algorithm.segment_routing.sp_fraction_map import SPFractionMap
+from utility.benchmark import run_benchmark, SEED
+from utility.utility import HIGHLIGHT, CEND
+
+MAX_WEIGHT = 20
+
+
+def get_distances(n, link_src, link_dst, link_weights):
+    """ All pairs shortest path distances with networKit """
+    g = nk.Graph(weighted=True, directed=True, n=n)
+    for u, v, w in zip(link_src, link_dst, link_weights):
+        g.addEdge(u, v, w)
+    apsp = nk.distance.APSP(g)
+    apsp.run()
+    return apsp.getDistances()
+
+
+def time_builder(builder, *args):
+    """ Returns the result and the execution time of a single build """
+    t_start = time.time()
+    result = builder(*args)
+    return result, time.time() - t_start
+
+
+def is_identical(n, map_a, map_b) -> bool:
+    """ Returns True if both fraction maps have the same links and bit-identical fractions for each pair """
+    for s in range(n):
+        for t in range(n):
+            link_ids_a, fractions_a = map_a.pair(s, t)
+            link_ids_b, fractions_b = map_b.pair(s, t)
+            order_a, order_b = np.argsort(link_ids_a), np.argsort(link_ids_b)
+            if not np.array_equal(link_ids_a[order_a], link_ids_b[order_b]) or \
+                    not np.array_equal(fractions_a[order_a], fractions_b[order_b]):
+                return False
+    return True
+
+
+def measure(topology_name, n, links, demands, rng):
+    """ Builds the fraction map with both methods with unit and random weights """
+    link_src = np.array([u for u, _, _ in links], np.int64)
+    link_dst = np.array([v for _, v, _ in links], np.int64)
+
+    weight_settings = {
+        "unit": np.ones(len(links)),
+        "random": rng.randint(1, MAX_WEIGHT + 1, size=len(links)).astype(np.float64),
+    }
+    results = list()
+    for weight_setting, link_weights in weight_settings.items():
+        distances = get_distances(n, link_src, link_dst, link_weights)
+        per_pair, per_pair_time = time_builder(
+            SPFractionMap.from_distances_per_pair, n, link_src, link_dst, link_weights, distances)
+        per_destination, per_destination_time = time_builder(
+            SPFractionMap.from_distances, n, link_src, link_dst, link_weights, distances)
+
+        result = {
+            "topology_name": topology_name,
+            "#nodes": n,
+            "#links": len(links),
+            "weights": weight_setting,
+            "per_pair_time": per_pair_time,
+            "per_destination_time": per_destination_time,
+            "speedup": per_pair_time / per_destination_time,
+            "entries": len(per_destination),
+            "sparse_mbytes": per_destination.nbytes / 2 ** 20,
+            "dense_mbytes": n ** 4 * 8 / 2 ** 20,
+            "identical": is_identical(n, per_pair, per_destination),
+        }
+        assert result["identical"], f"{topology_name} ({weight_setting}): fraction maps differ"
+        results.append(result)
+        print(f"{HIGHLIGHT}{topology_name}{CEND} ({weight_setting}, |V|: {n}, |E|: {len(links)}): "
+              f"per pair {per_pair_time:.3f}s, per destination {per_destination_time:.3f}s "
+              f"(x{result['speedup']:.1f}), {result['sparse_mbytes']:.2f} MB "
+              f"(dense: {result['dense_mbytes']:.0f} MB), identical: {result['identical']}")
+    return results
+
+
+def main():
+    """ Builds the fraction map with both methods on each SNDLib topology (no demands) """
+    rng = np.random.RandomState(SEED)
+    run_benchmark("benchmark_sp_fraction_map", functools.partial(measure, rng=rng), with_demands=False)
+    return
+
+
+if __name__ == '__main__':
+    main()
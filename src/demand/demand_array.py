@@ -0,0 +1,44 @@
+"""
+Compact demand representation: a structured numpy array with one row per (src, dst, volume) and the number of
+identical flows (multiplicity) instead of multiplicity identical tuples in the demand list.
+The expanded demand list [(src, dst, volume), ...] contains the rows in the given order, each row repeated
+multiplicity times, i.e., the flow index of the k-th copy of row r is sum(multiplicity[:r]) + k.
+"""
+
+import numpy as np
+
+DEMAND_DTYPE = np.dtype([("src", np.int64), ("dst", np.int64), ("volume", np.float64), ("multiplicity", np.int64)])
+
+
+def is_demand_array(demands) -> bool:
+    """ True if demands is a structured array with DEMAND_DTYPE """
+    return isinstance(demands, np.ndarray) and demands.dtype == DEMAND_DTYPE
+
+
+def from_demand_matrix(dm: dict, flows_per_pair: int) -> np.ndarray:
+    """ Creates the demand array with flows_per_pair flows of volume dm[s,t] / flows_per_pair for each pair """
+    demands = np.zeros(len(dm), DEMAND_DTYPE)
+    for idx, (s, t) in enumerate(dm):
+        demands[idx] = (s, t, dm[s, t] / flows_per_pair, flows_per_pair)
+    return demands
+
+
+def from_demand_list(demands: list) -> np.ndarray:
+    """ Creates the demand array from a demand list; consecutive identical demands are merged into one row """
+    rows = list()
+    for s, t, d in demands:
+        if rows and tuple(rows[-1][:3]) == (s, t, d):
+            rows[-1][3] += 1
+        else:
+            rows.append([s, t, d, 1])
+    return np.array([tuple(row) for row in rows], DEMAND_DTYPE)
+
+
+def to_demand_list(demands) -> list:
+    """ Returns the (expanded) demand list with [(src, dst, volume), ...]; lists are returned unchanged """
+    if not is_demand_array(demands):
+        return demands
+    demand_list = list()
+    for s, t, d, multiplicity in demands.tolist():
+        demand_list.extend([(s, t, d)] * multiplicity)
+    return demand_list
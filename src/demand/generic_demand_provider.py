@@ -1,5 +1,7 @@
 from abc import abstractmethod
 
+import numpy as np
+
 
 class GenericDemandProvider:
     @abstractmethod
@@ -10,6 +12,10 @@ class GenericDemandProvider:
     def demand_sequence(self, sample: int) -> list:
         raise Exception("Abstract traffic matrix factory - use a concrete class")
 
+    @abstractmethod
+    def demand_array(self, sample: int) -> np.ndarray:
+        raise Exception("Abstract traffic matrix factory - use a concrete class")
+
     @abstractmethod
     def demand_matrices(self) -> dict:
         raise Exception("Abstract traffic matrix factory - use a concrete class")
@@ -18,6 +24,10 @@ class GenericDemandProvider:
     def demand_sequences(self) -> list:
         raise Exception("Abstract traffic matrix factory - use a concrete class")
 
+    @abstractmethod
+    def demand_arrays(self) -> list:
+        raise Exception("Abstract traffic matrix factory - use a concrete class")
+
     @abstractmethod
     def get_name(self) -> str:
         raise Exception("Abstract traffic matrix factory - use a concrete class")
@@ -3,6 +3,7 @@
 import gurobipy as gb
 import numpy as np
 
+from demand.demand_array import from_demand_matrix
 from demand.generic_demand_provider import GenericDemandProvider
 from utility import utility
 
@@ -52,6 +53,7 @@ class McfDP(GenericDemandProvider):
 
         # set of results
         self.__demand_sequence_sets = dict()
+        self.__demand_array_sets = dict()
         self.__demand_matrix_sets = dict()
         return
 
@@ -185,6 +187,14 @@ class McfDP(GenericDemandProvider):
                     self.__demand_sequence_sets[sample].append((s, t, dm[s, t] / self.__flows_per_pair))
         return self.__demand_sequence_sets[sample]
 
+    def demand_array(self, sample: int) -> np.ndarray:
+        """ Get a single demand sequence as demand array, i.e., one row per pair with multiplicity flows_per_pair """
+        np.random.seed(self.__seed + sample)
+        if sample not in self.__demand_array_sets:
+            dm = self.demand_matrix(sample)
+            self.__demand_array_sets[sample] = from_demand_matrix(dm, self.__flows_per_pair)
+        return self.__demand_array_sets[sample]
+
     def demand_matrices(self) -> list:
         """ Generator object to get all sample demand matrices """
         for sample in range(self.__n_samples):
@@ -203,6 +213,16 @@ class McfDP(GenericDemandProvider):
             except Exception as ex:
                 continue
 
+    def demand_arrays(self) -> list:
+        """ Generator object to get all sample demand arrays """
+        for sample in range(self.__n_samples):
+            try:
+                yield self.demand_array(sample)
+            except gb.GurobiError as ex:
+                raise ex
+            except Exception as ex:
+                continue
+
     def __len__(self):
         """ len is defined by the number of samples """
         return self.__n_samples
@@ -5,6 +5,7 @@ from xml.dom import minidom
 
 import numpy as np
 
+from demand.demand_array import from_demand_matrix
 from demand.generic_demand_provider import GenericDemandProvider
 from demand.snd_lib.directory_mapping import directory_map
 from utility import utility
@@ -34,6 +35,7 @@ class SndLibTM(GenericDemandProvider):
         # set of results
         self.__demand_matrix_sets = dict()
         self.__demand_sequence_sets = dict()
+        self.__demand_array_sets = dict()
         return
 
     def __get_scaled_tm(self, tm):
@@ -89,6 +91,13 @@ class SndLibTM(GenericDemandProvider):
                     self.__demand_sequence_sets[sample].append((s, t, dm[s, t] / self.__flows_per_pair))
         return self.__demand_sequence_sets[sample]
 
+    def demand_array(self, sample: int) -> np.ndarray:
+        """ Get a single demand sequence as demand array, i.e., one row per pair with multiplicity flows_per_pair """
+        if sample not in self.__demand_array_sets:
+            dm = self.demand_matrix(sample)
+            self.__demand_array_sets[sample] = from_demand_matrix(dm, self.__flows_per_pair)
+        return self.__demand_array_sets[sample]
+
     def demand_matrices(self) -> list:
         """ Generator object to get all sample demand matrices """
         for sample in range(self.__n_samples):
@@ -105,6 +114,14 @@ class SndLibTM(GenericDemandProvider):
             except:
                 continue
 
+    def demand_arrays(self) -> list:
+        """ Generator object to get all sample demand arrays """
+        for sample in range(self.__n_samples):
+            try:
+                yield self.demand_array(sample)
+            except:
+                continue
+
     def __len__(self):
         """ len is defined by the number of samples """
         return self.__n_samples
@@ -0,0 +1,79 @@
+""" Test: demand arrays (flow multiplicities) give the same results as the expanded demand list (run with pytest or
+as script) """
+
+import numpy as np
+
+from algorithm.segment_routing.demand_first_waypoints import DemandsFirstWaypoints
+from algorithm.segment_routing.equal_split_shortest_path import EqualSplitShortestPath
+from algorithm.segment_routing.heur_ospf_weights import HeurOSPFWeights
+from algorithm.segment_routing.routing_matrix import RoutingMatrix
+from algorithm.segment_routing.shortest_path_dag import repeated_add
+from demand.demand_array import from_demand_matrix, to_demand_list
+from utility.utility import HIGHLIGHT, CEND
+
+SEED = 318924135
+
+
+def get_instance(n: int = 12, pairs: int = 20, flows_per_pair: int = 83):
+    """ Bidirectional ring with chords; volumes that are not exactly representable (rounding in each addition) """
+    rng = np.random.RandomState(SEED)
+    links = [(u, (u + 1) % n, 1000.) for u in range(n)] + [((u + 1) % n, u, 1000.) for u in range(n)]
+    links += [(u, (u + n // 2) % n, 700.) for u in range(n)]
+    dm = dict()
+    while len(dm) < pairs:
+        s, t = rng.randint(0, n, size=2).tolist()
+        if s != t:
+            dm[s, t] = float(rng.rand() * 100)
+    return list(range(n)), links, from_demand_matrix(dm, flows_per_pair)
+
+
+def test_repeated_add():
+    rng = np.random.RandomState(SEED)
+    for _ in range(200):
+        x, value, k = float(rng.rand() * 10), float(rng.rand()) / 3, int(rng.randint(1, 500))
+        expected = x
+        for _ in range(k):
+            expected += value
+        assert repeated_add(x, value, k) == expected
+
+
+def test_heur_ospf_demand_matrix():
+    _, _, demands = get_instance()
+    preprocess = HeurOSPFWeights._HeurOSPFWeights__preprocess_demand_segmentation
+    assert preprocess(None, demands) == preprocess(None, to_demand_list(demands))
+
+
+def test_equal_split_loads():
+    nodes, links, demands = get_instance()
+    for split_mode in ["path", "hop"]:
+        solution_array = EqualSplitShortestPath(nodes, links, demands, split_mode=split_mode).solve()
+        solution_list = EqualSplitShortestPath(nodes, links, to_demand_list(demands), split_mode=split_mode).solve()
+        assert solution_array["loads"] == solution_list["loads"], f"{split_mode}: loads differ"
+        assert solution_array["waypoints"] == solution_list["waypoints"]
+
+
+def test_routing_matrix_flows():
+    _, links, demands = get_instance()
+    routing_matrix = RoutingMatrix(links)
+    flows = routing_matrix.get_flows([demands, to_demand_list(demands)])
+    assert np.array_equal(flows[:, 0], flows[:, 1])
+
+
+def test_demands_first_waypoints():
+    nodes, links, demands = get_instance(flows_per_pair=4)
+    solution_array = DemandsFirstWaypoints(nodes, links, demands).solve()
+    solution_list = DemandsFirstWaypoints(nodes, links, to_demand_list(demands)).solve()
+    for key in ["objective", "waypoints", "loads"]:
+        assert solution_array[key] == solution_list[key], f"{key} differs"
+
+
+def main():
+    for test in [test_repeated_add, test_heur_ospf_demand_matrix, test_equal_split_loads, test_routing_matrix_flows,
+                 test_demands_first_waypoints]:
+        test()
+        print(f"{HIGHLIGHT}{test.__name__}{CEND}: passed")
+    return
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+""" Test: DialSPSP vs. networKit APSP on small topologies with zero and large weights (run with pytest or as script) """
+
+import networkit as nk
+import numpy as np
+
+from algorithm.segment_routing.dial_spsp import DialSPSP
+from algorithm.segment_routing.dynamic_spsp import UNREACHABLE
+from utility.utility import HIGHLIGHT, CEND
+
+SEED = 318924135
+
+# small topology (12 nodes, 15 bidirectional edges)
+EDGES = [(0, 1), (0, 2), (1, 3), (1, 10), (2, 3), (2, 8), (3, 4), (4, 5), (4, 9), (5, 6), (6, 7), (7, 9),
+         (8, 11), (9, 10), (10, 11)]
+
+
+def get_links(edges: list) -> list:
+    """ Both directions of each edge """
+    return [(u, v) for u, v in edges] + [(v, u) for u, v in edges]
+
+
+def get_apsp_distances(n: int, links: list, weights: np.ndarray, targets: list) -> np.ndarray:
+    """ Distances from all nodes to the targets (distances[t_idx][x]) with networKit """
+    g = nk.Graph(weighted=True, directed=True, n=n)
+    for (u, v), w in zip(links, weights.tolist()):
+        g.addEdge(u, v, w)
+    apsp = nk.distance.APSP(g)
+    apsp.run()
+    return np.array(apsp.getDistances(), np.float64)[:, targets].T
+
+
+def check_weights(n: int, links: list, weights: np.ndarray, targets: list, max_weight: int):
+    expected = get_apsp_distances(n, links, weights, targets)
+    distances = DialSPSP(n, links, targets, max_weight).get_distances(weights)
+    assert np.array_equal(distances, expected), f"max. difference {np.abs(distances - expected).max()}"
+
+
+def test_small_topology():
+    rng = np.random.RandomState(SEED)
+    n, links = 12, get_links(EDGES)
+    for max_weight in [1, 20, 10 ** 6]:
+        weights = rng.randint(1, max_weight + 1, size=len(links)).astype(np.float64)
+        check_weights(n, links, weights, list(range(n)), max_weight)
+
+
+def test_zero_weights():
+    """ Zero weight links (also zero weight cycles) settle further entries in the current bucket """
+    rng = np.random.RandomState(SEED)
+    n, links = 12, get_links(EDGES)
+    for max_weight in [1, 20, 10 ** 6]:
+        weights = rng.randint(1, max_weight + 1, size=len(links)).astype(np.float64)
+        weights[rng.rand(len(links)) < 0.4] = 0
+        check_weights(n, links, weights, list(range(n)), max_weight)
+    check_weights(n, links, np.zeros(len(links)), [0, 5, 11], 20)
+
+
+def test_unreachable():
+    """ Node 3 has no incoming links and node 4 is isolated """
+    links = [(0, 1), (1, 2), (2, 0), (3, 0), (3, 2)]
+    weights = np.array([0, 7, 10 ** 6, 3, 0], np.float64)
+    check_weights(5, links, weights, [0, 2, 3, 4], 10 ** 6)
+    distances = DialSPSP(5, links, [3], 10 ** 6).get_distances(weights)
+    assert np.array_equal(distances, [[UNREACHABLE, UNREACHABLE, UNREACHABLE, 0, UNREACHABLE]])
+
+
+def test_out():
+    """ The preallocated array is filled and returned """
+    n, links = 12, get_links(EDGES)
+    weights = np.arange(len(links), dtype=np.float64) % 5
+    out = np.empty((2, n), np.float64)
+    distances = DialSPSP(n, links, [3, 7], 4).get_distances(weights, out=out)
+    assert distances is out
+    assert np.array_equal(out, get_apsp_distances(n, links, weights, [3, 7]))
+
+
+def main():
+    for test in [test_small_topology, test_zero_weights, test_unreachable, test_out]:
+        test()
+        print(f"{HIGHLIGHT}{test.__name__}{CEND}: passed")
+    return
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+""" Test: DynamicSPSP under random weight changes vs. a fresh networKit APSP (run with pytest or as script) """
+
+import networkit as nk
+import numpy as np
+
+from algorithm.segment_routing.dynamic_spsp import DynamicSPSP
+from utility.utility import HIGHLIGHT, CEND
+
+SEED = 318924135
+
+
+def get_random_links(n: int, link_probability: float, rng: np.random.RandomState) -> list:
+    """ Random directed graph with a directed ring over the nodes 0..n-2; node n-1 has outgoing links only """
+    links = [(u, (u + 1) % (n - 1)) for u in range(n - 1)] + [(n - 1, 0)]
+    links += [(u, v) for u in range(n) for v in range(n - 1)
+              if u != v and (u, v) not in links and rng.rand() < link_probability]
+    return links
+
+
+def get_apsp_distances(n: int, links: list, weights: np.ndarray, targets: list) -> np.ndarray:
+    """ Distances from all nodes to the targets (distances[t_idx][x]) with a fresh networKit APSP """
+    g = nk.Graph(weighted=True, directed=True, n=n)
+    for (u, v), w in zip(links, weights.tolist()):
+        g.addEdge(u, v, w)
+    apsp = nk.distance.APSP(g)
+    apsp.run()
+    return np.array(apsp.getDistances(), np.float64)[:, targets].T
+
+
+def check_random_changes(n: int, targets: list, max_weight: int, max_affected_fraction: float, steps: int):
+    """ Changes the weights of a few links (or of all links of a node) per step """
+    rng = np.random.RandomState(SEED)
+    links = get_random_links(n, 0.2, rng)
+    weights = rng.randint(1, max_weight + 1, size=len(links)).astype(np.float64)
+    spsp = DynamicSPSP(n, links, targets, max_affected_fraction=max_affected_fraction)
+    for step in range(steps):
+        if step % 5 == 4:
+            x = rng.randint(n)
+            changed = [link_id for link_id, (u, v) in enumerate(links) if x in (u, v)]
+        else:
+            changed = rng.choice(len(links), size=rng.randint(1, 4), replace=False)
+        weights = weights.copy()
+        weights[changed] = rng.randint(1, max_weight + 1, size=len(changed))
+        distances = spsp.get_distances(weights)
+        assert np.array_equal(distances, get_apsp_distances(n, links, weights, targets)), f"step {step} differs"
+    return spsp
+
+
+def test_all_targets():
+    n = 25
+    spsp = check_random_changes(n, list(range(n)), 20, 0.8, 60)
+    assert spsp.dynamic_updates > 0 and spsp.repaired_trees < 60 * n
+
+
+def test_some_targets():
+    spsp = check_random_changes(30, [3, 17, 29, 8], 5, 0.8, 60)
+    assert spsp.dynamic_updates > 0
+
+
+def test_full_updates():
+    spsp = check_random_changes(20, list(range(20)), 10, 0., 20)
+    assert spsp.full_updates > 0
+
+
+def main():
+    for test in [test_all_targets, test_some_targets, test_full_updates]:
+        test()
+        print(f"{HIGHLIGHT}{test.__name__}{CEND}: passed")
+    return
+
+
+if __name__ == '__main__':
+    main()
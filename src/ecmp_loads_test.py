@@ -0,0 +1,102 @@
+""" Test: ECMPLoads vs. the former per-target propagation of HeurOSPFWeights (run with pytest or as script) """
+
+import networkit as nk
+import numpy as np
+
+from algorithm.segment_routing.ecmp_loads import ECMPLoads
+from utility.utility import HIGHLIGHT, CEND
+
+SEED = 318924135
+
+
+def add_loads_for(n, targets, t_idx, weights, demands, acc_flows, distances):
+    """ Former HeurOSPFWeights.__add_loads_for (reference): pushes the demands to targets[t_idx] (n x n matrix) """
+    current_flows = np.zeros((n, n), np.float64)
+    t = targets[t_idx]
+    A_out = {y: list() for y in range(n)}
+    A_in = {y: list() for y in range(n)}
+    reverse_indices = range(n - 1, -1, -1)
+    for x, y in weights:
+        if weights[(x, y)] == distances[t_idx][x] - distances[t_idx][y]:
+            A_out[x].append(y)
+            A_in[y].append(x)
+
+    y_map = dict(zip(reverse_indices, np.array(distances[t_idx]).argsort()))
+    for y_idx in range(n - 1):
+        y = y_map[y_idx]
+        d_yt = demands[y, t] if (y, t) in demands else 0
+        acc_demand_to_t = d_yt + np.sum(current_flows[y])
+        if acc_demand_to_t <= 0:
+            continue
+        l = acc_demand_to_t / len(A_out[y])
+        for z in A_out[y]:
+            current_flows[z][y] = l
+            acc_flows[y, z] += l
+    return acc_flows
+
+
+def get_random_instance(n: int, link_probability: float, max_weight: int, rng: np.random.RandomState):
+    """ Strongly connected random graph with small integer weights (many equal cost paths) and random demands """
+    ring = [(u, (u + 1) % n) for u in range(n)] + [((u + 1) % n, u) for u in range(n)]
+    links = ring + [(u, v) for u in range(n) for v in range(n)
+                    if u != v and (u, v) not in ring and rng.rand() < link_probability]
+    weights = rng.randint(1, max_weight + 1, size=len(links)).astype(np.float64)
+    demand_matrix = dict()
+    for s, t in rng.randint(0, n, size=(3 * n, 2)).tolist():
+        if s != t:
+            demand_matrix[s, t] = float(rng.rand() * 100)
+    return links, weights, demand_matrix
+
+
+def get_distances(n: int, links: list, weights: np.ndarray, targets: list) -> np.ndarray:
+    """ Distances from all nodes to the targets (distances[t_idx][x]) """
+    g = nk.Graph(weighted=True, directed=True, n=n)
+    for (u, v), w in zip(links, weights.tolist()):
+        g.addEdge(u, v, w)
+    apsp = nk.distance.APSP(g)
+    apsp.run()
+    return np.array(apsp.getDistances(), np.float64)[:, targets].T
+
+
+def check_instance(n: int, link_probability: float, max_weight: int, rng: np.random.RandomState):
+    links, weights, demand_matrix = get_random_instance(n, link_probability, max_weight, rng)
+    targets = sorted({t for _, t in demand_matrix})
+    distances = get_distances(n, links, weights, targets)
+
+    acc_flows = {link: 0 for link in links}
+    weights_dict = dict(zip(links, weights.tolist()))
+    for t_idx in range(len(targets)):
+        acc_flows = add_loads_for(n, targets, t_idx, weights_dict, demand_matrix, acc_flows, distances)
+    expected = np.array([acc_flows[link] for link in links], np.float64)
+
+    flows = ECMPLoads(n, links, targets, demand_matrix).get_flows(weights, distances)
+    assert np.array_equal(flows, expected), f"n={n}: max. difference {np.abs(flows - expected).max()}"
+
+
+def test_unit_weights():
+    rng = np.random.RandomState(SEED)
+    for n in [5, 12, 30]:
+        check_instance(n, 0.3, 1, rng)
+
+
+def test_random_weights():
+    rng = np.random.RandomState(SEED)
+    for n, max_weight in [(10, 3), (25, 5), (40, 20)]:
+        check_instance(n, 0.2, max_weight, rng)
+
+
+def test_no_demands():
+    links = [(0, 1), (1, 2), (2, 0)]
+    flows = ECMPLoads(3, links, [], dict()).get_flows(np.ones(3), np.zeros((0, 3)))
+    assert np.array_equal(flows, np.zeros(3))
+
+
+def main():
+    for test in [test_unit_weights, test_random_weights, test_no_demands]:
+        test()
+        print(f"{HIGHLIGHT}{test.__name__}{CEND}: passed")
+    return
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Test: loads of the routing matrix (batch of demand samples) vs. separate EqualSplitShortestPath solves; test_*
+functions on a small deterministic grid (run with pytest), main additionally compares SNDlib topologies with MCF demands
+"""
+
+import sys
+
+import numpy as np
+
+from algorithm.segment_routing.equal_split_shortest_path import EqualSplitShortestPath
+from algorithm.segment_routing.inverse_capacity import InverseCapacity
+from algorithm.segment_routing.routing_matrix import RoutingMatrix
+from algorithm.segment_routing.uniform_weights import UniformWeights
+from demand import dp_factory
+from topology.snd_lib.sndlib_top import SndLibTop
+from utility.utility import HIGHLIGHT, CEND, FAIL, get_fpp
+
+# demands settings
+SEED = 318924135
+DEMANDS_SAMPLES = 10
+ACTIVE_PAIRS_FRACTION = 0.2
+
+# max. difference of the link loads relative to the max. load of the sample; the routing matrix adds the flows in
+# another order than the shortest path propagation (floating point rounding only)
+TOLERANCE = 1e-12
+
+TOPOLOGIES = ["abilene", "polska", "nobel-us", "atlanta", "nobel-germany", "pdh", "geant", "di", "janos-us", "france"]
+
+
+def get_grid_links(rows: int, columns: int) -> list:
+    """ Bidirectional grid with [(i,j,c), ..]; the capacities of the horizontal links are doubled """
+    links = list()
+    for r in range(rows):
+        for c in range(columns):
+            u = r * columns + c
+            if c + 1 < columns:
+                links += [(u, u + 1, 200.), (u + 1, u, 200.)]
+            if r + 1 < rows:
+                links += [(u, u + columns, 100.), (u + columns, u, 100.)]
+    return links
+
+
+def get_grid_demand_sets(n: int, number_sets: int) -> list:
+    """ Deterministic demand lists (with repeated pairs) """
+    rng = np.random.RandomState(SEED)
+    demand_sets = list()
+    for _ in range(number_sets):
+        pairs = [(s, t) for s, t in rng.randint(0, n, size=(3 * n, 2)).tolist() if s != t]
+        demand_sets.append([(s, t, float(rng.rand() * 50)) for s, t in pairs])
+    return demand_sets
+
+
+def test_default_without_routing_matrix():
+    """ Without routing_matrix (default) the loads are the ones of EqualSplitShortestPath (bit-identical) """
+    n, links = 12, get_grid_links(3, 4)
+    demands = get_grid_demand_sets(n, 1)[0]
+    solution = UniformWeights(list(range(n)), links, demands).solve()
+    weights = {(i, j): 1 for i, j, _ in links}
+    assert solution["loads"] == EqualSplitShortestPath(list(range(n)), links, demands, weights=weights).solve()["loads"]
+
+
+def test_batch_grid():
+    """ solve_many with routing matrix vs. separate solves without it (per path split) """
+    n, links = 12, get_grid_links(3, 4)
+    demand_sets = get_grid_demand_sets(n, 5)
+    assert check_topology(n, links, demand_sets) <= TOLERANCE
+
+
+def test_batch_grid_per_hop():
+    """ Routing matrix with per hop split (ECMP) vs. EqualSplitShortestPath with split_mode 'hop' """
+    n, links = 12, get_grid_links(3, 4)
+    demand_sets = get_grid_demand_sets(n, 5)
+    weights = {(i, j): 1 + (i + j) % 2 for i, j, _ in links}
+    loads = RoutingMatrix(links, weights, split_mode="hop").get_loads(demand_sets)
+    for sample_idx, demands in enumerate(demand_sets):
+        reference = EqualSplitShortestPath(list(range(n)), links, demands, weights=weights, split_mode="hop").solve()
+        difference = relative_difference(dict(zip(reference["loads"], loads[:, sample_idx].tolist())),
+                                         reference["loads"])
+        assert difference <= TOLERANCE, f"sample {sample_idx}: {difference}"
+
+
+def get_demand_samples(n, links):
+    """ DEMANDS_SAMPLES samples of MCF maximal demands (same setup as in the test drivers) """
+    mcf_dp = dp_factory.get_demand_provider(
+        n=n, provider="mcf", number_samples=DEMANDS_SAMPLES, links=links, active_pairs_fraction=ACTIVE_PAIRS_FRACTION,
+        mcf_method="maximal", flows_per_pair=get_fpp(links), seed=SEED)
+    return list(mcf_dp.demand_arrays())
+
+
+def relative_difference(loads: dict, reference: dict) -> float:
+    """ Max. absolute difference of the loads relative to the max. reference load """
+    max_load = max(reference.values())
+    return max(abs(loads[link] - reference[link]) for link in reference) / (max_load if max_load > 0 else 1.)
+
+
+def check_topology(n, links, demand_sets) -> float:
+    """ Returns the max. relative difference of the batch loads against separate solves without routing matrix """
+    nodes = list(range(n))
+    max_diff = 0.
+    for algorithm_class in [UniformWeights, InverseCapacity]:
+        # batch: one algorithm (routing matrix compiled once) for all samples
+        batch_solutions = algorithm_class(nodes, links, demand_sets[0], routing_matrix=True).solve_many(demand_sets)
+        for demands, solution in zip(demand_sets, batch_solutions):
+            reference = algorithm_class(nodes, links, demands).solve()
+            max_diff = max(max_diff, relative_difference(solution["loads"], reference["loads"]))
+
+    # batch API: max. utilization of all samples with one matrix product
+    weights = {(i, j): 1 for i, j, _ in links}
+    max_utilizations = RoutingMatrix(links, weights).get_max_utilizations(demand_sets)
+    for demands, max_utilization in zip(demand_sets, max_utilizations.tolist()):
+        reference = EqualSplitShortestPath(nodes, links, demands, weights=weights).solve()["objective"]
+        max_diff = max(max_diff, abs(max_utilization - reference) / reference)
+    return max_diff
+
+
+def main():
+    """ Runs the tests and compares the loads on each topology; returns 1 if a difference exceeds the TOLERANCE """
+    for test in [test_default_without_routing_matrix, test_batch_grid, test_batch_grid_per_hop]:
+        test()
+        print(f"{HIGHLIGHT}{test.__name__}{CEND}: passed")
+
+    top_provider = SndLibTop()
+    failed = list()
+    for topology_name in TOPOLOGIES:
+        links, n = top_provider.get_topology(topology_name)
+        demand_sets = get_demand_samples(n, links)
+        max_diff = check_topology(n, links, demand_sets)
+        passed = bool(np.isfinite(max_diff) and max_diff <= TOLERANCE)
+        if not passed:
+            failed.append(topology_name)
+        print(f"{HIGHLIGHT if passed else FAIL}{topology_name}{CEND} (|V|: {n}, |E|: {len(links)}, "
+              f"samples: {len(demand_sets)}): max. relative difference {max_diff:.2e}")
+    print(f"{FAIL}failed: {failed}{CEND}" if failed else f"{HIGHLIGHT}all passed (tolerance {TOLERANCE}){CEND}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+""" Test: shortest path fraction maps on small deterministic topologies (run with pytest or as script) """
+
+import networkit as nk
+import numpy as np
+
+from algorithm.segment_routing.demand_first_waypoints import DemandsFirstWaypoints
+from algorithm.segment_routing.sp_fraction_map import SPFractionMap, LazySPFractionMap, get_source_fractions
+from utility.utility import HIGHLIGHT, CEND
+
+SEED = 318924135
+
+
+def get_grid_links(rows: int, columns: int) -> list:
+    """ Bidirectional grid; unit weights give many equal cost paths (nodes with several DAG predecessors) """
+    links = list()
+    for r in range(rows):
+        for c in range(columns):
+            u = r * columns + c
+            if c + 1 < columns:
+                links += [(u, u + 1), (u + 1, u)]
+            if r + 1 < rows:
+                links += [(u, u + columns), (u + columns, u)]
+    return links
+
+
+def get_random_links(n: int, link_probability: float, rng: np.random.RandomState) -> list:
+    """ Random directed graph with a bidirectional ring (strongly connected) """
+    links = [(u, (u + 1) % n) for u in range(n)] + [((u + 1) % n, u) for u in range(n)]
+    links += [(u, v) for u in range(n) for v in range(n)
+              if u != v and abs(u - v) % (n - 1) != 1 and rng.rand() < link_probability]
+    return links
+
+
+def get_link_arrays(links: list):
+    """ Returns link_src, link_dst (link_id -> u, v) """
+    return np.array([u for u, _ in links], np.int64), np.array([v for _, v in links], np.int64)
+
+
+def get_distances(n: int, link_src: np.ndarray, link_dst: np.ndarray, link_weights: np.ndarray) -> np.ndarray:
+    """ All pairs shortest path distances with networKit """
+    g = nk.Graph(weighted=True, directed=True, n=n)
+    for u, v, w in zip(link_src.tolist(), link_dst.tolist(), link_weights.tolist()):
+        g.addEdge(u, v, w)
+    apsp = nk.distance.APSP(g)
+    apsp.run()
+    return np.array(apsp.getDistances(), np.float64)
+
+
+def assert_identical(n: int, map_a, map_b):
+    """ Asserts the same links and bit-identical fractions for each pair """
+    for s in range(n):
+        for t in range(n):
+            link_ids_a, fractions_a = map_a.pair(s, t)
+            link_ids_b, fractions_b = map_b.pair(s, t)
+            order_a, order_b = np.argsort(link_ids_a), np.argsort(link_ids_b)
+            assert np.array_equal(link_ids_a[order_a], link_ids_b[order_b]), f"links of ({s},{t}) differ"
+            assert np.array_equal(fractions_a[order_a], fractions_b[order_b]), f"fractions of ({s},{t}) differ"
+
+
+def check_sweeps(n: int, links: list, link_weights: np.ndarray):
+    """ Per destination (from_distances) and per source sweep vs. per pair computation (from_distances_per_pair) """
+    link_src, link_dst = get_link_arrays(links)
+    distances = get_distances(n, link_src, link_dst, link_weights)
+    per_pair = SPFractionMap.from_distances_per_pair(n, link_src, link_dst, link_weights, distances)
+    per_destination = SPFractionMap.from_distances(n, link_src, link_dst, link_weights, distances)
+    assert_identical(n, per_pair, per_destination)
+
+    rows = dict()
+    for s in range(n):
+        targets, link_ids, fractions = get_source_fractions(s, distances, link_src, link_dst, link_weights)
+        rows.update({(s, t): (link_ids[targets == t], fractions[targets == t]) for t in range(n)})
+    assert_identical(n, per_pair, SPFractionMap.from_pair_rows(n, rows))
+
+
+def assert_same_pairs(map_a, map_b, sources: np.ndarray, targets: np.ndarray):
+    """ Asserts that pairs() of both maps returns the same arrays """
+    for array_a, array_b in zip(map_a.pairs(sources, targets), map_b.pairs(sources, targets)):
+        assert np.array_equal(array_a, array_b), "pairs differ"
+
+
+def test_sweeps_grid():
+    links = get_grid_links(4, 5)
+    check_sweeps(20, links, np.ones(len(links)))
+
+
+def test_sweeps_random():
+    rng = np.random.RandomState(SEED)
+    for n, max_weight in [(12, 1), (20, 3), (30, 20)]:
+        links = get_random_links(n, 0.3, rng)
+        check_sweeps(n, links, rng.randint(1, max_weight + 1, size=len(links)).astype(np.float64))
+
+
+def test_lazy_map_cache():
+    """ Access pattern of the waypoint scan with a cache of two trees: the source tree of s, destination tree of t """
+    n = 20
+    links = get_grid_links(4, 5)
+    link_src, link_dst = get_link_arrays(links)
+    link_weights = np.ones(len(links))
+    distances = get_distances(n, link_src, link_dst, link_weights)
+    eager = SPFractionMap.from_distances(n, link_src, link_dst, link_weights, distances)
+    lazy = LazySPFractionMap(n, link_src, link_dst, link_weights, distances, cache_size=2)
+
+    # (s, t, hits, misses) after the accesses of the demand (cumulative); a new demand misses the destination tree
+    # of t and the source tree of s, the pair (s,t) is served by the source tree of s if it is cached
+    for s, t, hits, misses in [(0, 19, 4, 2), (0, 19, 10, 2), (3, 16, 14, 4), (3, 12, 19, 5)]:
+        candidates = np.array([w for w in range(n) if w != s and w != t])
+        for _ in range(2):  # lower bounds and scores
+            assert all(np.array_equal(a, b) for a, b in zip(lazy.pair(s, t), eager.pair(s, t)))
+            assert_same_pairs(lazy, eager, np.full(len(candidates), s), candidates)
+            assert_same_pairs(lazy, eager, candidates, np.full(len(candidates), t))
+        assert (lazy.hits, lazy.misses) == (hits, misses), f"({s},{t}): {lazy.hits} hits, {lazy.misses} misses"
+    assert lazy.nbytes > 0 and len(lazy) > 0
+
+
+def test_lazy_map_waypoints():
+    """ DemandsFirstWaypoints with a small cache: same solution as with the complete map, <= 2 misses per demand """
+    rng = np.random.RandomState(SEED)
+    n = 20
+    links = [(u, v, 100.) for u, v in get_random_links(n, 0.2, rng)]
+    demands = [(s, t, float(rng.randint(1, 50))) for s, t in rng.randint(0, n, size=(40, 2)) if s != t]
+    eager = DemandsFirstWaypoints(list(range(n)), links, demands).solve()
+    lazy = DemandsFirstWaypoints(list(range(n)), links, demands, fraction_cache_size=2).solve()
+    for key in ["objective", "waypoints", "loads"]:
+        assert eager[key] == lazy[key], f"{key} differs"
+    destinations = len(set(t for _, t, _ in demands))
+    assert lazy["fraction_cache_misses"] <= destinations + 2 * len(demands), lazy["fraction_cache_misses"]
+
+
+def main():
+    for test in [test_sweeps_grid, test_sweeps_random, test_lazy_map_cache, test_lazy_map_waypoints]:
+        test()
+        print(f"{HIGHLIGHT}{test.__name__}{CEND}: passed")
+    return
+
+
+if __name__ == '__main__':
+    main()
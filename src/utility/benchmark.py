@@ -0,0 +1,49 @@
+""" Shared setup of the benchmark scripts: SNDLib topologies, MCF demands and the JSON result file """
+
+import os
+
+from demand import dp_factory
+from topology.snd_lib.file_mapping import file_map
+from topology.snd_lib.sndlib_top import SndLibTop
+from utility import utility
+from utility.json_result_handler import JsonResultWriter
+from utility.utility import get_fpp
+
+OUT_DIR = os.path.abspath("../out/")
+SEED = 318924135
+ACTIVE_PAIRS_FRACTION = 0.2
+
+
+def get_demands(n, links):
+    """ First sample of MCF maximal demands (same setup as in the test drivers) """
+    mcf_dp = dp_factory.get_demand_provider(
+        n=n, provider="mcf", number_samples=1, links=links, active_pairs_fraction=ACTIVE_PAIRS_FRACTION,
+        mcf_method="maximal", flows_per_pair=get_fpp(links), seed=SEED)
+    return next(iter(mcf_dp.demand_arrays()), None)
+
+
+def run_benchmark(name: str, measure, with_demands: bool = True):
+    """
+    Runs measure on each SNDLib topology and writes the results to OUT_DIR/<name>.json
+    :param name: name of the benchmark (name of the result file)
+    :param measure: function (topology_name, n, links, demands) -> list of result dicts
+    :param with_demands: if False, no demands are computed (demands is None)
+    """
+    utility.create_dirs(OUT_DIR)
+    result_handler = JsonResultWriter(os.path.join(OUT_DIR, f"{name}.json"), overwrite=True)
+    top_provider = SndLibTop()
+
+    for topology_name in file_map:
+        try:
+            links, n = top_provider.get_topology(topology_name)
+            demands = get_demands(n, links) if with_demands else None
+        except Exception as ex:
+            print(f"skip {topology_name}: {str(ex)}")
+            continue
+        if with_demands and demands is None:
+            print(f"skip {topology_name}: no demands")
+            continue
+
+        for result in measure(topology_name, n, links, demands):
+            result_handler.insert_result(result)
+    return
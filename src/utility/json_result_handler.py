@@ -1,6 +1,8 @@
 import json
 import os
 
+import numpy as np
+
 
 class JsonResultReader:
     def __init__(self, file_name: str):
@@ -27,7 +29,7 @@ class JsonResultWriter:
         """ Replaces iterable values with the length of the iterable"""
         solution_converted = dict()
         for k, v in solution.items():
-            iterables = (dict, list, set, tuple)
+            iterables = (dict, list, set, tuple, np.ndarray)
             if type(v) in iterables:
                 solution_converted[f"#{k}"] = len(v)
             else: